@@ -0,0 +1,194 @@
+# app/apigee.py
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+APIGEE_API = "https://apigee.googleapis.com/v1"
+
+_apigee = None
+_apigee_lock = threading.Lock()
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def app_summary(app: Dict) -> Dict:
+    """The parts of an Apigee developer app the reconciler keeps"""
+    return {
+        "status": app.get("status", "approved"),
+        "developer_id": app.get("developerId"),
+        "modified": int(app.get("lastModifiedAt") or 0),
+        "keys": {c["consumerKey"]: c.get("status", "approved") for c in app.get("credentials", [])},
+        "api_products": sorted({
+            p["apiproduct"] for c in app.get("credentials", []) for p in c.get("apiProducts", [])
+        })
+    }
+
+
+class ApigeeEmulator:
+    """In-memory stand-in for the Apigee developer apps API.
+
+    Apps use the management API's JSON shape (name, developerId, status,
+    lastModifiedAt in epoch milliseconds, credentials with consumerKey and
+    status). list_apps can filter on lastModifiedAt server-side, which the
+    real API cannot; ApigeeClient does the same filter after listing.
+    """
+
+    def __init__(self):
+        self._apps: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+
+    def _enter(self, method: str):
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+    def _touch(self, app: Dict):
+        # Strictly increasing so watermarks never skip a change
+        app["lastModifiedAt"] = str(max(_now_ms(), int(app["lastModifiedAt"]) + 1))
+
+    # Test and demo helpers, the equivalent of changes made in the Apigee UI
+
+    def create_app(self, name: str, developer_id: str = "developer@example.com", status: str = "approved",
+                   api_products: Optional[List[str]] = None) -> Dict:
+        with self._lock:
+            now = str(_now_ms())
+            self._apps[name] = {
+                "name": name,
+                "appId": str(uuid.uuid4()),
+                "developerId": developer_id,
+                "status": status,
+                "createdAt": now,
+                "lastModifiedAt": now,
+                "credentials": [],
+                "apiProducts": list(api_products or [])
+            }
+            return dict(self._apps[name])
+
+    def set_status(self, name: str, status: str):
+        with self._lock:
+            app = self._apps[name]
+            app["status"] = status
+            self._touch(app)
+
+    def revoke_key(self, name: str, consumer_key: str):
+        with self._lock:
+            app = self._apps[name]
+            for credential in app["credentials"]:
+                if credential["consumerKey"] == consumer_key:
+                    credential["status"] = "revoked"
+            self._touch(app)
+
+    def delete_app(self, name: str):
+        with self._lock:
+            self._apps.pop(name, None)
+
+    # API surface used by the reconciler
+
+    def list_apps(self, modified_since: int = 0) -> List[Dict]:
+        """Apps changed after modified_since (epoch ms), with credentials"""
+        self._enter("list_apps")
+        with self._lock:
+            return [
+                {**app, "credentials": [dict(c) for c in app["credentials"]]}
+                for app in self._apps.values() if int(app["lastModifiedAt"]) > modified_since
+            ]
+
+    def add_key(self, app_name: str, developer_id: str, consumer_key: str, consumer_secret: str,
+                api_products: Optional[List[str]] = None):
+        """Register an externally generated key pair with an app"""
+        self._enter("add_key")
+        with self._lock:
+            app = self._apps.get(app_name)
+            if app is None or app["developerId"] != developer_id:
+                raise KeyError(f"Developer app {app_name} not found")
+            app["credentials"].append({
+                "consumerKey": consumer_key,
+                "consumerSecret": consumer_secret,
+                "status": "approved",
+                "issuedAt": str(_now_ms()),
+                "apiProducts": [{"apiproduct": p, "status": "approved"} for p in api_products or app["apiProducts"]]
+            })
+            self._touch(app)
+
+
+class ApigeeClient:
+    """Minimal Apigee management API client for the reconciler.
+
+    Lists every app with ``expand=true`` on every call (the API has no
+    modified-since filter, so the watermark is applied here and does not
+    shrink the listing) and registers keys with the
+    developer app keys API, copying the app's API products onto the new key.
+    """
+
+    def __init__(self, org: str, page_size: int = 1000):
+        from google.auth.transport.requests import AuthorizedSession
+
+        from app.clients import shared_credentials
+
+        self.org_path = f"{APIGEE_API}/organizations/{org}"
+        self.page_size = page_size
+        self.session = AuthorizedSession(shared_credentials())
+        self._developer_emails: Dict[str, str] = {}
+
+    def _get(self, path: str, **params) -> Dict:
+        response = self.session.get(f"{self.org_path}/{path}", params=params, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    def _pages(self, **params):
+        start_key = None
+        while True:
+            page = self._get("apps", rows=self.page_size, **params, **({"startKey": start_key} if start_key else {}))
+            apps = page.get("app", [])
+            # startKey is inclusive, so every page after the first repeats
+            # the previous page's last app
+            yield from (apps[1:] if start_key else apps)
+            if len(apps) < self.page_size:
+                return
+            start_key = apps[-1]["appId"]
+
+    def list_apps(self, modified_since: int = 0) -> List[Dict]:
+        return [app for app in self._pages(expand="true") if int(app.get("lastModifiedAt") or 0) > modified_since]
+
+    def _developer_email(self, developer_id: str) -> str:
+        if developer_id not in self._developer_emails:
+            self._developer_emails[developer_id] = self._get(f"developers/{developer_id}")["email"]
+        return self._developer_emails[developer_id]
+
+    def add_key(self, app_name: str, developer_id: str, consumer_key: str, consumer_secret: str,
+                api_products: Optional[List[str]] = None):
+        keys_path = f"{self.org_path}/developers/{self._developer_email(developer_id)}/apps/{app_name}/keys"
+        response = self.session.post(
+            keys_path, json={"consumerKey": consumer_key, "consumerSecret": consumer_secret}, timeout=30
+        )
+        response.raise_for_status()
+        if api_products:
+            response = self.session.post(f"{keys_path}/{consumer_key}", json={"apiProducts": api_products}, timeout=30)
+            response.raise_for_status()
+
+
+def apigee_backend() -> str:
+    """APIGEE_BACKEND: "emulator" or "apigee"; defaults to the emulator alongside SECRET_BACKEND=emulator"""
+    default = "emulator" if os.getenv("SECRET_BACKEND", "gcp").lower() == "emulator" else "apigee"
+    return os.getenv("APIGEE_BACKEND", default).lower()
+
+
+def create_apigee_client():
+    """Shared Apigee client for the configured backend, or None without APIGEE_ORG"""
+    global _apigee
+    with _apigee_lock:
+        if _apigee is None:
+            backend = apigee_backend()
+            if backend == "emulator":
+                _apigee = ApigeeEmulator()
+            elif backend == "apigee":
+                org = os.getenv("APIGEE_ORG")
+                if not org:
+                    return None
+                _apigee = ApigeeClient(org)
+            else:
+                raise ValueError(f"Unknown Apigee backend: {backend}")
+        return _apigee
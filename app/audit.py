@@ -0,0 +1,179 @@
+# app/audit.py
+import csv
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from google.api_core import exceptions
+
+from app.metadata import METADATA_FIELDS, days_until, metadata_from_annotations
+from app.resilience import IDEMPOTENT_RPCS, Resilience, shared_resilience
+
+logger = logging.getLogger(__name__)
+
+# Matches the labels set by both the service (type) and SecretManagerClient
+# (created_by), so only key manager secrets are ever returned by the list call
+DEFAULT_FILTER = "labels.type=apigee-key OR labels.created_by=apigee-key-manager"
+
+SECRET_PREFIX = "apigee-key-"
+
+AUDIT_FORMATS = ("json", "csv")
+
+# When to read the latest payload: never, only for secrets without
+# annotated metadata, or always (to report consumer keys)
+PAYLOAD_MODES = ("never", "missing", "always")
+
+CSV_FIELDS = (
+    "app_name", "secret_id", "status", "key", *METADATA_FIELDS[1:],
+    "days_until_rotation", "metadata_source", "enabled_versions", "error"
+)
+
+
+class SecretAuditor:
+    """Audits every key manager secret in a project.
+
+    Secrets are selected with a server-side filter and listed a page at a
+    time. Rotation metadata comes from the secret annotations, so a
+    metadata-only audit is one list call per page. Payload reads (see
+    PAYLOAD_MODES) and version listings run on ``concurrency`` threads,
+    through the shared deadline, retry and quota layer.
+    """
+
+    def __init__(
+        self,
+        client,
+        parent: str,
+        concurrency: int = 16,
+        page_size: int = 100,
+        due_within_days: float = 7,
+        payload: str = "missing",
+        versions: int = 0,
+        filter: str = DEFAULT_FILTER,
+        resilience: Optional[Resilience] = None
+    ):
+        self.client = client
+        self.parent = parent
+        self.concurrency = max(1, concurrency)
+        self.page_size = page_size
+        self.due_within = timedelta(days=due_within_days)
+        if payload not in PAYLOAD_MODES:
+            raise ValueError(f"payload must be one of {', '.join(PAYLOAD_MODES)}")
+        self.payload = payload
+        self.versions = versions
+        self.filter = filter
+        self.resilience = resilience or shared_resilience()
+
+    def _call(self, method: str, **kwargs):
+        return self.resilience.call_sync(
+            getattr(self.client, method), method, idempotent=method in IDEMPOTENT_RPCS, **kwargs
+        )
+
+    def list_secrets(self) -> Iterator:
+        request = {"parent": self.parent, "filter": self.filter, "page_size": self.page_size}
+        for secret in self.resilience.list_sync(self.client.list_secrets, "list_secrets", request, "secrets"):
+            # Guard against a filter override matching unrelated secrets
+            if secret.name.split("/")[-1].startswith(SECRET_PREFIX):
+                yield secret
+
+    def _list_versions(self, secret_name: str) -> List[Dict]:
+        request = {
+            "parent": secret_name,
+            "filter": "state:ENABLED OR state:DISABLED",
+            "page_size": self.versions
+        }
+        versions = []
+        pages = self.resilience.list_sync(self.client.list_secret_versions, "list_secret_versions", request, "versions")
+        for version in pages:
+            versions.append({
+                "version": version.name.split("/")[-1],
+                "state": version.state.name,
+                "create_time": version.create_time.isoformat()
+            })
+            if len(versions) >= self.versions:
+                break
+        return versions
+
+    def audit_secret(self, secret, now: datetime) -> Dict:
+        """One report row for a listed secret"""
+        secret_id = secret.name.split("/")[-1]
+        app_name = secret.labels.get("app") or secret_id[len(SECRET_PREFIX):]
+        row = {"app_name": app_name, "secret_id": secret_id, "labels": dict(secret.labels)}
+        try:
+            metadata = metadata_from_annotations(secret.annotations, app_name)
+            row["metadata_source"] = "annotations" if metadata else None
+            if self.payload == "always" or (metadata is None and self.payload == "missing"):
+                response = self._call("access_secret_version", request={"name": f"{secret.name}/versions/latest"})
+                data = json.loads(response.payload.data.decode("UTF-8"))
+                metadata = {**(metadata or {}), **data.get("metadata", {})}
+                row["key"] = data.get("credentials", {}).get("key")
+                row["metadata_source"] = "payload"
+            for field in METADATA_FIELDS[1:]:
+                row[field] = (metadata or {}).get(field)
+            if self.versions:
+                row["versions"] = self._list_versions(secret.name)
+                row["enabled_versions"] = sum(1 for v in row["versions"] if v["state"] == "ENABLED")
+            row["status"] = self._rotation_status(row.get("next_rotation"), now)
+            if row.get("next_rotation"):
+                row["days_until_rotation"] = days_until(row["next_rotation"], now)
+        except exceptions.NotFound:
+            row.update(status="error", error="Secret has no versions")
+        except Exception as e:
+            row.update(status="error", error=str(e))
+        return row
+
+    def _rotation_status(self, next_rotation: Optional[str], now: datetime) -> str:
+        if not next_rotation:
+            return "no_metadata"
+        due = datetime.fromisoformat(next_rotation)
+        if due <= now:
+            return "overdue"
+        if due <= now + self.due_within:
+            return "due_soon"
+        return "ok"
+
+    def rows(self, now: Optional[datetime] = None) -> Iterator[Dict]:
+        """Audit rows in listing order"""
+        now = now or datetime.now()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="audit") as executor:
+            yield from executor.map(lambda secret: self.audit_secret(secret, now), self.list_secrets())
+
+    def run(self, now: Optional[datetime] = None) -> Dict:
+        """Audit everything and return {"summary": ..., "apps": [...]}"""
+        now = now or datetime.now()
+        apps = list(self.rows(now))
+        return {"summary": summarize(apps, now, self.due_within), "apps": apps}
+
+
+def summarize(rows: Iterable[Dict], now: datetime, due_within: timedelta) -> Dict:
+    """Counts by status plus the overdue and soon-due apps, most urgent first"""
+    counts = {"ok": 0, "due_soon": 0, "overdue": 0, "no_metadata": 0, "error": 0}
+    urgent = {"overdue": [], "due_soon": []}
+    total = 0
+    for row in rows:
+        total += 1
+        counts[row["status"]] += 1
+        if row["status"] in urgent:
+            urgent[row["status"]].append(row)
+    by_due = lambda row: row["next_rotation"]
+    return {
+        "audited_at": now.isoformat(),
+        "due_within_days": due_within.total_seconds() / 86400,
+        "total": total,
+        **counts,
+        **{
+            f"{status}_apps": [
+                {"app_name": r["app_name"], "next_rotation": r["next_rotation"], "days_until_rotation": r["days_until_rotation"]}
+                for r in sorted(found, key=by_due)
+            ]
+            for status, found in urgent.items()
+        }
+    }
+
+
+def write_csv(rows: Iterable[Dict], out: TextIO):
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
@@ -0,0 +1,135 @@
+# app/cache.py
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class CacheEntry:
+    __slots__ = ("value", "version", "stored_at")
+
+    def __init__(self, value: Any, version: Optional[str], stored_at: float):
+        self.value = value
+        self.version = version
+        self.stored_at = stored_at
+
+
+class SecretCache:
+    """Bounded LRU cache for secret payloads with a time-to-live per entry.
+
+    Entries remember the version name they were read from so callers can
+    revalidate an expired entry against the latest version instead of
+    downloading the payload again.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _is_fresh(self, entry: CacheEntry) -> bool:
+        return self.clock() - entry.stored_at < self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of a fresh cached value, or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is None or not self._is_fresh(entry):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(entry.value)
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key even if it has expired, without counting"""
+        return self._entries.get(key)
+
+    def fresh_version(self, key: str) -> Optional[str]:
+        """Version name of a fresh entry, without counting a hit or miss"""
+        entry = self._entries.get(key)
+        if entry is None or not self._is_fresh(entry):
+            return None
+        return entry.version
+
+    def put(self, key: str, value: Any, version: Optional[str] = None):
+        """Store a value, evicting the least recently used entry if full"""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = CacheEntry(copy.deepcopy(value), version, self.clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def revalidate(self, key: str) -> Optional[Any]:
+        """Mark an expired entry fresh again after confirming its version"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry.stored_at = self.clock()
+        self._entries.move_to_end(key)
+        self.revalidations += 1
+        return copy.deepcopy(entry.value)
+
+    def invalidate(self, key: str):
+        """Drop a single entry"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Counters used to size the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "revalidations": self.revalidations
+        }
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one.
+
+    The first caller for a key runs the call; callers arriving while it is
+    in flight await the same task and get its result (as a deep copy, like
+    cache hits) or its exception. A caller being cancelled does not cancel
+    the shared call. forget() detaches the in-flight call so that callers
+    arriving after a write start a new one instead of joining a read that
+    began before it.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(task))
+        task = asyncio.ensure_future(func())
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._calls.pop(key, None) if self._calls.get(key) is done else None)
+        return await asyncio.shield(task)
+
+    def forget(self, key: str):
+        self._calls.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,182 @@
+# app/clients.py
+import itertools
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Project used for resource names when running against the emulator
+EMULATOR_PROJECT_ID = "local-emulator"
+
+SECRET_MANAGER_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+_emulator = None
+_credentials = None
+_clients: Dict[str, object] = {}
+_clients_lock = threading.Lock()
+
+
+def secret_backend() -> str:
+    """Storage backend selected by SECRET_BACKEND: "gcp" (default) or "emulator" """
+    return os.getenv("SECRET_BACKEND", "gcp").lower()
+
+
+def default_project_id() -> Optional[str]:
+    """GOOGLE_CLOUD_PROJECT, falling back to a fixed project for the emulator"""
+    project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+    if not project_id and secret_backend() == "emulator":
+        return EMULATOR_PROJECT_ID
+    return project_id
+
+
+def get_emulator():
+    """Process-wide emulator instance, configured from EMULATOR_* variables"""
+    global _emulator
+    if _emulator is None:
+        from app.emulator import SecretManagerEmulator
+
+        quotas = {
+            bucket: int(os.getenv(f"EMULATOR_{bucket.upper()}_QUOTA_PER_MINUTE", "0"))
+            for bucket in ("access", "read", "write")
+        }
+        _emulator = SecretManagerEmulator(
+            latency_ms=float(os.getenv("EMULATOR_LATENCY_MS", "0")),
+            latency_jitter_ms=float(os.getenv("EMULATOR_LATENCY_JITTER_MS", "0")),
+            error_rate=float(os.getenv("EMULATOR_ERROR_RATE", "0")),
+            quotas_per_minute={bucket: limit for bucket, limit in quotas.items() if limit}
+        )
+        logger.info("Using in-process Secret Manager emulator")
+    return _emulator
+
+
+def transport_settings() -> Dict:
+    """Transport tuning for the GCP client, read from the environment.
+
+    SECRET_MANAGER_TRANSPORT is "grpc" (default) or "rest".
+    SECRET_MANAGER_CHANNELS is the number of gRPC channels calls are spread
+    over; each channel is its own HTTP/2 connection, so this caps how many
+    concurrent streams queue behind one connection's limit.
+    SECRET_MANAGER_KEEPALIVE_SECONDS sets gRPC keepalive pings, which keep
+    idle channels from being dropped by load balancers between bursts.
+    REST connections are pooled up to SECRET_MANAGER_MAX_WORKERS, one per
+    executor thread.
+    """
+    return {
+        "transport": os.getenv("SECRET_MANAGER_TRANSPORT", "grpc").lower(),
+        "channels": max(1, int(os.getenv("SECRET_MANAGER_CHANNELS", "4"))),
+        "keepalive_seconds": float(os.getenv("SECRET_MANAGER_KEEPALIVE_SECONDS", "30")),
+        "rest_pool_size": int(os.getenv("SECRET_MANAGER_MAX_WORKERS", "16"))
+    }
+
+
+def shared_credentials():
+    """Application default credentials, resolved once per process.
+
+    Every client built here shares this object, so tokens are fetched and
+    refreshed once rather than per client.
+    """
+    global _credentials
+    if _credentials is None:
+        import google.auth
+
+        _credentials, _ = google.auth.default(scopes=SECRET_MANAGER_SCOPES)
+    return _credentials
+
+
+class PooledSecretManagerClient:
+    """Spreads calls round-robin over several clients, one channel each.
+
+    Exposes the same methods as SecretManagerServiceClient; each method
+    lookup picks the next client, so a pager keeps using the channel its
+    first page came from.
+    """
+
+    def __init__(self, clients: List):
+        self.clients = clients
+        self._next = itertools.count()
+
+    def __getattr__(self, name: str):
+        return getattr(self.clients[next(self._next) % len(self.clients)], name)
+
+    def close(self):
+        for client in self.clients:
+            client.transport.close()
+
+
+def _create_gcp_client(settings: Dict):
+    # Imported here: the GAPIC package takes a few hundred milliseconds
+    # to import and the emulator never needs it
+    from google.cloud import secretmanager_v1
+    from google.cloud.secretmanager_v1.services.secret_manager_service import transports
+
+    credentials = shared_credentials()
+    if settings["transport"] == "rest":
+        from requests.adapters import HTTPAdapter
+
+        client = secretmanager_v1.SecretManagerServiceClient(credentials=credentials, transport="rest")
+        pool_size = settings["rest_pool_size"]
+        client.transport._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        logger.info(f"Secret Manager client using REST with {pool_size} pooled connections")
+        return client
+    if settings["transport"] != "grpc":
+        raise ValueError(f"Unknown Secret Manager transport: {settings['transport']}")
+
+    keepalive_ms = int(settings["keepalive_seconds"] * 1000)
+    options = [
+        # Without a local pool, channels with identical arguments share one
+        # subchannel (and so one connection) through gRPC's global pool
+        ("grpc.use_local_subchannel_pool", 1),
+        ("grpc.max_send_message_length", -1),
+        ("grpc.max_receive_message_length", -1)
+    ]
+    if keepalive_ms:
+        options += [
+            ("grpc.keepalive_time_ms", keepalive_ms),
+            ("grpc.keepalive_timeout_ms", 20000),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0)
+        ]
+    clients = []
+    for _ in range(settings["channels"]):
+        channel = transports.SecretManagerServiceGrpcTransport.create_channel(
+            credentials=credentials, scopes=SECRET_MANAGER_SCOPES, options=options
+        )
+        transport = transports.SecretManagerServiceGrpcTransport(channel=channel)
+        clients.append(secretmanager_v1.SecretManagerServiceClient(transport=transport))
+    logger.info(f"Secret Manager client using gRPC over {len(clients)} channels")
+    return clients[0] if len(clients) == 1 else PooledSecretManagerClient(clients)
+
+
+def create_secret_manager_client(backend: Optional[str] = None):
+    """Shared client for the configured storage backend.
+
+    Every entry point (SecretManager, SecretManagerClient, SecretVerifier and
+    the verify scripts) gets its client here, so switching SECRET_BACKEND
+    moves all of them at once. The client is built once per process and
+    shared: one set of credentials and one channel pool for everyone.
+    """
+    backend = backend or secret_backend()
+    client = _clients.get(backend)
+    if client is not None:
+        return client
+    with _clients_lock:
+        if backend not in _clients:
+            if backend == "gcp":
+                _clients[backend] = _create_gcp_client(transport_settings())
+            elif backend == "emulator":
+                _clients[backend] = get_emulator()
+            else:
+                raise ValueError(f"Unknown secret backend: {backend}")
+        return _clients[backend]
+
+
+def close_secret_manager_clients():
+    """Close the shared clients' channels; called on shutdown"""
+    with _clients_lock:
+        for backend, client in _clients.items():
+            if backend == "gcp":
+                close = getattr(client, "close", None) or client.transport.close
+                close()
+        _clients.clear()
@@ -0,0 +1,177 @@
+# app/compaction.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.quota import BACKGROUND, in_lane
+
+logger = logging.getLogger(__name__)
+
+# Per-app reports kept for /compaction/status
+MAX_REPORTS = 1000
+
+
+class VersionPolicy:
+    """Which old secret versions to disable or destroy.
+
+    The newest ``keep_enabled`` versions are never touched, so the current
+    credentials and a grace window of previous ones keep working. Older
+    versions are disabled, and destroyed once older than
+    ``destroy_after_days`` (0 disables destruction).
+    """
+
+    def __init__(self, keep_enabled: int = 2, destroy_after_days: float = 30):
+        if keep_enabled < 1:
+            raise ValueError("keep_enabled must be at least 1")
+        self.keep_enabled = keep_enabled
+        self.destroy_after = timedelta(days=destroy_after_days) if destroy_after_days else None
+
+    def plan(self, versions: List, now: Optional[datetime] = None) -> Dict[str, List[str]]:
+        """Split versions (newest first) into names to disable and to destroy"""
+        now = now or datetime.now(timezone.utc)
+        plan = {"disable": [], "destroy": []}
+        for version in versions[self.keep_enabled:]:
+            state = version.state.name
+            if state == "DESTROYED":
+                continue
+            if self.destroy_after and now - version.create_time >= self.destroy_after:
+                plan["destroy"].append(version.name)
+            elif state == "ENABLED":
+                plan["disable"].append(version.name)
+        return plan
+
+
+class RateLimiter:
+    """Spaces calls evenly to at most ``rate`` per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class CompactionWorker:
+    """Background pass that prunes old versions of every app's secret.
+
+    Apps are processed in batches of ``batch_size``; every Secret Manager
+    call, including the version listing, waits on a shared rate limiter so
+    a pass never competes with request traffic for quota. A pass runs every
+    ``interval_seconds`` and can also be run for one app on demand.
+    """
+
+    def __init__(
+        self,
+        list_apps: Callable[[], Awaitable[List[str]]],
+        list_versions: Callable[[str], Awaitable[List]],
+        set_state: Callable[[str, str], Awaitable[None]],
+        policy: VersionPolicy,
+        calls_per_second: float = 5,
+        batch_size: int = 10,
+        interval_seconds: float = 86400
+    ):
+        self.list_apps = list_apps
+        self.list_versions = list_versions
+        self.set_state = set_state
+        self.policy = policy
+        self.limiter = RateLimiter(calls_per_second)
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.reports: "OrderedDict[str, Dict]" = OrderedDict()
+        self.progress: Dict = {}
+        self.last_pass: Optional[Dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @in_lane(BACKGROUND)
+    async def compact_app(self, app_name: str) -> Dict:
+        """Apply the policy to one app and return what was done"""
+        report = {"app_name": app_name, "disabled": 0, "destroyed": 0, "errors": []}
+        await self.limiter.acquire()
+        versions = await self.list_versions(app_name)
+        plan = self.policy.plan(versions)
+        for action, names in (("destroy", plan["destroy"]), ("disable", plan["disable"])):
+            for name in names:
+                await self.limiter.acquire()
+                try:
+                    await self.set_state(name, action)
+                    report["destroyed" if action == "destroy" else "disabled"] += 1
+                except Exception as e:
+                    report["errors"].append(f"{action} {name}: {str(e)}")
+        report["versions"] = len(versions)
+        report["finished_at"] = datetime.now().isoformat()
+        self.reports[app_name] = report
+        self.reports.move_to_end(app_name)
+        while len(self.reports) > MAX_REPORTS:
+            self.reports.popitem(last=False)
+        return report
+
+    @in_lane(BACKGROUND)
+    async def run_pass(self) -> Dict:
+        """Compact every app once, batch by batch"""
+        app_names = await self.list_apps()
+        self.progress = {
+            "started_at": datetime.now().isoformat(),
+            "apps": len(app_names),
+            "done": 0,
+            "disabled": 0,
+            "destroyed": 0,
+            "failed": 0
+        }
+        for start in range(0, len(app_names), self.batch_size):
+            batch = app_names[start:start + self.batch_size]
+            results = await asyncio.gather(*(self.compact_app(name) for name in batch), return_exceptions=True)
+            for name, result in zip(batch, results):
+                self.progress["done"] += 1
+                if isinstance(result, Exception):
+                    self.progress["failed"] += 1
+                    logger.error(f"Compaction failed for {name}: {str(result)}")
+                    continue
+                self.progress["disabled"] += result["disabled"]
+                self.progress["destroyed"] += result["destroyed"]
+                if result["errors"]:
+                    self.progress["failed"] += 1
+        self.progress["finished_at"] = datetime.now().isoformat()
+        self.last_pass, self.progress = self.progress, {}
+        logger.info(f"Compaction pass finished: {self.last_pass}")
+        return self.last_pass
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_pass()
+            except Exception as e:
+                self.progress = {}
+                logger.error(f"Compaction pass failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Version compaction started, every {self.interval_seconds}s")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def status(self) -> Dict:
+        return {
+            "running": self._task is not None,
+            "keep_enabled": self.policy.keep_enabled,
+            "destroy_after_days": self.policy.destroy_after.total_seconds() / 86400 if self.policy.destroy_after else None,
+            "current_pass": self.progress or None,
+            "last_pass": self.last_pass,
+            "recent_apps": list(self.reports.values())[-20:]
+        }
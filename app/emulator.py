@@ -0,0 +1,331 @@
+# app/emulator.py
+import enum
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from google.api_core import exceptions
+from app.quota import OPERATION_QUOTAS
+
+
+class State(enum.IntEnum):
+    """Mirrors secretmanager_v1.SecretVersion.State, whose package is slow to import"""
+
+    STATE_UNSPECIFIED = 0
+    ENABLED = 1
+    DISABLED = 2
+    DESTROYED = 3
+
+
+class EmulatedSecret:
+    def __init__(self, name: str, labels: Dict[str, str], annotations: Dict[str, str], create_time: datetime):
+        self.name = name
+        self.labels = labels
+        self.annotations = annotations
+        self.create_time = create_time
+        self.versions: List["EmulatedVersion"] = []
+
+    def copy(self) -> "EmulatedSecret":
+        return EmulatedSecret(self.name, dict(self.labels), dict(self.annotations), self.create_time)
+
+
+class EmulatedVersion:
+    def __init__(self, name: str, data: Optional[bytes], create_time: datetime):
+        self.name = name
+        self.data = data
+        self.state = State.ENABLED
+        self.create_time = create_time
+        self.destroy_time = None
+
+    def copy(self) -> "EmulatedVersion":
+        version = EmulatedVersion(self.name, None, self.create_time)
+        version.state = self.state
+        version.destroy_time = self.destroy_time
+        return version
+
+
+class Payload:
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+class AccessResponse:
+    def __init__(self, name: str, data: bytes):
+        self.name = name
+        self.payload = Payload(data)
+
+
+class Page:
+    def __init__(self, items: List, next_page_token: str, field: str):
+        self.next_page_token = next_page_token
+        setattr(self, field, items)
+
+
+class Pager:
+    """Iterates over every item across pages, like the GAPIC pagers"""
+
+    def __init__(self, fetch_page, field: str):
+        self._fetch_page = fetch_page
+        self._field = field
+
+    @property
+    def pages(self):
+        token = ""
+        while True:
+            page = self._fetch_page(token)
+            yield page
+            token = page.next_page_token
+            if not token:
+                break
+
+    def __iter__(self):
+        for page in self.pages:
+            yield from getattr(page, self._field)
+
+
+class SecretManagerEmulator:
+    """In-memory stand-in for SecretManagerServiceClient.
+
+    Implements the subset of RPCs this service uses with the same request
+    dicts, resource names, label filters, paging and AlreadyExists /
+    NotFound / FailedPrecondition semantics. Latency, random failures and
+    per-minute quotas can be injected to exercise the service under
+    realistic conditions without a GCP project.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        latency_jitter_ms: float = 0,
+        error_rate: float = 0,
+        quotas_per_minute: Optional[Dict[str, int]] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.quotas_per_minute = quotas_per_minute or {}
+        self.calls: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._secrets: Dict[str, EmulatedSecret] = {}
+        self._quota_windows: Dict[str, deque] = {}
+
+    def configure(self, **settings):
+        """Change fault injection settings at runtime"""
+        for key, value in settings.items():
+            if not hasattr(self, key):
+                raise AttributeError(f"Unknown emulator setting: {key}")
+            setattr(self, key, value)
+
+    def reset(self):
+        """Drop all secrets and call counters"""
+        with self._lock:
+            self._secrets.clear()
+            self._quota_windows.clear()
+            self.calls.clear()
+
+    # Fault injection
+
+    def _enter(self, method: str, timeout: Optional[float] = None):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            bucket = OPERATION_QUOTAS[method]
+            limit = self.quotas_per_minute.get(bucket)
+            if limit:
+                window = self._quota_windows.setdefault(bucket, deque())
+                now = time.monotonic()
+                while window and now - window[0] >= 60:
+                    window.popleft()
+                if len(window) >= limit:
+                    raise exceptions.ResourceExhausted(f"Quota exceeded for {bucket} requests per minute")
+                window.append(now)
+            fail = self.error_rate and self._random.random() < self.error_rate
+            delay = self.latency_ms
+            if self.latency_jitter_ms:
+                delay += self._random.uniform(0, self.latency_jitter_ms)
+        if delay:
+            # Like a gRPC deadline, the client's timeout cuts a slow call short
+            if timeout is not None and delay / 1000 > timeout:
+                time.sleep(timeout)
+                raise exceptions.DeadlineExceeded(f"{method} exceeded its {timeout:.3f}s timeout")
+            time.sleep(delay / 1000)
+        if fail:
+            raise exceptions.ServiceUnavailable(f"Injected failure in {method}")
+
+    # Helpers
+
+    def _secret(self, name: str) -> EmulatedSecret:
+        secret = self._secrets.get(name)
+        if secret is None:
+            raise exceptions.NotFound(f"Secret [{name}] not found.")
+        return secret
+
+    def _version(self, name: str) -> EmulatedVersion:
+        secret_name, _, version_id = name.partition("/versions/")
+        secret = self._secret(secret_name)
+        if version_id == "latest":
+            # The alias always names the newest version, whatever its state
+            if not secret.versions:
+                raise exceptions.NotFound(f"Secret [{secret_name}] has no versions.")
+            return secret.versions[-1]
+        for version in secret.versions:
+            if version.name == name:
+                return version
+        raise exceptions.NotFound(f"Secret Version [{name}] not found.")
+
+    @staticmethod
+    def _matches(labels: Dict[str, str], name: str, annotations: Dict[str, str], expression: Optional[str]) -> bool:
+        """Evaluate the supported subset of the list filter syntax.
+
+        Terms are ``labels.KEY=VALUE``, ``labels.KEY:*``, ``name:VALUE`` and
+        ``annotations.KEY=VALUE``, combined with AND / OR (AND binds
+        tighter), which is how this service builds its filters.
+        """
+        if not expression:
+            return True
+
+        def term(t: str) -> bool:
+            t = t.strip()
+            if t.startswith("labels.") or t.startswith("annotations."):
+                source = labels if t.startswith("labels.") else annotations
+                field = t.split(".", 1)[1]
+                if ":" in field and "=" not in field:
+                    key, value = field.split(":", 1)
+                    return key in source and (value == "*" or value in source[key])
+                key, _, value = field.partition("=")
+                return source.get(key) == value.strip('"')
+            if t.startswith("name:"):
+                return t[5:].strip('"') in name
+            raise exceptions.InvalidArgument(f"Unsupported filter term: {t}")
+
+        return any(
+            all(term(t) for t in clause.split(" AND "))
+            for clause in expression.split(" OR ")
+        )
+
+    @staticmethod
+    def _page(items: List, request: Dict, field: str) -> Pager:
+        page_size = request.get("page_size") or 25000
+
+        def fetch_page(token: str) -> Page:
+            offset = int(token or request.get("page_token") or 0)
+            end = offset + page_size
+            next_token = str(end) if end < len(items) else ""
+            return Page(items[offset:end], next_token, field)
+
+        return Pager(fetch_page, field)
+
+    # Secrets
+
+    def create_secret(self, request: Dict, **kwargs) -> EmulatedSecret:
+        self._enter("create_secret", kwargs.get("timeout"))
+        name = f"{request['parent']}/secrets/{request['secret_id']}"
+        spec = request.get("secret", {})
+        with self._lock:
+            if name in self._secrets:
+                raise exceptions.AlreadyExists(f"Secret [{name}] already exists.")
+            secret = EmulatedSecret(
+                name,
+                dict(spec.get("labels", {})),
+                dict(spec.get("annotations", {})),
+                datetime.now(timezone.utc)
+            )
+            self._secrets[name] = secret
+            return secret.copy()
+
+    def get_secret(self, request: Dict, **kwargs) -> EmulatedSecret:
+        self._enter("get_secret", kwargs.get("timeout"))
+        with self._lock:
+            return self._secret(request["name"]).copy()
+
+    def update_secret(self, request: Dict, **kwargs) -> EmulatedSecret:
+        self._enter("update_secret", kwargs.get("timeout"))
+        spec = request["secret"]
+        with self._lock:
+            secret = self._secret(spec["name"])
+            for path in request.get("update_mask", {}).get("paths", []):
+                if path not in ("labels", "annotations"):
+                    raise exceptions.InvalidArgument(f"Unsupported update mask path: {path}")
+                setattr(secret, path, dict(spec.get(path, {})))
+            return secret.copy()
+
+    def delete_secret(self, request: Dict, **kwargs):
+        self._enter("delete_secret", kwargs.get("timeout"))
+        with self._lock:
+            self._secret(request["name"])
+            del self._secrets[request["name"]]
+
+    def list_secrets(self, request: Dict, **kwargs) -> Pager:
+        self._enter("list_secrets", kwargs.get("timeout"))
+        prefix = f"{request['parent']}/secrets/"
+        with self._lock:
+            items = [
+                s.copy() for name, s in sorted(self._secrets.items())
+                if name.startswith(prefix) and self._matches(s.labels, name, s.annotations, request.get("filter"))
+            ]
+        return self._page(items, request, "secrets")
+
+    # Versions
+
+    def add_secret_version(self, request: Dict, **kwargs) -> EmulatedVersion:
+        self._enter("add_secret_version", kwargs.get("timeout"))
+        with self._lock:
+            secret = self._secret(request["parent"])
+            version = EmulatedVersion(
+                f"{secret.name}/versions/{len(secret.versions) + 1}",
+                bytes(request["payload"]["data"]),
+                datetime.now(timezone.utc)
+            )
+            secret.versions.append(version)
+            return version.copy()
+
+    def access_secret_version(self, request: Dict, **kwargs) -> AccessResponse:
+        self._enter("access_secret_version", kwargs.get("timeout"))
+        with self._lock:
+            version = self._version(request["name"])
+            if version.state != State.ENABLED:
+                raise exceptions.FailedPrecondition(f"Secret Version [{version.name}] is in {version.state.name} state.")
+            return AccessResponse(version.name, version.data)
+
+    def get_secret_version(self, request: Dict, **kwargs) -> EmulatedVersion:
+        self._enter("get_secret_version", kwargs.get("timeout"))
+        with self._lock:
+            return self._version(request["name"]).copy()
+
+    def list_secret_versions(self, request: Dict, **kwargs) -> Pager:
+        self._enter("list_secret_versions", kwargs.get("timeout"))
+        # Supports "state:ENABLED" and "state:ENABLED OR state:DISABLED"
+        expression = request.get("filter") or ""
+        states = {t.strip().replace("state:", "") for t in expression.split(" OR ") if t.strip()}
+        with self._lock:
+            secret = self._secret(request["parent"])
+            # Newest first, as the real API returns them
+            items = [
+                v.copy() for v in reversed(secret.versions)
+                if not states or v.state.name in states
+            ]
+        return self._page(items, request, "versions")
+
+    def _set_state(self, method: str, request: Dict, state, timeout: Optional[float] = None) -> EmulatedVersion:
+        self._enter(method, timeout)
+        with self._lock:
+            version = self._version(request["name"])
+            if version.state == State.DESTROYED:
+                raise exceptions.FailedPrecondition(f"Secret Version [{version.name}] is destroyed.")
+            version.state = state
+            if state == State.DESTROYED:
+                version.data = None
+                version.destroy_time = datetime.now(timezone.utc)
+            return version.copy()
+
+    def enable_secret_version(self, request: Dict, **kwargs) -> EmulatedVersion:
+        return self._set_state("enable_secret_version", request, State.ENABLED, kwargs.get("timeout"))
+
+    def disable_secret_version(self, request: Dict, **kwargs) -> EmulatedVersion:
+        return self._set_state("disable_secret_version", request, State.DISABLED, kwargs.get("timeout"))
+
+    def destroy_secret_version(self, request: Dict, **kwargs) -> EmulatedVersion:
+        return self._set_state("destroy_secret_version", request, State.DESTROYED, kwargs.get("timeout"))
@@ -0,0 +1,72 @@
+# app/events.py
+import asyncio
+from collections import deque
+from itertools import islice
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class EventLog:
+    """Bounded, in-process feed of app changes with sequence numbers.
+
+    Events carry metadata only (never credentials); a consumer that sees a
+    rotation fetches the new credentials once. Waiters share a single
+    asyncio.Event that is swapped on every publish, so thousands of idle
+    long-poll or SSE connections cost one wakeup per event rather than a
+    Secret Manager call per poll.
+    """
+
+    def __init__(self, max_events: int = 10000):
+        self._events: Deque[Dict] = deque(maxlen=max_events)
+        self._changed = asyncio.Event()
+        self.last_seq = 0
+
+    def publish(self, event_type: str, app_name: str, **fields) -> Dict:
+        self.last_seq += 1
+        event = {
+            "seq": self.last_seq,
+            "type": event_type,
+            "app_name": app_name,
+            "timestamp": datetime.now().isoformat(),
+            **fields
+        }
+        self._events.append(event)
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+        return event
+
+    def since(self, seq: int, app_name: Optional[str] = None, limit: int = 1000) -> Tuple[List[Dict], bool]:
+        """Events after seq, oldest first, and whether some were missed.
+
+        ``reset`` is True when seq is older than the buffer or newer than
+        anything published (the process restarted); the consumer should
+        re-read current state and continue from last_seq.
+        """
+        # Sequence numbers are contiguous, so the buffer position is direct
+        first_seq = self._events[0]["seq"] if self._events else self.last_seq + 1
+        reset = seq > self.last_seq or seq < first_seq - 1
+        start = max(0, seq - first_seq + 1)
+        events = []
+        for event in islice(self._events, start, None):
+            if app_name is None or event["app_name"] == app_name:
+                events.append(event)
+                if len(events) >= limit:
+                    break
+        return events, reset
+
+    async def wait(
+        self, seq: int, timeout: float, app_name: Optional[str] = None, limit: int = 1000
+    ) -> Tuple[List[Dict], bool]:
+        """Like since(), but waits up to timeout seconds for a matching event"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            changed = self._changed
+            events, reset = self.since(seq, app_name, limit)
+            remaining = deadline - loop.time()
+            if events or reset or remaining <= 0:
+                return events, reset
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
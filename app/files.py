@@ -0,0 +1,24 @@
+# app/files.py
+import json
+import os
+import tempfile
+from typing import Any
+
+
+def atomic_write_json(path: str, data: Any):
+    """Write data as JSON to path so readers see the old or new file, never a mix.
+
+    The JSON goes to a uniquely named temp file in the same directory, so
+    several processes saving at once never share one, and is then renamed
+    over path. The temp file is removed if anything fails.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    f = tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False)
+    try:
+        with f:
+            json.dump(data, f)
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
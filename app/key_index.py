@@ -0,0 +1,114 @@
+# app/key_index.py
+import hashlib
+import heapq
+import hmac
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class KeyEntry:
+    __slots__ = ("app_name", "secret_digest", "expires_at")
+
+    def __init__(self, app_name: str, secret_digest: Optional[bytes], expires_at: Optional[float] = None):
+        self.app_name = app_name
+        self.secret_digest = secret_digest
+        self.expires_at = expires_at
+
+
+class KeyIndex:
+    """In-memory map from consumer_key to the app that owns it.
+
+    Secrets are held only as HMAC-SHA256 digests under a per-process random
+    key and compared with hmac.compare_digest, so a validation costs one
+    dict lookup and one hash whatever the number of apps. When an app's key
+    changes the previous key stays valid for ``grace_seconds``.
+    """
+
+    def __init__(self, grace_seconds: float = 0):
+        self.grace_seconds = grace_seconds
+        self._hash_key = os.urandom(32)
+        self._keys: Dict[str, KeyEntry] = {}
+        # app_name -> current consumer_key
+        self._current: Dict[str, str] = {}
+        # (expires_at, consumer_key) heap of keys inside their grace window;
+        # entries for keys replaced or removed since are skipped when popped
+        self._retiring: List[Tuple[float, str]] = []
+
+    def _digest(self, secret: str) -> bytes:
+        return hmac.new(self._hash_key, secret.encode("utf-8"), hashlib.sha256).digest()
+
+    def put(self, app_name: str, consumer_key: str, consumer_secret: Optional[str]):
+        """Make consumer_key the app's current key, retiring the previous one"""
+        self.prune()
+        previous = self._current.get(app_name)
+        if previous == consumer_key:
+            entry = self._keys[consumer_key]
+            if consumer_secret is not None:
+                entry.secret_digest = self._digest(consumer_secret)
+            return
+        if previous is not None:
+            self._retire(previous)
+        self._keys[consumer_key] = KeyEntry(
+            app_name, self._digest(consumer_secret) if consumer_secret is not None else None
+        )
+        self._current[app_name] = consumer_key
+
+    def _retire(self, consumer_key: str):
+        entry = self._keys.get(consumer_key)
+        if entry is None:
+            return
+        if self.grace_seconds <= 0:
+            del self._keys[consumer_key]
+            return
+        entry.expires_at = time.monotonic() + self.grace_seconds
+        heapq.heappush(self._retiring, (entry.expires_at, consumer_key))
+
+    def current_key(self, app_name: str) -> Optional[str]:
+        return self._current.get(app_name)
+
+    def remove(self, app_name: str):
+        """Drop every key of an app immediately"""
+        consumer_key = self._current.pop(app_name, None)
+        if consumer_key is not None:
+            self._keys.pop(consumer_key, None)
+        for _, retiring in self._retiring:
+            entry = self._keys.get(retiring)
+            if entry is not None and entry.app_name == app_name:
+                del self._keys[retiring]
+
+    def prune(self):
+        """Drop keys whose grace window has passed"""
+        now = time.monotonic()
+        while self._retiring and self._retiring[0][0] <= now:
+            expires_at, consumer_key = heapq.heappop(self._retiring)
+            entry = self._keys.get(consumer_key)
+            if entry is not None and entry.expires_at == expires_at:
+                del self._keys[consumer_key]
+
+    def lookup(self, consumer_key: str) -> Optional[KeyEntry]:
+        entry = self._keys.get(consumer_key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            return None
+        return entry
+
+    def validate(self, consumer_key: str, consumer_secret: Optional[str] = None) -> Dict:
+        """Who owns consumer_key and, if a secret is given, whether it matches"""
+        entry = self.lookup(consumer_key)
+        if entry is None:
+            return {"valid": False, "reason": "unknown_key"}
+        result = {"app_name": entry.app_name, "current": entry.expires_at is None}
+        if consumer_secret is not None:
+            if entry.secret_digest is None:
+                return {"valid": False, "reason": "secret_unknown", **result}
+            if not hmac.compare_digest(entry.secret_digest, self._digest(consumer_secret)):
+                return {"valid": False, "reason": "secret_mismatch", **result}
+        return {"valid": True, **result}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, app_name: str) -> bool:
+        return app_name in self._current
@@ -1,12 +1,26 @@
 # app/main.py
+import time
+
+# Recorded first so startup logs can report import-to-ready time
+IMPORT_STARTED = time.perf_counter()
+
 import os
+import asyncio
+import copy
+import functools
+import hashlib
+import re
+import tempfile
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
+from typing import Dict, List, Optional, Set, Tuple, Union
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
-from google.cloud import secretmanager_v1
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from google.api_core import exceptions
 from pydantic import BaseModel, validator
 import logging
@@ -14,6 +28,35 @@ import json
 import uuid
 from pathlib import Path
 from dotenv import load_dotenv
+from app.cache import SecretCache, SingleFlight
+from app.apigee import create_apigee_client
+from app.compaction import CompactionWorker, VersionPolicy
+from app.clients import (
+    close_secret_manager_clients,
+    create_secret_manager_client,
+    default_project_id,
+    secret_backend
+)
+from app.events import EventLog
+from app.key_index import KeyIndex
+from app.metadata import metadata_annotations, metadata_from_annotations
+from app.metrics import (
+    REGISTRY,
+    MetricsMiddleware,
+    ROTATION_LAG,
+    ROTATIONS,
+    RPC_DURATION,
+    RPC_ERRORS,
+    RPC_IN_FLIGHT,
+    KEY_VALIDATIONS
+)
+from app.quota import BACKGROUND, in_lane
+from app.resilience import IDEMPOTENT_RPCS, RETRYABLE_ERRORS, shared_resilience
+from app.onboarding import IMPORT_FORMATS, ImportCheckpoint, iter_file_lines, iter_records, run_import
+from app.reconcile import ReconcileState, Reconciler
+from app.scheduler import RotationScheduler
+from app.sharding import Shard, default_replica_id
+from app.state_store import StateStore, create_state_store
 
 # Load environment variables
 load_dotenv()
@@ -22,15 +65,67 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
 
-# Ensure static directory exists
-os.makedirs(STATIC_DIR, exist_ok=True)
+# Secret Manager label grammar; anything else could change the meaning of
+# a list filter built from the labels
+LABEL_KEY_PATTERN = re.compile(r"^[a-z][a-z0-9_-]{0,62}$")
+LABEL_VALUE_PATTERN = re.compile(r"^[a-z0-9_-]{0,63}$")
+
+def check_labels(labels: Dict[str, str]):
+    """Raise ValueError unless every key and value is a valid label"""
+    for key, value in labels.items():
+        if not LABEL_KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Invalid label key: {key!r}")
+        if not LABEL_VALUE_PATTERN.fullmatch(value):
+            raise ValueError(f"Invalid value for label {key}: {value!r}")
 
 # Configuration
 class Config:
     ROTATION_PERIOD_DAYS = int(os.getenv("ROTATION_PERIOD_DAYS", "30"))
-    PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT")
+    PROJECT_ID = default_project_id()
     DEV_MODE = os.getenv("DEV_MODE", "true").lower() == "true"
     CREDENTIALS_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    SECRET_BACKEND = secret_backend()
+    SECRET_MANAGER_MAX_WORKERS = int(os.getenv("SECRET_MANAGER_MAX_WORKERS", "16"))
+    WARM_UP_CHANNEL = os.getenv("WARM_UP_CHANNEL", "true").lower() == "true"
+    LIST_CONCURRENCY = int(os.getenv("LIST_CONCURRENCY", "16"))
+    LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "100"))
+    SECRET_CACHE_MAX_ENTRIES = int(os.getenv("SECRET_CACHE_MAX_ENTRIES", "10000"))
+    SECRET_CACHE_TTL_SECONDS = float(os.getenv("SECRET_CACHE_TTL_SECONDS", "60"))
+    SECRET_CACHE_REVALIDATE = os.getenv("SECRET_CACHE_REVALIDATE", "false").lower() == "true"
+    ROTATION_SCHEDULER_ENABLED = os.getenv("ROTATION_SCHEDULER_ENABLED", "false").lower() == "true"
+    ROTATION_SCHEDULER_TICK_SECONDS = float(os.getenv("ROTATION_SCHEDULER_TICK_SECONDS", "30"))
+    ROTATION_SCHEDULER_WORKERS = int(os.getenv("ROTATION_SCHEDULER_WORKERS", "4"))
+    ROTATION_SCHEDULER_BATCH_SIZE = int(os.getenv("ROTATION_SCHEDULER_BATCH_SIZE", "500"))
+    BATCH_ROTATE_CONCURRENCY = int(os.getenv("BATCH_ROTATE_CONCURRENCY", "16"))
+    STATE_STORE = os.getenv("STATE_STORE", "sqlite")
+    STATE_STORE_PATH = os.getenv("STATE_STORE_PATH", str(BASE_DIR.parent / "state" / "key-manager.db"))
+    # How long a store call waits on another process's write before failing
+    STATE_STORE_BUSY_TIMEOUT_MS = int(os.getenv("STATE_STORE_BUSY_TIMEOUT_MS", "2000"))
+    ROTATION_SCHEDULER_STATE_PATH = os.getenv(
+        "ROTATION_SCHEDULER_STATE_PATH", str(BASE_DIR.parent / "state" / "rotation-schedule.json")
+    )
+    COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "false").lower() == "true"
+    COMPACTION_KEEP_ENABLED = int(os.getenv("COMPACTION_KEEP_ENABLED", "2"))
+    COMPACTION_DESTROY_AFTER_DAYS = float(os.getenv("COMPACTION_DESTROY_AFTER_DAYS", "30"))
+    COMPACTION_CALLS_PER_SECOND = float(os.getenv("COMPACTION_CALLS_PER_SECOND", "5"))
+    COMPACTION_BATCH_SIZE = int(os.getenv("COMPACTION_BATCH_SIZE", "10"))
+    COMPACTION_INTERVAL_SECONDS = float(os.getenv("COMPACTION_INTERVAL_SECONDS", "86400"))
+    KEY_ROTATION_GRACE_SECONDS = float(os.getenv("KEY_ROTATION_GRACE_SECONDS", "3600"))
+    KEY_INDEX_PRELOAD = os.getenv("KEY_INDEX_PRELOAD", "false").lower() == "true"
+    EVENT_BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", "10000"))
+    EVENT_POLL_MAX_SECONDS = float(os.getenv("EVENT_POLL_MAX_SECONDS", "60"))
+    EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+    IMPORT_CONCURRENCY = int(os.getenv("IMPORT_CONCURRENCY", "16"))
+    IMPORT_CHECKPOINT_DIR = os.getenv("IMPORT_CHECKPOINT_DIR", str(BASE_DIR.parent / "state" / "imports"))
+    REPLICA_ID = default_replica_id()
+    REPLICAS = [r.strip() for r in os.getenv("REPLICAS", "").split(",") if r.strip()]
+    ROTATION_LEASE_SECONDS = float(os.getenv("ROTATION_LEASE_SECONDS", "120"))
+    RECONCILE_ENABLED = os.getenv("RECONCILE_ENABLED", "false").lower() == "true"
+    RECONCILE_INTERVAL_SECONDS = float(os.getenv("RECONCILE_INTERVAL_SECONDS", "300"))
+    RECONCILE_CONCURRENCY = int(os.getenv("RECONCILE_CONCURRENCY", "16"))
+    RECONCILE_FULL_EVERY = int(os.getenv("RECONCILE_FULL_EVERY", "12"))
+    RECONCILE_ORPHANS = os.getenv("RECONCILE_ORPHANS", "report").lower()
+    RECONCILE_STATE_PATH = os.getenv("RECONCILE_STATE_PATH", str(BASE_DIR.parent / "state" / "reconcile.json"))
 
 # Configure logging
 logging.basicConfig(
@@ -47,6 +142,75 @@ class AppSecret(BaseModel):
     last_rotated: datetime
     next_rotation: datetime
 
+    @classmethod
+    def from_secret_data(cls, app_name: str, secret_data: Dict) -> "AppSecret":
+        """Build an AppSecret from a stored secret payload"""
+        return cls(
+            app_name=app_name,
+            consumer_key=secret_data["credentials"]["key"],
+            consumer_secret=secret_data["credentials"]["secret"],
+            last_rotated=datetime.fromisoformat(secret_data["metadata"]["last_rotated"]),
+            next_rotation=datetime.fromisoformat(secret_data["metadata"]["next_rotation"])
+        )
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "AppSecret":
+        """Build an AppSecret from a state store record"""
+        return cls(
+            app_name=record["app_name"],
+            consumer_key=record["consumer_key"],
+            consumer_secret=record["consumer_secret"],
+            last_rotated=record["last_rotated"],
+            next_rotation=record["next_rotation"]
+        )
+
+class AppMetadata(BaseModel):
+    app_name: str
+    last_rotated: Optional[datetime] = None
+    next_rotation: Optional[datetime] = None
+    rotation_period_days: Optional[int] = None
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "AppMetadata":
+        return cls(
+            app_name=record["app_name"],
+            last_rotated=record["last_rotated"],
+            next_rotation=record["next_rotation"],
+            rotation_period_days=record["rotation_period_days"]
+        )
+
+class ListError(BaseModel):
+    app_name: Optional[str] = None
+    secret_name: str
+    error: str
+
+class AppListing(BaseModel):
+    apps: List[AppSecret]
+    errors: List[ListError]
+    next_page_token: Optional[str] = None
+
+class BatchRotateRequest(BaseModel):
+    app_names: Optional[List[str]] = None
+    labels: Optional[Dict[str, str]] = None
+    concurrency: Optional[int] = None
+    only_owned: bool = False
+
+    @validator('labels')
+    def validate_labels(cls, v):
+        if v is not None:
+            check_labels(v)
+        return v
+
+    @validator('concurrency')
+    def validate_concurrency(cls, v):
+        if v is not None and v < 1:
+            raise ValueError("Concurrency must be at least 1")
+        return v
+
+class KeyValidationRequest(BaseModel):
+    consumer_key: str
+    consumer_secret: Optional[str] = None
+
 class RotationSchedule(BaseModel):
     app_name: str
     rotation_period_days: int
@@ -59,34 +223,192 @@ class RotationSchedule(BaseModel):
             raise ValueError("Rotation period cannot exceed 365 days")
         return v
 
+def version_number(version_name: Optional[str]) -> int:
+    """Numeric id at the end of a version resource name (0 if unknown)"""
+    suffix = (version_name or "").rsplit("/", 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
 class SecretManager:
-    def __init__(self, project_id: str):
-        """Initialize Secret Manager with project ID"""
+    def __init__(self, project_id: str, max_workers: int = Config.SECRET_MANAGER_MAX_WORKERS):
+        """Initialize Secret Manager with project ID.
+
+        The client is not built here: resolving credentials and opening a
+        channel happens on first use or in warm_up(), never at import time.
+        """
         self.project_id = project_id
-        self.client = secretmanager_v1.SecretManagerServiceClient()
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.ready = False
+        self.warm_up_error = None
         self.parent = f"projects/{project_id}"
+        # The client is synchronous; every RPC runs on this bounded pool so a
+        # slow call never blocks the event loop.
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="secret-manager"
+        )
+        self.cache = SecretCache(
+            max_entries=Config.SECRET_CACHE_MAX_ENTRIES,
+            ttl_seconds=Config.SECRET_CACHE_TTL_SECONDS
+        )
+        # Apps whose secret is known to exist, so writes can go straight to
+        # add_secret_version. Entries are dropped when a call returns
+        # NotFound, which covers secrets deleted outside the service.
+        self.known_secrets: Set[str] = set()
+        # Concurrent reads of one app share a single backend call
+        self.reads = SingleFlight()
+        # Deadlines, retries, circuit breaker and hedging for every RPC
+        self.resilience = shared_resilience()
+        # Annotation updates waiting to be written, latest per secret
+        self._pending_annotations: Dict[str, Dict[str, str]] = {}
+        # Updates whose write failed; retried on the next flush
+        self._failed_annotations: Dict[str, Dict[str, str]] = {}
+        self._annotation_task: Optional[asyncio.Task] = None
         logger.info(f"Initialized Secret Manager for project: {project_id}")
 
-    def create_secret(self, app_name: str, credentials: dict, rotation_period_days: int) -> str:
-        """Create a new secret in Google Secret Manager"""
+    @property
+    def client(self):
+        """Secret Manager client, built on first use"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = create_secret_manager_client()
+        return self._client
+
+    async def warm_up(self, probe: bool = True):
+        """Build the client on the executor and optionally open its channel"""
+        started = time.perf_counter()
         try:
-            secret_id = f"apigee-key-{app_name}"
-            
-            # Prepare secret data
-            secret_data = {
-                "credentials": credentials,
-                "metadata": {
-                    "app_name": app_name,
-                    "created_at": datetime.now().isoformat(),
-                    "last_rotated": datetime.now().isoformat(),
-                    "next_rotation": (datetime.now() + timedelta(days=rotation_period_days)).isoformat(),
-                    "rotation_period_days": rotation_period_days
-                }
+            await self._call(lambda **options: self.client, rpc="connect")
+            if probe:
+                request = {"parent": self.parent, "page_size": 1}
+                await self._call(
+                    lambda **options: next(iter(self.client.list_secrets(request=request, **options).pages)),
+                    rpc="list_secrets"
+                )
+            self.ready = True
+            logger.info(f"Secret Manager ready in {round((time.perf_counter() - started) * 1000)} ms")
+        except Exception as e:
+            self.warm_up_error = str(e)
+            logger.error(f"Secret Manager warm-up failed: {str(e)}")
+
+    def secret_path(self, app_name: str) -> str:
+        """Resource name of an app's secret"""
+        return f"{self.parent}/secrets/apigee-key-{app_name}"
+
+    async def _call(self, func, *args, rpc: Optional[str] = None, hedge: bool = False, **kwargs):
+        """Run a blocking client call on the executor and await its result.
+
+        ``func`` is either a client method name or a callable. The client is
+        looked up on the executor thread so building it never blocks the
+        event loop. ``rpc`` names the call in metrics; it defaults to the
+        method or function name. Calls run under the shared deadline and
+        circuit breaker; reads are retried on transient errors and, with
+        ``hedge``, raced against a second attempt when slow.
+
+        Each attempt passes ``timeout`` (the time left before the deadline)
+        and ``retry=None`` to the client, so the client neither outlives the
+        deadline nor retries underneath our own policy. Callables receive
+        them as keyword arguments to hand to the client method they wrap.
+        """
+        if isinstance(func, str):
+            method = func
+            func = lambda *a, **kw: getattr(self.client, method)(*a, **kw)
+            rpc = rpc or method
+        rpc = rpc or func.__name__
+        return await self.resilience.call(
+            lambda timeout: self._attempt(rpc, func, *args, timeout=timeout, retry=None, **kwargs),
+            rpc,
+            idempotent=rpc in IDEMPOTENT_RPCS,
+            hedge=hedge
+        )
+
+    async def _attempt(self, rpc: str, func, *args, **kwargs):
+        """One try of a call, with metrics"""
+        loop = asyncio.get_running_loop()
+        RPC_IN_FLIGHT.inc(rpc)
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(
+                self.executor, functools.partial(func, *args, **kwargs)
+            )
+        except Exception as e:
+            RPC_ERRORS.inc(rpc, type(e).__name__)
+            raise
+        finally:
+            RPC_IN_FLIGHT.dec(rpc)
+            RPC_DURATION.observe(time.perf_counter() - started, rpc)
+
+    def close(self):
+        """Release the executor threads"""
+        self.executor.shutdown(wait=False)
+
+    def forget(self, app_name: str):
+        """Drop what is known about an app's secret after a NotFound"""
+        self.known_secrets.discard(app_name)
+        self.cache.invalidate(app_name)
+        self.reads.forget(app_name)
+
+    @staticmethod
+    def _secret_data(app_name: str, credentials: dict, rotation_period_days: int) -> Dict:
+        now = datetime.now()
+        return {
+            "credentials": credentials,
+            "metadata": {
+                "app_name": app_name,
+                "created_at": now.isoformat(),
+                "last_rotated": now.isoformat(),
+                "next_rotation": (now + timedelta(days=rotation_period_days)).isoformat(),
+                "rotation_period_days": rotation_period_days
             }
+        }
 
+    async def _add_version(self, app_name: str, secret_data: Dict) -> str:
+        secret_id = f"apigee-key-{app_name}"
+        version = await self._call(
+            "add_secret_version",
+            request={
+                "parent": self.secret_path(app_name),
+                "payload": {"data": json.dumps(secret_data).encode("UTF-8")}
+            }
+        )
+        logger.info(f"Added new version for secret: {secret_id}")
+        self.cache.put(app_name, secret_data, version.name)
+        # Reads already in flight started before this write
+        self.reads.forget(app_name)
+        return version.name
+
+    async def create_secret(
+        self, app_name: str, credentials: dict, rotation_period_days: int, overwrite: bool = True
+    ) -> Optional[str]:
+        """Create a new secret in Google Secret Manager.
+
+        For a secret already in known_secrets the request path makes a
+        single add_secret_version call, and the annotation update is
+        queued; otherwise the secret is created first.
+        With overwrite=False an existing secret that already has a version
+        is left alone and None is returned.
+        """
+        secret_id = f"apigee-key-{app_name}"
+        secret_data = self._secret_data(app_name, credentials, rotation_period_days)
+        annotations = metadata_annotations(secret_data["metadata"])
+        try:
+            if app_name in self.known_secrets and not overwrite:
+                return None
+            if app_name in self.known_secrets:
+                try:
+                    version = await self._add_version(app_name, secret_data)
+                    self.queue_annotations(app_name, annotations)
+                    return version
+                except exceptions.NotFound:
+                    logger.warning(f"Secret for app {app_name} was deleted outside the service, recreating it")
+                    self.forget(app_name)
+
+            created = False
             try:
                 # Create new secret
-                self.client.create_secret(
+                await self._call(
+                    "create_secret",
                     request={
                         "parent": self.parent,
                         "secret_id": secret_id,
@@ -96,67 +418,362 @@ class SecretManager:
                                 "type": "apigee-key",
                                 "app": app_name,
                                 "created_by": "key-manager"
-                            }
+                            },
+                            "annotations": annotations
                         }
                     }
                 )
+                created = True
                 logger.info(f"Created new secret for app: {app_name}")
             except exceptions.AlreadyExists:
                 logger.info(f"Secret already exists for app: {app_name}")
+                if not overwrite and await self._has_version(app_name):
+                    self.known_secrets.add(app_name)
+                    return None
 
-            # Add new version
-            secret_path = f"{self.parent}/secrets/{secret_id}"
-            version = self.client.add_secret_version(
-                request={
-                    "parent": secret_path,
-                    "payload": {"data": json.dumps(secret_data).encode("UTF-8")}
-                }
-            )
-            
-            logger.info(f"Added new version for secret: {secret_id}")
-            return version.name
+            version = await self._add_version(app_name, secret_data)
+            self.known_secrets.add(app_name)
+            if not created:
+                # Keep the listable copy of the metadata in step with the payload
+                self.queue_annotations(app_name, annotations)
+            return version
 
         except Exception as e:
             logger.error(f"Error creating secret for {app_name}: {str(e)}")
+            self.cache.invalidate(app_name)
+            raise
+
+    async def _has_version(self, app_name: str) -> bool:
+        # A secret can exist without versions if an earlier create was
+        # interrupted between create_secret and add_secret_version
+        try:
+            await self._call("get_secret_version", request={"name": f"{self.secret_path(app_name)}/versions/latest"})
+            return True
+        except exceptions.NotFound:
+            return False
+
+    async def add_version(self, app_name: str, credentials: dict, rotation_period_days: int) -> str:
+        """Store new credentials on an existing secret with one add_secret_version call.
+
+        Raises a 404 if the secret no longer exists.
+        """
+        secret_data = self._secret_data(app_name, credentials, rotation_period_days)
+        try:
+            version = await self._add_version(app_name, secret_data)
+        except exceptions.NotFound:
+            self.forget(app_name)
+            logger.error(f"Secret not found for app: {app_name}")
+            raise HTTPException(status_code=404, detail=f"Secret not found for app: {app_name}")
+        except Exception as e:
+            logger.error(f"Error adding version for {app_name}: {str(e)}")
+            self.cache.invalidate(app_name)
             raise
+        self.known_secrets.add(app_name)
+        self.queue_annotations(app_name, metadata_annotations(secret_data["metadata"]))
+        return version
+
+    def queue_annotations(self, app_name: str, annotations: Dict[str, str]):
+        """Mirror metadata onto the secret's annotations off the request path.
+
+        Updates are coalesced per secret, so a burst of rotations of one app
+        costs one update_secret call. Until it lands, payload-free listings
+        may show the previous rotation's timestamps.
+        """
+        self._pending_annotations[app_name] = annotations
+        if self._annotation_task is None or self._annotation_task.done():
+            self._annotation_task = asyncio.create_task(self.flush_annotations())
+
+    @property
+    def annotations_lagging(self) -> bool:
+        """Whether some secret's annotations are behind its latest version"""
+        return bool(self._pending_annotations or self._failed_annotations)
+
+    async def flush_annotations(self):
+        """Write every queued annotation update, retrying earlier failures"""
+        for app_name, annotations in self._failed_annotations.items():
+            self._pending_annotations.setdefault(app_name, annotations)
+        self._failed_annotations = {}
+        while self._pending_annotations:
+            pending, self._pending_annotations = self._pending_annotations, {}
+            await asyncio.gather(*(self._write_annotations(name, a) for name, a in pending.items()))
 
-    async def get_secret(self, app_name: str) -> Dict:
-        """Get the latest version of a secret"""
+    async def _write_annotations(self, app_name: str, annotations: Dict[str, str]):
+        try:
+            await self._call(
+                "update_secret",
+                request={
+                    "secret": {"name": self.secret_path(app_name), "annotations": annotations},
+                    "update_mask": {"paths": ["annotations"]}
+                }
+            )
+        except exceptions.NotFound:
+            self.forget(app_name)
+        except Exception as e:
+            logger.error(f"Could not update annotations for {app_name}: {str(e)}")
+            self._failed_annotations[app_name] = annotations
+
+    async def get_secret(self, app_name: str, use_cache: bool = True) -> Dict:
+        """Get the latest version of a secret.
+
+        Reads go through the payload cache. With SECRET_CACHE_REVALIDATE set,
+        an expired entry is kept if the latest version name still matches,
+        which costs a metadata read instead of an access call. On a miss,
+        concurrent reads of the same app share one backend call.
+        """
         try:
             secret_id = f"apigee-key-{app_name}"
             name = f"{self.parent}/secrets/{secret_id}/versions/latest"
-            response = self.client.access_secret_version(request={"name": name})
-            return json.loads(response.payload.data.decode("UTF-8"))
+            if use_cache:
+                cached = self.cache.get(app_name)
+                if cached is not None:
+                    return cached
+
+            async def fetch() -> Dict:
+                stale = self.cache.peek(app_name)
+                if stale is not None and stale.version and Config.SECRET_CACHE_REVALIDATE:
+                    latest = await self._call(
+                        "get_secret_version", request={"name": name}
+                    )
+                    if latest.name == stale.version:
+                        return self.cache.revalidate(app_name)
+                response = await self._call(
+                    "access_secret_version", request={"name": name}, hedge=True
+                )
+                secret_data = json.loads(response.payload.data.decode("UTF-8"))
+                current = self.cache.peek(app_name)
+                # A write that landed while this read was in flight wins
+                if current is None or version_number(current.version) <= version_number(response.name):
+                    self.cache.put(app_name, secret_data, response.name)
+                self.known_secrets.add(app_name)
+                return secret_data
+
+            try:
+                return await self.reads.do(app_name, fetch)
+            except RETRYABLE_ERRORS as e:
+                stale = self.cache.peek(app_name) if use_cache else None
+                if stale is None:
+                    raise
+                # Backend degraded or circuit open: expired credentials beat none
+                logger.warning(f"Serving cached secret for {app_name} after {type(e).__name__}")
+                return copy.deepcopy(stale.value)
         except exceptions.NotFound:
+            self.forget(app_name)
             logger.error(f"Secret not found for app: {app_name}")
             raise HTTPException(status_code=404, detail=f"Secret not found for app: {app_name}")
         except Exception as e:
             logger.error(f"Error getting secret for {app_name}: {str(e)}")
             raise
 
-    async def list_secrets(self) -> List[Dict]:
-        """List all secrets with their metadata"""
+    @in_lane(BACKGROUND)
+    async def list_secrets(self, concurrency: Optional[int] = None) -> Tuple[List[Dict], List[Dict]]:
+        """List all secrets with their metadata.
+
+        Payloads are fetched concurrently, at most ``concurrency`` at a time.
+        Returns the secret payloads (each tagged with its ``app_name``) and a
+        list of per-secret errors.
+        """
         try:
-            secrets = []
             request = {"parent": self.parent, "filter": "labels.type=apigee-key"}
             
-            for secret in self.client.list_secrets(request=request):
-                try:
-                    app_name = secret.labels.get("app")
-                    if app_name:
-                        secret_data = await self.get_secret(app_name)
-                        secrets.append(secret_data)
-                except Exception as e:
-                    logger.error(f"Error processing secret {secret.name}: {str(e)}")
-                    continue
-
-            return secrets
+            # Iterating the pager fetches further pages over the network,
+            # so drain it on the executor as well.
+            listed = await self._call(
+                lambda **options: list(self.client.list_secrets(request=request, **options)), rpc="list_secrets"
+            )
+            return await self.fetch_payloads(listed, concurrency)
         except Exception as e:
             logger.error(f"Error listing secrets: {str(e)}")
             raise
 
+    @in_lane(BACKGROUND)
+    async def list_secrets_page(
+        self,
+        page_size: int,
+        page_token: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ) -> Tuple[List[Dict], List[Dict], Optional[str]]:
+        """Fetch one page of secrets and their payloads.
+
+        Returns the payloads, per-secret errors and the token of the next
+        page (None on the last page).
+        """
+        request = {
+            "parent": self.parent,
+            "filter": "labels.type=apigee-key",
+            "page_size": page_size,
+            "page_token": page_token or ""
+        }
+
+        def fetch_page(**options):
+            page = next(iter(self.client.list_secrets(request=request, **options).pages))
+            return list(page.secrets), page.next_page_token
+
+        try:
+            listed, next_page_token = await self._call(fetch_page, rpc="list_secrets")
+            secrets, errors = await self.fetch_payloads(listed, concurrency)
+            return secrets, errors, next_page_token or None
+        except Exception as e:
+            logger.error(f"Error listing secrets page: {str(e)}")
+            raise
+
+    async def fetch_payloads(self, listed: List, concurrency: Optional[int] = None) -> Tuple[List[Dict], List[Dict]]:
+        """Read the latest payload of each listed secret, ``concurrency`` at a time"""
+        semaphore = asyncio.Semaphore(concurrency or Config.LIST_CONCURRENCY)
+
+        async def fetch(secret):
+            app_name = secret.labels.get("app")
+            if not app_name:
+                return None, None
+            async with semaphore:
+                try:
+                    secret_data = await self.get_secret(app_name)
+                    secret_data.setdefault("metadata", {})["app_name"] = app_name
+                    return secret_data, None
+                except Exception as e:
+                    detail = e.detail if isinstance(e, HTTPException) else str(e)
+                    logger.error(f"Error processing secret {secret.name}: {detail}")
+                    return None, {"app_name": app_name, "secret_name": secret.name, "error": detail}
+
+        secrets, errors = [], []
+        for secret_data, error in await asyncio.gather(*(fetch(s) for s in listed)):
+            if secret_data is not None:
+                secrets.append(secret_data)
+            if error is not None:
+                errors.append(error)
+
+        return secrets, errors
+
+    @in_lane(BACKGROUND)
+    async def list_metadata(
+        self,
+        page_size: Optional[int] = None,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """List rotation metadata from secret annotations, without reading payloads.
+
+        Secrets written before metadata was annotated are returned with only
+        ``app_name`` and ``secret_name`` set. Without ``page_size`` every
+        page is read and the returned token is None.
+        """
+        request = {"parent": self.parent, "filter": "labels.type=apigee-key"}
+        if page_size:
+            request.update({"page_size": page_size, "page_token": page_token or ""})
+
+        def fetch(**options):
+            pager = self.client.list_secrets(request=request, **options)
+            if not page_size:
+                return list(pager), None
+            page = next(iter(pager.pages))
+            return list(page.secrets), page.next_page_token or None
+
+        listed, next_page_token = await self._call(fetch, rpc="list_secrets")
+        results = []
+        for secret in listed:
+            app_name = secret.labels.get("app")
+            if not app_name:
+                continue
+            self.known_secrets.add(app_name)
+            metadata = metadata_from_annotations(secret.annotations, app_name) or {"app_name": app_name}
+            metadata["secret_name"] = secret.name
+            results.append(metadata)
+        return results, next_page_token
+
+    async def latest_version(self, app_name: str, use_cache: bool = True) -> str:
+        """Name of the newest version, from a fresh cache entry or a metadata read.
+
+        The metadata read does not touch the payload; if it matches an
+        expired cache entry that entry is marked fresh again.
+        """
+        cached = self.cache.fresh_version(app_name) if use_cache else None
+        if cached:
+            return cached
+        latest = await self._call(
+            "get_secret_version", request={"name": f"{self.secret_path(app_name)}/versions/latest"}
+        )
+        stale = self.cache.peek(app_name)
+        if stale is not None and stale.version == latest.name:
+            self.cache.revalidate(app_name)
+        return latest.name
+
+    @in_lane(BACKGROUND)
+    async def list_versions(self, app_name: str) -> List:
+        """Enabled and disabled versions of an app's secret, newest first"""
+        request = {"parent": self.secret_path(app_name), "filter": "state:ENABLED OR state:DISABLED"}
+        return await self._call(
+            lambda **options: list(self.client.list_secret_versions(request=request, **options)),
+            rpc="list_secret_versions"
+        )
+
+    async def delete_secret(self, app_name: str):
+        """Delete an app's secret and every version of it"""
+        await self._call("delete_secret", request={"name": self.secret_path(app_name)})
+        self.forget(app_name)
+
+    async def set_version_state(self, version_name: str, action: str):
+        """Disable, enable or destroy one secret version"""
+        await self._call(f"{action}_secret_version", request={"name": version_name})
+
+    @in_lane(BACKGROUND)
+    async def list_app_names(self, labels: Optional[Dict[str, str]] = None) -> List[str]:
+        """List app names whose secrets match the given labels, without reading payloads"""
+        check_labels(labels or {})
+        filters = ["labels.type=apigee-key"]
+        filters += [f"labels.{key}={value}" for key, value in (labels or {}).items()]
+        request = {"parent": self.parent, "filter": " AND ".join(filters)}
+        listed = await self._call(
+            lambda **options: list(self.client.list_secrets(request=request, **options)), rpc="list_secrets"
+        )
+        return [secret.labels["app"] for secret in listed if secret.labels.get("app")]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background services without holding up the first request.
+
+    Building the Secret Manager client (credential discovery, gRPC channel)
+    and seeding the rotation index both run as tasks; requests arriving
+    earlier build the client on first use. /health reports "starting"
+    until warm-up finishes.
+    """
+    global rotation_scheduler
+    tasks = []
+    if secret_manager:
+        tasks.append(asyncio.create_task(secret_manager.warm_up(probe=Config.WARM_UP_CHANNEL)))
+    if Config.ROTATION_SCHEDULER_ENABLED:
+        rotation_scheduler = RotationScheduler(
+            rotate=scheduled_rotation,
+            state_path=Config.ROTATION_SCHEDULER_STATE_PATH,
+            tick_seconds=Config.ROTATION_SCHEDULER_TICK_SECONDS,
+            max_workers=Config.ROTATION_SCHEDULER_WORKERS,
+            batch_size=Config.ROTATION_SCHEDULER_BATCH_SIZE,
+            owns=shard.owns
+        )
+        tasks.append(asyncio.create_task(rotation_scheduler.start(seed=load_rotation_schedule)))
+    if compaction_worker and Config.COMPACTION_ENABLED:
+        compaction_worker.start()
+    if Config.RECONCILE_ENABLED:
+        get_reconciler().start()
+    tasks.append(asyncio.create_task(load_key_index()))
+    logger.info(f"Accepting requests {round((time.perf_counter() - IMPORT_STARTED) * 1000)} ms after import")
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if rotation_scheduler:
+            await rotation_scheduler.stop()
+        if compaction_worker:
+            await compaction_worker.stop()
+        if reconciler:
+            await reconciler.stop()
+        if secret_manager:
+            await secret_manager.flush_annotations()
+            secret_manager.close()
+        close_secret_manager_clients()
+        key_manager.store.close()
+
 # Initialize FastAPI app
-app = FastAPI(title="ApigeeX Key Manager")
+app = FastAPI(title="ApigeeX Key Manager", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -167,6 +784,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and in-flight metrics
+app.add_middleware(MetricsMiddleware, routes_source=app)
+
 # Initialize Secret Manager
 secret_manager = None
 if not Config.DEV_MODE and Config.PROJECT_ID:
@@ -177,12 +797,90 @@ if not Config.DEV_MODE and Config.PROJECT_ID:
         logger.error(f"Failed to initialize Secret Manager: {str(e)}")
         raise
 
+# This replica's share of scheduled and bulk work; REPLICAS lists every
+# replica, and each app is owned by exactly one of them
+shard = Shard(Config.REPLICA_ID, Config.REPLICAS or None)
+
+# Automatic rotation scheduler, started on application startup when enabled
+rotation_scheduler = None
+
+# Old version pruning; built whenever Secret Manager is in use so single
+# apps can be compacted on demand, and run periodically when enabled
+compaction_worker = None
+if secret_manager:
+    async def owned_app_names() -> List[str]:
+        return [name for name in await secret_manager.list_app_names() if shard.owns(name)]
+
+    compaction_worker = CompactionWorker(
+        list_apps=owned_app_names,
+        list_versions=secret_manager.list_versions,
+        set_state=secret_manager.set_version_state,
+        policy=VersionPolicy(Config.COMPACTION_KEEP_ENABLED, Config.COMPACTION_DESTROY_AFTER_DAYS),
+        calls_per_second=Config.COMPACTION_CALLS_PER_SECOND,
+        batch_size=Config.COMPACTION_BATCH_SIZE,
+        interval_seconds=Config.COMPACTION_INTERVAL_SECONDS
+    )
+
 class ApigeeKeyManager:
-    def __init__(self):
-        self.apps_cache = {}
+    def __init__(self, store: StateStore):
+        # In DEV_MODE the store is the system of record. In production it is
+        # a warm metadata layer and never holds consumer secrets.
+        self.store = store
+        # consumer_key -> app, kept in step by remember() and forget()
+        self.key_index = KeyIndex(grace_seconds=Config.KEY_ROTATION_GRACE_SECONDS)
+        # Change feed for /events; create, rotate and forget publish to it
+        self.events = EventLog(max_events=Config.EVENT_BUFFER_SIZE)
+
+    async def remember(self, app_secret: AppSecret, rotation_period_days: int, version: Optional[str] = None):
+        """Record an app's current state in the store and the rotation schedule.
+
+        Without ``version`` the recorded one is kept if it belongs to the
+        same rotation, so the optimistic rotation check stays armed.
+        """
+        if version is None:
+            record = await self.store.call("get", app_secret.app_name)
+            if record and record["last_rotated"] == app_secret.last_rotated:
+                version = record.get("version")
+        await self.store.call("put", {
+            "app_name": app_secret.app_name,
+            "consumer_key": app_secret.consumer_key,
+            "consumer_secret": app_secret.consumer_secret if Config.DEV_MODE else None,
+            "last_rotated": app_secret.last_rotated,
+            "next_rotation": app_secret.next_rotation,
+            "rotation_period_days": rotation_period_days,
+            "version": version
+        })
+        self.key_index.put(app_secret.app_name, app_secret.consumer_key, app_secret.consumer_secret)
+        if rotation_scheduler:
+            rotation_scheduler.schedule(app_secret.app_name, app_secret.next_rotation)
 
-    async def create_app(self, app_name: str, rotation_period_days: int) -> AppSecret:
-        """Create a new app with initial credentials"""
+    def publish(self, event_type: str, app_secret: AppSecret, version: Optional[str] = None):
+        self.events.publish(
+            event_type,
+            app_secret.app_name,
+            last_rotated=app_secret.last_rotated.isoformat(),
+            next_rotation=app_secret.next_rotation.isoformat(),
+            version=version
+        )
+
+    async def forget(self, app_name: str):
+        """Drop an app whose secret no longer exists from the store and schedule"""
+        await self.store.call("delete", app_name)
+        self.key_index.remove(app_name)
+        self.events.publish("deleted", app_name)
+        if rotation_scheduler:
+            rotation_scheduler.unschedule(app_name)
+
+    async def stored_apps(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[AppSecret]:
+        """Apps held in the store, ordered by name (DEV_MODE)"""
+        return [AppSecret.from_record(r) for r in await self.store.call("list", limit=limit, after=after)]
+
+    async def create_app(self, app_name: str, rotation_period_days: int, overwrite: bool = True) -> Optional[AppSecret]:
+        """Create a new app with initial credentials.
+
+        With overwrite=False an app that already exists is left unchanged
+        and None is returned.
+        """
         try:
             # Generate initial credentials
             credentials = {
@@ -190,13 +888,19 @@ class ApigeeKeyManager:
                 "secret": f"secret-{uuid.uuid4()}"
             }
 
+            version = None
+            if Config.DEV_MODE and not overwrite and await self.store.call("get", app_name):
+                return None
             if not Config.DEV_MODE:
                 # Store in Secret Manager
-                secret_manager.create_secret(
+                version = await secret_manager.create_secret(
                     app_name=app_name,
                     credentials=credentials,
-                    rotation_period_days=rotation_period_days
+                    rotation_period_days=rotation_period_days,
+                    overwrite=overwrite
                 )
+                if version is None:
+                    return None
             
             # Create app secret object
             app_secret = AppSecret(
@@ -207,7 +911,8 @@ class ApigeeKeyManager:
                 next_rotation=datetime.now() + timedelta(days=rotation_period_days)
             )
 
-            self.apps_cache[app_name] = app_secret
+            await self.remember(app_secret, rotation_period_days, version)
+            self.publish("created", app_secret, version)
             logger.info(f"Successfully created app: {app_name}")
             return app_secret
 
@@ -216,7 +921,19 @@ class ApigeeKeyManager:
             raise HTTPException(status_code=500, detail=str(e))
 
     async def rotate_secret(self, app_name: str) -> AppSecret:
-        """Rotate API key and secret"""
+        """Rotate API key and secret.
+
+        A lease in the state store keeps two workers or processes from
+        rotating the same app at once; the loser gets a 409. With several
+        replicas the latest version is also checked against the one this
+        replica last wrote, so a rotation made elsewhere is never silently
+        overwritten.
+        """
+        lease = f"rotate:{app_name}"
+        owner = f"{Config.REPLICA_ID}:{uuid.uuid4()}"
+        if not await self.store.call("acquire_lease", lease, owner, Config.ROTATION_LEASE_SECONDS):
+            ROTATIONS.inc("conflict")
+            raise HTTPException(status_code=409, detail=f"Rotation of {app_name} is already in progress")
         try:
             # Generate new credentials
             new_credentials = {
@@ -224,17 +941,53 @@ class ApigeeKeyManager:
                 "secret": f"secret-{uuid.uuid4()}"
             }
 
-            if not Config.DEV_MODE:
+            rotation_period = Config.ROTATION_PERIOD_DAYS
+            previous_due = None
+            version = None
+            record = await self.store.call("get", app_name)
+            if not Config.DEV_MODE and record and record["rotation_period_days"] and app_name in secret_manager.known_secrets:
+                # Steady state: the period comes from the store and the secret
+                # is known to exist, so the request path makes one
+                # add_secret_version; the annotation update follows later
+                rotation_period = record["rotation_period_days"]
+                previous_due = record["next_rotation"]
+                if len(shard.members) > 1 and record.get("version"):
+                    latest = await secret_manager.latest_version(app_name, use_cache=False)
+                    if latest != record["version"]:
+                        # Rotated by another replica; drop what this one knows
+                        # so the next read or rotation starts from Secret Manager
+                        secret_manager.forget(app_name)
+                        raise HTTPException(
+                            status_code=409,
+                            detail=f"{app_name} was rotated elsewhere (now {version_number(latest)}); retry"
+                        )
+                try:
+                    version = await secret_manager.add_version(
+                        app_name=app_name,
+                        credentials=new_credentials,
+                        rotation_period_days=rotation_period
+                    )
+                except HTTPException as e:
+                    if e.status_code == 404:
+                        await self.forget(app_name)
+                    raise
+            elif not Config.DEV_MODE:
                 # Get existing secret to maintain metadata
                 existing_secret = await secret_manager.get_secret(app_name)
                 rotation_period = existing_secret["metadata"]["rotation_period_days"]
+                previous_due = datetime.fromisoformat(existing_secret["metadata"]["next_rotation"])
                 
                 # Store new credentials
-                secret_manager.create_secret(
+                version = await secret_manager.create_secret(
                     app_name=app_name,
                     credentials=new_credentials,
                     rotation_period_days=rotation_period
                 )
+            else:
+                if record and record["rotation_period_days"]:
+                    rotation_period = record["rotation_period_days"]
+                if record:
+                    previous_due = record["next_rotation"]
 
             # Create updated app secret
             app_secret = AppSecret(
@@ -242,37 +995,198 @@ class ApigeeKeyManager:
                 consumer_key=new_credentials["key"],
                 consumer_secret=new_credentials["secret"],
                 last_rotated=datetime.now(),
-                next_rotation=datetime.now() + timedelta(days=Config.ROTATION_PERIOD_DAYS)
+                next_rotation=datetime.now() + timedelta(days=rotation_period)
             )
 
-            self.apps_cache[app_name] = app_secret
+            await self.remember(app_secret, rotation_period, version)
+            self.publish("rotated", app_secret, version)
+            ROTATIONS.inc("success")
+            if previous_due:
+                ROTATION_LAG.observe(max(0.0, (app_secret.last_rotated - previous_due).total_seconds()))
             logger.info(f"Successfully rotated secrets for {app_name}")
             return app_secret
 
+        except HTTPException as e:
+            ROTATIONS.inc("conflict" if e.status_code == 409 else "error")
+            logger.error(f"Error rotating secret for {app_name}: {e.detail}")
+            raise
         except Exception as e:
+            ROTATIONS.inc("error")
             logger.error(f"Error rotating secret for {app_name}: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            await self.store.call("release_lease", lease, owner)
+
+    async def onboard_app(self, app_name: str, rotation_period_days: int) -> bool:
+        """Create an app unless it already exists; returns whether it was created"""
+        return await self.create_app(app_name, rotation_period_days, overwrite=False) is not None
 
     async def get_app_status(self, app_name: str) -> AppSecret:
         """Get current status of an app's secrets"""
         try:
             if not Config.DEV_MODE:
                 secret_data = await secret_manager.get_secret(app_name)
-                return AppSecret(
-                    app_name=app_name,
-                    consumer_key=secret_data["credentials"]["key"],
-                    consumer_secret=secret_data["credentials"]["secret"],
-                    last_rotated=datetime.fromisoformat(secret_data["metadata"]["last_rotated"]),
-                    next_rotation=datetime.fromisoformat(secret_data["metadata"]["next_rotation"])
-                )
-            return self.apps_cache.get(app_name) or await self.create_app(app_name, Config.ROTATION_PERIOD_DAYS)
+                app_secret = AppSecret.from_secret_data(app_name, secret_data)
+                record = await self.store.call("get", app_name)
+                if not record or record["last_rotated"] != app_secret.last_rotated or not record.get("version"):
+                    # Warm the metadata layer with what was just read
+                    entry = secret_manager.cache.peek(app_name)
+                    version = entry.version if entry is not None and entry.value == secret_data else None
+                    await self.remember(app_secret, secret_data["metadata"].get("rotation_period_days"), version)
+                return app_secret
+            record = await self.store.call("get", app_name)
+            if record:
+                return AppSecret.from_record(record)
+            return await self.create_app(app_name, Config.ROTATION_PERIOD_DAYS)
 
         except Exception as e:
             logger.error(f"Error getting app status: {str(e)}")
             raise HTTPException(status_code=404, detail=f"App {app_name} not found or error accessing secrets")
 
 # Initialize key manager
-key_manager = ApigeeKeyManager()
+key_manager = ApigeeKeyManager(
+    create_state_store(Config.STATE_STORE, Config.STATE_STORE_PATH, Config.STATE_STORE_BUSY_TIMEOUT_MS)
+)
+
+@in_lane(BACKGROUND)
+async def load_key_index():
+    """Fill the consumer key index at startup.
+
+    Keys come from the store; in production the store holds no secrets, so
+    with KEY_INDEX_PRELOAD the payloads are also read from Secret Manager,
+    one page at a time. Apps whose key changed since are left alone.
+    """
+    index = key_manager.key_index
+
+    def add(app_name: str, consumer_key: str, consumer_secret: Optional[str]):
+        if index.current_key(app_name) in (None, consumer_key):
+            index.put(app_name, consumer_key, consumer_secret)
+
+    for record in await key_manager.store.call("list"):
+        if record["consumer_key"]:
+            add(record["app_name"], record["consumer_key"], record["consumer_secret"])
+    if Config.DEV_MODE or not Config.KEY_INDEX_PRELOAD:
+        return
+    page_token = None
+    while True:
+        secrets, errors, page_token = await secret_manager.list_secrets_page(Config.LIST_PAGE_SIZE, page_token)
+        for secret_data in secrets:
+            credentials = secret_data.get("credentials") or {}
+            if credentials.get("key"):
+                add(secret_data["app_name"], credentials["key"], credentials.get("secret"))
+        if not page_token:
+            break
+    logger.info(f"Key index loaded with {len(index)} keys")
+
+@in_lane(BACKGROUND)
+async def scheduled_rotation(app_name: str):
+    """Rotate an app for the scheduler unless someone else already has"""
+    record = await key_manager.store.call("get", app_name)
+    now = datetime.now()
+    if record and record["next_rotation"] and record["next_rotation"] > now:
+        # Rotated by another process sharing the store since it was queued
+        rotation_scheduler.schedule(app_name, record["next_rotation"])
+        return
+    try:
+        await key_manager.rotate_secret(app_name)
+    except HTTPException as e:
+        if e.status_code != 409:
+            raise
+        # Whoever holds the rotation reschedules the app when it finishes;
+        # check again once their lease would have run out
+        logger.info(f"Skipping scheduled rotation of {app_name}: {e.detail}")
+        rotation_scheduler.schedule(app_name, now + timedelta(seconds=Config.ROTATION_LEASE_SECONDS))
+
+@in_lane(BACKGROUND)
+async def load_rotation_schedule() -> Dict[str, datetime]:
+    """Collect next_rotation for every known app to seed the scheduler"""
+    records = await key_manager.store.call("list")
+    if Config.DEV_MODE or records:
+        return {r["app_name"]: r["next_rotation"] for r in records if r["next_rotation"]}
+    entries, _ = await secret_manager.list_metadata()
+    schedule = {}
+    for entry in entries:
+        app_name = entry["app_name"]
+        try:
+            if not entry.get("next_rotation"):
+                # Secret predates annotated metadata; read its payload once
+                entry = (await secret_manager.get_secret(app_name))["metadata"]
+            schedule[app_name] = datetime.fromisoformat(entry["next_rotation"])
+            await key_manager.store.call("put", {
+                "app_name": app_name,
+                "last_rotated": datetime.fromisoformat(entry["last_rotated"]),
+                "next_rotation": schedule[app_name],
+                "rotation_period_days": entry.get("rotation_period_days")
+            })
+        except Exception as e:
+            logger.error(f"Could not schedule {app_name}: {str(e)}")
+    return schedule
+
+# Apigee reconciliation; built on first use so the Apigee client is never
+# set up unless reconciling is enabled or requested
+reconciler = None
+
+async def reconcile_secret_apps() -> List[str]:
+    """Every app that has a secret"""
+    if Config.DEV_MODE:
+        return [r["app_name"] for r in await key_manager.store.call("list")]
+    return await secret_manager.list_app_names()
+
+async def reconcile_current_key(app_name: str) -> Optional[str]:
+    record = await key_manager.store.call("get", app_name)
+    if record and record["consumer_key"]:
+        return record["consumer_key"]
+    return key_manager.key_index.current_key(app_name)
+
+async def reconcile_credentials(app_name: str) -> Tuple[str, str]:
+    """Current key pair of an app, to register with Apigee"""
+    record = await key_manager.store.call("get", app_name)
+    if Config.DEV_MODE and record:
+        return record["consumer_key"], record["consumer_secret"]
+    credentials = (await secret_manager.get_secret(app_name))["credentials"]
+    return credentials["key"], credentials["secret"]
+
+async def reconcile_create(app_name: str) -> Tuple[str, str]:
+    app_secret = await key_manager.create_app(app_name, Config.ROTATION_PERIOD_DAYS, overwrite=False)
+    if app_secret is None:
+        # Created elsewhere since the secrets were listed
+        return await reconcile_credentials(app_name)
+    return app_secret.consumer_key, app_secret.consumer_secret
+
+async def reconcile_rotate(app_name: str) -> Tuple[str, str]:
+    app_secret = await key_manager.rotate_secret(app_name)
+    return app_secret.consumer_key, app_secret.consumer_secret
+
+async def reconcile_delete_orphan(app_name: str):
+    """Delete the secret of an app missing from Apigee"""
+    if not Config.DEV_MODE:
+        await secret_manager.delete_secret(app_name)
+    await key_manager.forget(app_name)
+    logger.info(f"Deleted orphaned secret for {app_name}")
+
+def get_reconciler() -> Reconciler:
+    global reconciler
+    if reconciler is None:
+        apigee = create_apigee_client()
+        if apigee is None:
+            raise HTTPException(status_code=400, detail="Reconciliation needs APIGEE_ORG")
+        reconciler = Reconciler(
+            apigee=apigee,
+            list_secret_apps=reconcile_secret_apps,
+            current_key=reconcile_current_key,
+            credentials=reconcile_credentials,
+            create=reconcile_create,
+            rotate=reconcile_rotate,
+            delete_orphan=reconcile_delete_orphan,
+            events=key_manager.events,
+            state=ReconcileState(Config.RECONCILE_STATE_PATH),
+            concurrency=Config.RECONCILE_CONCURRENCY,
+            full_every=Config.RECONCILE_FULL_EVERY,
+            interval_seconds=Config.RECONCILE_INTERVAL_SECONDS,
+            owns=shard.owns,
+            delete_orphans=Config.RECONCILE_ORPHANS == "delete"
+        )
+    return reconciler
 
 # Routes
 @app.get("/")
@@ -281,15 +1195,270 @@ async def read_root():
 
 @app.get("/health")
 async def health_check():
-    """Check system health"""
+    """Check system health; status is "starting" until Secret Manager warm-up completes"""
+    ready = secret_manager.ready if secret_manager else True
     return {
-        "status": "healthy",
+        "status": "healthy" if ready else "starting",
+        "ready": ready,
         "mode": "development" if Config.DEV_MODE else "production",
         "secret_manager": bool(secret_manager),
+        "secret_backend": Config.SECRET_BACKEND,
         "project_id": Config.PROJECT_ID,
+        "warm_up_error": secret_manager.warm_up_error if secret_manager else None,
+        "circuit": secret_manager.resilience.breaker.status() if secret_manager else None,
+        "quota": secret_manager.resilience.limiter.status() if secret_manager else None,
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/rotations/due")
+async def rotations_due(within_days: float = Query(7, ge=0), limit: Optional[int] = Query(None, ge=1)) -> List[AppMetadata]:
+    """Apps whose next rotation falls within the given number of days"""
+    until = datetime.now() + timedelta(days=within_days)
+    return [AppMetadata.from_record(r) for r in await key_manager.store.call("due_before", until, limit)]
+
+@app.get("/scheduler/status")
+async def scheduler_status():
+    """State of the automatic rotation scheduler"""
+    if not rotation_scheduler:
+        return {"enabled": False, "shard": shard.status()}
+    return {"enabled": True, **rotation_scheduler.status(), "shard": shard.status()}
+
+# Rotation backlog from the state store; /metrics refreshes it before
+# rendering, since collectors run synchronously
+rotation_backlog = {"overdue": 0, "max_lag_seconds": 0.0}
+
+async def refresh_rotation_backlog():
+    now = datetime.now()
+    rotation_backlog["overdue"] = await key_manager.store.call("count_due", now)
+    oldest = await key_manager.store.call("due_before", now, limit=1)
+    rotation_backlog["max_lag_seconds"] = (now - oldest[0]["next_rotation"]).total_seconds() if oldest else 0
+
+def collect_service_metrics():
+    """Scrape-time gauges for the cache, the rotation backlog and the scheduler"""
+    if secret_manager:
+        for key, value in secret_manager.cache.stats().items():
+            yield f"secret_cache_{key}", f"Secret payload cache {key.replace('_', ' ')}", value, {}
+        yield "secret_reads_coalesced", "Secret reads that joined an in-flight call", secret_manager.reads.coalesced, {}
+        yield "secret_reads_in_flight", "Distinct apps with a secret read in flight", len(secret_manager.reads), {}
+        breaker = secret_manager.resilience.breaker
+        yield "secret_manager_circuit_open", "1 while the Secret Manager circuit refuses calls", int(breaker.state == "open"), {}
+    yield "key_manager_rotations_overdue", "Apps past their next_rotation", rotation_backlog["overdue"], {}
+    yield (
+        "key_manager_rotation_max_lag_seconds", "Now minus the oldest overdue next_rotation",
+        rotation_backlog["max_lag_seconds"], {}
+    )
+    yield "key_index_keys", "Consumer keys in the validation index", len(key_manager.key_index), {}
+    if rotation_scheduler:
+        status = rotation_scheduler.status()
+        yield "rotation_scheduler_apps", "Apps in the rotation index", status["apps"], {}
+        yield "rotation_scheduler_in_flight", "Scheduled rotations running", status["in_flight"], {}
+
+REGISTRY.register_collector(collect_service_metrics)
+
+@app.post("/keys/validate")
+async def validate_key(request: KeyValidationRequest):
+    """Resolve a consumer key to its app and check the secret if one is given.
+
+    Answered from the in-memory key index without calling Secret Manager.
+    During KEY_ROTATION_GRACE_SECONDS after a rotation the previous key is
+    still valid and reported with current=false.
+    """
+    result = key_manager.key_index.validate(request.consumer_key, request.consumer_secret)
+    KEY_VALIDATIONS.inc("valid" if result["valid"] else result["reason"])
+    return result
+
+@app.get("/events")
+async def poll_events(
+    since: int = Query(0, ge=0),
+    app_name: Optional[str] = None,
+    timeout: float = Query(30, ge=0),
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """Long-poll the change feed for events after sequence number ``since``.
+
+    Returns as soon as there is at least one event, or empty after
+    ``timeout`` seconds. Pass the returned ``next`` as ``since`` to resume.
+    ``reset`` means events were missed (buffer overrun or restart) and
+    current state should be re-read.
+    """
+    timeout = min(timeout, Config.EVENT_POLL_MAX_SECONDS)
+    events, reset = await key_manager.events.wait(since, timeout, app_name, limit)
+    next_seq = events[-1]["seq"] if events else (key_manager.events.last_seq if reset else since)
+    return {"events": events, "next": next_seq, "reset": reset}
+
+@app.get("/events/stream")
+async def stream_events(request: Request, since: Optional[int] = Query(None, ge=0), app_name: Optional[str] = None):
+    """Server-Sent Events stream of the change feed.
+
+    Resumes after the Last-Event-ID header (or ``since``); without either
+    it starts at the current end of the feed. A reset event is sent when
+    the requested position is no longer available.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else since
+    if seq is None:
+        seq = key_manager.events.last_seq
+
+    async def stream():
+        nonlocal seq
+        yield "retry: 5000\n\n"
+        while True:
+            events, reset = await key_manager.events.wait(seq, Config.EVENT_HEARTBEAT_SECONDS, app_name)
+            if reset:
+                seq = key_manager.events.last_seq if not events else events[0]["seq"] - 1
+                yield f"id: {seq}\nevent: reset\ndata: {json.dumps({'next': seq})}\n\n"
+            if not events:
+                # Comment line keeps idle connections open through proxies
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            seq = events[-1]["seq"]
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/compaction/status")
+async def compaction_status():
+    """Progress of the version compaction worker"""
+    if not compaction_worker:
+        return {"enabled": False}
+    return {"enabled": Config.COMPACTION_ENABLED, **compaction_worker.status()}
+
+@app.post("/apps/{app_name}/compact")
+async def compact_app(app_name: str):
+    """Prune old versions of one app's secret now"""
+    if not compaction_worker:
+        raise HTTPException(status_code=400, detail="Compaction needs Secret Manager")
+    try:
+        return await compaction_worker.compact_app(app_name)
+    except exceptions.NotFound:
+        raise HTTPException(status_code=404, detail=f"Secret not found for app: {app_name}")
+
+@app.get("/reconcile/status")
+async def reconcile_status():
+    """Progress of Apigee reconciliation"""
+    if not reconciler:
+        return {"enabled": False}
+    return {"enabled": Config.RECONCILE_ENABLED, **reconciler.status()}
+
+@app.post("/reconcile")
+async def reconcile(dry_run: bool = False, full: Optional[bool] = None):
+    """Run a reconciliation pass now and return its actions.
+
+    With dry_run the actions are planned but not taken. ``full`` forces (or
+    skips) a full listing of both sides instead of the incremental diff.
+    """
+    return await get_reconciler().run_pass(full=full, dry_run=dry_run)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    await refresh_rotation_backlog()
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the secret payload cache"""
+    if not secret_manager:
+        return {"enabled": False}
+    return {"enabled": True, **secret_manager.cache.stats()}
+
+@app.post("/apps/rotate")
+async def rotate_apps(batch: BatchRotateRequest):
+    """Rotate many apps at once, streaming one NDJSON result per app.
+
+    Apps are selected by name and/or by secret labels. Results are written
+    as each rotation finishes, followed by a summary line. With only_owned,
+    apps owned by other replicas are left out, so the same request can be
+    sent to every replica to spread the work.
+    """
+    if not batch.app_names and not batch.labels:
+        raise HTTPException(status_code=400, detail="Provide app_names or labels")
+
+    app_names = list(dict.fromkeys(batch.app_names or []))
+    if batch.labels:
+        if Config.DEV_MODE:
+            for name in (r["app_name"] for r in await key_manager.store.call("list")):
+                labels = {"type": "apigee-key", "app": name}
+                if all(labels.get(k) == v for k, v in batch.labels.items()):
+                    app_names.append(name)
+        else:
+            app_names += await secret_manager.list_app_names(batch.labels)
+        app_names = list(dict.fromkeys(app_names))
+    if batch.only_owned:
+        app_names = [name for name in app_names if shard.owns(name)]
+
+    concurrency = min(batch.concurrency or Config.BATCH_ROTATE_CONCURRENCY, Config.BATCH_ROTATE_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    @in_lane(BACKGROUND)
+    async def rotate_one(app_name: str) -> Dict:
+        async with semaphore:
+            try:
+                app_secret = await key_manager.rotate_secret(app_name)
+                return {"app_name": app_name, "status": "rotated", "app": jsonable_encoder(app_secret)}
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                return {"app_name": app_name, "status": "error", "error": detail}
+
+    async def stream():
+        # Tasks are not cancelled if the client goes away; a rotation that
+        # has started is always allowed to finish.
+        tasks = [asyncio.create_task(rotate_one(name)) for name in app_names]
+        rotated = failed = 0
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            if result["status"] == "rotated":
+                rotated += 1
+            else:
+                failed += 1
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"status": "done", "total": len(app_names), "rotated": rotated, "failed": failed}) + "\n"
+
+    logger.info(f"Batch rotation of {len(app_names)} apps with concurrency {concurrency}")
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/apps/import")
+async def import_apps(
+    request: Request,
+    format: str = Query("jsonl"),
+    concurrency: Optional[int] = Query(None, ge=1),
+    checkpoint: Optional[str] = Query(None, pattern=r"^[A-Za-z0-9_.-]+$")
+):
+    """Onboard apps in bulk from a JSONL or CSV body, streaming NDJSON results.
+
+    Apps that already exist are skipped. With a checkpoint name, progress is
+    saved under IMPORT_CHECKPOINT_DIR and re-posting the same file with the
+    same name resumes where the previous run stopped.
+    """
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(IMPORT_FORMATS)}")
+    concurrency = min(concurrency or Config.IMPORT_CONCURRENCY, Config.IMPORT_CONCURRENCY)
+    checkpoint_path = os.path.join(Config.IMPORT_CHECKPOINT_DIR, f"{checkpoint}.json") if checkpoint else None
+
+    # The body is spooled first: the response starts streaming before the
+    # upload would otherwise be read, and large files spill to disk
+    body = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024, mode="w+b")
+    async for chunk in request.stream():
+        body.write(chunk)
+    body.seek(0)
+
+    async def stream():
+        try:
+            lines = (line.decode("utf-8") for line in body)
+            records = iter_records(iter_file_lines(lines), format, Config.ROTATION_PERIOD_DAYS)
+            async for result in run_import(records, in_lane(BACKGROUND)(key_manager.onboard_app), concurrency, ImportCheckpoint(checkpoint_path)):
+                yield json.dumps(result) + "\n"
+        finally:
+            body.close()
+
+    logger.info(f"Bulk import with concurrency {concurrency}, checkpoint {checkpoint}")
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @app.post("/apps/{app_name}/rotate")
 async def rotate_app_secret(app_name: str, background_tasks: BackgroundTasks):
     """Rotate API key and secret for an app"""
@@ -311,149 +1480,242 @@ async def set_rotation_schedule(app_name: str, schedule: RotationSchedule):
         logger.error(f"Failed to create app: {str(e)}")
         raise
 
-class SecretManager:
-    def create_secret(self, app_name: str, credentials: dict, rotation_period_days: int) -> str:
-        """Create a new secret in Google Secret Manager"""
-        try:
-            logger.info(f"Creating secret for app: {app_name}")
-            logger.info(f"Project ID: {self.project_id}")
-            
-            secret_id = f"apigee-key-{app_name}"
-            logger.info(f"Secret ID will be: {secret_id}")
-            
-            # Prepare secret data
-            secret_data = {
-                "credentials": credentials,
-                "metadata": {
-                    "app_name": app_name,
-                    "created_at": datetime.now().isoformat(),
-                    "last_rotated": datetime.now().isoformat(),
-                    "next_rotation": (datetime.now() + timedelta(days=rotation_period_days)).isoformat(),
-                    "rotation_period_days": rotation_period_days
-                }
-            }
-            logger.info("Prepared secret data")
+def make_etag(*parts) -> str:
+    """Strong ETag from the values that determine a response"""
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
 
-            try:
-                # Create new secret
-                create_request = {
-                    "parent": self.parent,
-                    "secret_id": secret_id,
-                    "secret": {
-                        "replication": {"automatic": {}},
-                        "labels": {
-                            "type": "apigee-key",
-                            "app": app_name,
-                            "created_by": "key-manager"
-                        }
-                    }
-                }
-                logger.info(f"Creating secret with request: {create_request}")
-                
-                self.client.create_secret(request=create_request)
-                logger.info(f"Created new secret for app: {app_name}")
-            except exceptions.AlreadyExists:
-                logger.info(f"Secret already exists for app: {app_name}")
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
 
-            # Add new version
-            secret_path = f"{self.parent}/secrets/{secret_id}"
-            version_request = {
-                "parent": secret_path,
-                "payload": {"data": json.dumps(secret_data).encode("UTF-8")}
-            }
-            logger.info("Adding secret version")
-            
-            version = self.client.add_secret_version(request=version_request)
-            logger.info(f"Successfully added version: {version.name}")
-            
-            return version.name
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
 
-        except Exception as e:
-            logger.error(f"Error creating secret for {app_name}: {str(e)}")
-            logger.error(f"Error type: {type(e)}")
-            logger.error(f"Error details: {getattr(e, 'details', 'No details available')}")
-            raise
+async def app_etag(app_name: str, kind: str) -> Optional[str]:
+    """ETag for a single-app response, without reading the payload.
 
-class ApigeeKeyManager:
-    async def create_app(self, app_name: str, rotation_period_days: int) -> AppSecret:
-        """Create a new app with initial credentials"""
-        try:
-            logger.info(f"Starting app creation: {app_name}")
-            logger.info(f"DEV_MODE: {Config.DEV_MODE}")
-            
-            # Generate initial credentials
-            credentials = {
-                "key": f"key-{uuid.uuid4()}",
-                "secret": f"secret-{uuid.uuid4()}"
-            }
-            logger.info("Generated credentials")
+    In production it is derived from the latest version name (one metadata
+    read unless the cache is fresh); in DEV_MODE from the stored record.
+    """
+    try:
+        if Config.DEV_MODE:
+            record = await key_manager.store.call("get", app_name)
+            return make_etag(kind, app_name, record["consumer_key"], record["last_rotated"]) if record else None
+        return make_etag(kind, app_name, await secret_manager.latest_version(app_name))
+    except Exception as e:
+        logger.debug(f"No ETag for {app_name}: {str(e)}")
+        return None
 
-            if not Config.DEV_MODE and secret_manager:
-                logger.info("Using Secret Manager to store credentials")
-                # Store in Secret Manager
-                secret_manager.create_secret(
-                    app_name=app_name,
-                    credentials=credentials,
-                    rotation_period_days=rotation_period_days
-                )
-                logger.info("Successfully stored in Secret Manager")
-            else:
-                logger.info("Skipping Secret Manager (DEV_MODE or no secret_manager)")
-            
-            # Create app secret object
-            app_secret = AppSecret(
-                app_name=app_name,
-                consumer_key=credentials["key"],
-                consumer_secret=credentials["secret"],
-                last_rotated=datetime.now(),
-                next_rotation=datetime.now() + timedelta(days=rotation_period_days)
-            )
+@app.get("/apps/{app_name}")
+async def get_app_status(app_name: str, request: Request, response: Response) -> AppSecret:
+    """Get current status of an app.
 
-            self.apps_cache[app_name] = app_secret
-            logger.info(f"Successfully created app: {app_name}")
-            return app_secret
+    Responses carry an ETag; a matching If-None-Match gets 304 Not Modified
+    without the payload being read.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await app_etag(app_name, "app")
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    app_secret = await key_manager.get_app_status(app_name)
+    etag = await app_etag(app_name, "app")
+    if etag:
+        response.headers["ETag"] = etag
+    return app_secret
 
+def apps_from_secrets(secrets: List[Dict], errors: List[Dict]) -> List[AppSecret]:
+    """Convert secret payloads to AppSecrets, recording malformed ones in errors"""
+    apps = []
+    for secret in secrets:
+        app_name = secret["metadata"]["app_name"]
+        try:
+            apps.append(AppSecret.from_secret_data(app_name, secret))
         except Exception as e:
-            logger.error(f"Error creating app {app_name}: {str(e)}")
-            logger.error(f"Error type: {type(e)}")
-            logger.error(f"Error details: {getattr(e, 'details', 'No details available')}")
-            raise HTTPException(status_code=500, detail=str(e))
-        
-        
-@app.get("/apps/{app_name}")
-async def get_app_status(app_name: str) -> AppSecret:
-    """Get current status of an app"""
-    return await key_manager.get_app_status(app_name)
+            logger.error(f"Error processing app {app_name}: {str(e)}")
+            errors.append({"app_name": app_name, "secret_name": secret_manager.secret_path(app_name), "error": str(e)})
+    return apps
+
+async def list_apps_page(page_size: int, page_token: Optional[str]) -> Tuple[List[AppSecret], List[Dict], Optional[str]]:
+    """One page of apps plus per-app errors and the next page token"""
+    if Config.DEV_MODE:
+        # The page token is the last app name of the previous page
+        page = await key_manager.stored_apps(limit=page_size + 1, after=page_token)
+        next_page_token = page[page_size - 1].app_name if len(page) > page_size else None
+        return page[:page_size], [], next_page_token
+    secrets, errors, next_page_token = await secret_manager.list_secrets_page(page_size, page_token)
+    return apps_from_secrets(secrets, errors), errors, next_page_token
+
+async def list_metadata_page(page_size: Optional[int], page_token: Optional[str]) -> Tuple[List[AppMetadata], Optional[str]]:
+    """One page (or, without page_size, all) of app rotation metadata"""
+    if Config.DEV_MODE:
+        records = await key_manager.store.call("list", limit=page_size + 1 if page_size else None, after=page_token)
+        next_page_token = None
+        if page_size and len(records) > page_size:
+            records = records[:page_size]
+            next_page_token = records[-1]["app_name"]
+        return [AppMetadata.from_record(r) for r in records], next_page_token
+    # Annotations are what this listing reads, so land any queued updates
+    await secret_manager.flush_annotations()
+    entries, next_page_token = await secret_manager.list_metadata(page_size, page_token)
+    return [AppMetadata(**entry) for entry in entries], next_page_token
+
+async def list_apps_metadata(
+    response: Response,
+    page_size: Optional[int],
+    page_token: Optional[str],
+    stream: bool
+) -> Union[List[AppMetadata], StreamingResponse]:
+    """GET /apps?fields=metadata"""
+    if stream:
+        async def stream_metadata():
+            token = page_token
+            while True:
+                entries, token = await list_metadata_page(page_size or Config.LIST_PAGE_SIZE, token)
+                for entry in entries:
+                    yield json.dumps(jsonable_encoder(entry)) + "\n"
+                if not token:
+                    break
+
+        return StreamingResponse(stream_metadata(), media_type="application/x-ndjson")
 
-@app.get("/apps")
-async def list_apps() -> List[AppSecret]:
-    """List all apps and their status"""
     try:
-        if Config.DEV_MODE:
-            return list(key_manager.apps_cache.values())
+        entries, next_page_token = await list_metadata_page(page_size, page_token)
+        if next_page_token:
+            response.headers["X-Next-Page-Token"] = next_page_token
+        return entries
+    except Exception as e:
+        logger.error(f"Error listing app metadata: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def listing_fingerprint(page_size: Optional[int], page_token: Optional[str], include_errors: bool) -> Optional[str]:
+    """ETag for a production app listing, computed from secret annotations.
+
+    One list call per page, with no payload reads, tells whether any app on
+    the page was created, deleted or rotated. Queued annotation updates
+    from this process are flushed first so they are reflected, and the
+    latest version recorded in the state store is mixed in for writes
+    whose annotations lag elsewhere. Returns None while an annotation
+    write from this process is still failing.
+    """
+    await secret_manager.flush_annotations()
+    if secret_manager.annotations_lagging:
+        return None
+    entries, _ = await secret_manager.list_metadata(page_size, page_token)
+    records = {e["app_name"]: await key_manager.store.call("get", e["app_name"]) or {} for e in entries}
+    return make_etag(
+        "apps", page_size, page_token, include_errors,
+        *(f"{e['secret_name']}={e.get('last_rotated')}@{records[e['app_name']].get('version')}" for e in entries)
+    )
+
+def body_etag(body) -> str:
+    return make_etag("body", json.dumps(jsonable_encoder(body), sort_keys=True))
+
+@app.get("/apps", response_model=None)
+async def list_apps(
+    request: Request,
+    response: Response,
+    include_errors: bool = False,
+    page_size: Optional[int] = Query(None, ge=1, le=1000),
+    page_token: Optional[str] = None,
+    stream: bool = False,
+    fields: str = Query("all", pattern="^(all|metadata)$")
+) -> Union[List[AppSecret], List[AppMetadata], AppListing, StreamingResponse]:
+    """List all apps and their status.
+
+    Per-app failures are counted in the ``X-List-Errors`` header; pass
+    ``include_errors=true`` to get them back alongside the apps. With
+    ``page_size`` a single page is returned and the token for the next one
+    is sent in ``X-Next-Page-Token``. With ``stream=true`` every app is
+    written as one NDJSON line as soon as its page has been read.
+    ``fields=metadata`` returns rotation metadata only and, in production,
+    is answered from secret annotations without reading any payload.
+
+    Non-streamed responses carry an ETag and honour If-None-Match. In
+    production the full listing's ETag comes from the secret annotations,
+    so an unchanged page is answered with 304 before any payload is read.
+    A listing with per-app errors is incomplete and gets no ETag.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if fields == "metadata":
+        result = await list_apps_metadata(response, page_size, page_token, stream)
+        if isinstance(result, StreamingResponse):
+            return result
+        etag = body_etag(result)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        return result
+
+    if stream:
+        async def stream_apps():
+            token = page_token
+            while True:
+                apps, errors, token = await list_apps_page(page_size or Config.LIST_PAGE_SIZE, token)
+                for app_secret in apps:
+                    yield json.dumps(jsonable_encoder(app_secret)) + "\n"
+                if include_errors:
+                    for error in errors:
+                        yield json.dumps({"error": error}) + "\n"
+                if not token:
+                    break
+
+        return StreamingResponse(stream_apps(), media_type="application/x-ndjson")
+
+    try:
+        etag = None
+        if not Config.DEV_MODE:
+            etag = await listing_fingerprint(page_size, page_token, include_errors)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        next_page_token = None
+        if page_size:
+            apps, errors, next_page_token = await list_apps_page(page_size, page_token)
+            if next_page_token:
+                response.headers["X-Next-Page-Token"] = next_page_token
+        elif Config.DEV_MODE:
+            apps = await key_manager.stored_apps()
+            errors = []
         else:
-            secrets = await secret_manager.list_secrets()
-            apps = []
-            for secret in secrets:
-                app_name = secret["metadata"]["app_name"]
-                try:
-                    app_status = await get_app_status(app_name)
-                    apps.append(app_status)
-                except Exception as e:
-                    logger.error(f"Error processing app {app_name}: {str(e)}")
-            return apps
+            # Each payload is fetched exactly once and converted in place.
+            secrets, errors = await secret_manager.list_secrets()
+            apps = apps_from_secrets(secrets, errors)
+        response.headers["X-List-Errors"] = str(len(errors))
+        result = apps
+        if include_errors:
+            result = AppListing(apps=apps, errors=[ListError(**e) for e in errors], next_page_token=next_page_token)
+        if errors:
+            # A 304 would let the client keep this partial listing
+            return result
+        etag = etag or body_etag(result)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        return result
     except Exception as e:
         logger.error(f"Error listing apps: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/verify/{app_name}")
-async def verify_app_secret(app_name: str):
-    """Verify secret for specific app"""
+async def verify_app_secret(app_name: str, request: Request, response: Response):
+    """Verify secret for specific app; supports If-None-Match like /apps/{app_name}"""
     if Config.DEV_MODE:
         return {"mode": "development", "message": "Verification not available in dev mode"}
     
     try:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            etag = await app_etag(app_name, "verify")
+            if etag and etag_matches(if_none_match, etag):
+                return not_modified(etag)
         secret_data = await secret_manager.get_secret(app_name)
+        etag = await app_etag(app_name, "verify")
+        if etag:
+            response.headers["ETag"] = etag
         return {
             "exists": True,
             "app_name": app_name,
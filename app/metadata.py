@@ -0,0 +1,30 @@
+# app/metadata.py
+from datetime import datetime
+from typing import Dict, Optional
+
+# Rotation metadata mirrored from the payload onto the secret resource so it
+# can be listed without accessing any secret version.
+METADATA_FIELDS = ("app_name", "created_at", "last_rotated", "next_rotation", "rotation_period_days")
+
+
+def metadata_annotations(metadata: Dict) -> Dict[str, str]:
+    """Annotations carrying a payload's rotation metadata"""
+    return {field: str(metadata[field]) for field in METADATA_FIELDS if metadata.get(field) is not None}
+
+
+def metadata_from_annotations(annotations, app_name: Optional[str] = None) -> Optional[Dict]:
+    """Rotation metadata stored on a secret resource, or None if it has none"""
+    annotations = dict(annotations or {})
+    if "next_rotation" not in annotations:
+        return None
+    metadata = {field: annotations.get(field) for field in METADATA_FIELDS}
+    if app_name and not metadata["app_name"]:
+        metadata["app_name"] = app_name
+    if metadata["rotation_period_days"] is not None:
+        metadata["rotation_period_days"] = int(metadata["rotation_period_days"])
+    return metadata
+
+
+def days_until(timestamp: str, now: Optional[datetime] = None) -> int:
+    """Whole days from now until an ISO timestamp (negative when overdue)"""
+    return (datetime.fromisoformat(timestamp) - (now or datetime.now())).days
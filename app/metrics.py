@@ -0,0 +1,250 @@
+# app/metrics.py
+import abc
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds, from sub-millisecond cache hits up to slow RPCs
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> List[str]:
+        """The metric's sample lines in Prometheus text format"""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+
+class Counter(Metric):
+    """Monotonic counter; label values are passed positionally"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in self._values.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    """Cumulative histogram with fixed buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            # Per-bucket counts (last slot is +Inf), then sum and count
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text format.
+
+    Recording is a dict update on the event loop thread, cheap enough to
+    leave on in production. Collectors are called only at scrape time for
+    values that are cheaper to read than to track (cache and queue sizes).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, float, Dict[str, str]]]]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, float, Dict[str, str]]]]):
+        """Add a callable yielding (name, help, value, labels) gauge samples at scrape time"""
+        self._collectors.append(collector)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        described = set()
+        for collector in self._collectors:
+            for name, help_text, value, labels in collector():
+                if name not in described:
+                    lines.append(f"# HELP {name} {help_text}")
+                    lines.append(f"# TYPE {name} gauge")
+                    described.add(name)
+                keys = tuple(labels)
+                lines.append(f"{name}{_format_labels(keys, tuple(labels[k] for k in keys))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry, like prometheus_client's default
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+)
+RPC_DURATION = REGISTRY.histogram(
+    "secret_manager_rpc_duration_seconds", "Secret Manager call latency", ("rpc",)
+)
+RPC_ERRORS = REGISTRY.counter(
+    "secret_manager_rpc_errors_total", "Secret Manager calls that raised", ("rpc", "error")
+)
+RPC_IN_FLIGHT = REGISTRY.gauge(
+    "secret_manager_rpc_in_flight", "Secret Manager calls currently running", ("rpc",)
+)
+RPC_RETRIES = REGISTRY.counter(
+    "secret_manager_rpc_retries_total", "Secret Manager calls retried after a transient error", ("rpc",)
+)
+RPC_HEDGES = REGISTRY.counter(
+    "secret_manager_rpc_hedges_total", "Secret Manager reads that started a hedged second attempt", ("rpc",)
+)
+RPC_REJECTED = REGISTRY.counter(
+    "secret_manager_rpc_rejected_total", "Secret Manager calls refused by the open circuit", ("rpc",)
+)
+QUOTA_QUEUE_DEPTH = REGISTRY.gauge(
+    "secret_manager_quota_queue_depth", "Calls waiting for a quota token", ("quota", "lane")
+)
+QUOTA_WAIT = REGISTRY.histogram(
+    "secret_manager_quota_wait_seconds",
+    "Time calls spent throttled by the client-side quota limiter",
+    ("quota", "lane"),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+)
+ROTATIONS = REGISTRY.counter(
+    "key_manager_rotations_total", "Secret rotations by outcome", ("result",)
+)
+KEY_VALIDATIONS = REGISTRY.counter(
+    "key_manager_key_validations_total", "Consumer key validations by result", ("result",)
+)
+ROTATION_LAG = REGISTRY.histogram(
+    "key_manager_rotation_lag_seconds",
+    "How long past next_rotation an app was when it was rotated",
+    buckets=(0, 60, 300, 900, 3600, 6 * 3600, 86400, 7 * 86400, 30 * 86400)
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests.
+
+    The route label is the matched path template (``/apps/{app_name}``),
+    looked up from the endpoint the router stored in the scope, so label
+    cardinality stays bounded by the number of routes.
+    """
+
+    def __init__(self, app, routes_source):
+        self.app = app
+        self.routes_source = routes_source
+        self._route_paths: Optional[Dict] = None
+
+    def _route_for(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._route_paths is None:
+            self._route_paths = {
+                getattr(route, "endpoint", None) or getattr(route, "app", None): route.path
+                for route in self.routes_source.routes
+            }
+        return self._route_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started, scope["method"], self._route_for(scope), str(status)
+            )
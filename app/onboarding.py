@@ -0,0 +1,194 @@
+# app/onboarding.py
+import asyncio
+import csv
+import json
+import logging
+import os
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from app.files import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("jsonl", "csv")
+
+
+async def iter_file_lines(lines: Iterable[str]) -> AsyncIterator[str]:
+    """Adapt a file or any iterable of lines for iter_records"""
+    for line in lines:
+        yield line
+
+
+def _parse_record(fields: Dict, default_period: int) -> Dict:
+    app_name = fields.get("app_name")
+    if not isinstance(app_name, str) or not app_name.strip():
+        raise ValueError("app_name is required and must be a string")
+    period = fields.get("rotation_period_days")
+    if period is None or period == "":
+        period = default_period
+    elif isinstance(period, bool) or not isinstance(period, (int, str)):
+        raise ValueError("rotation_period_days must be a whole number")
+    else:
+        try:
+            period = int(period)
+        except ValueError:
+            raise ValueError("rotation_period_days must be a whole number") from None
+    if not 1 <= period <= 365:
+        raise ValueError("rotation_period_days must be between 1 and 365")
+    return {"app_name": app_name.strip(), "rotation_period_days": period}
+
+
+async def iter_records(
+    lines: AsyncIterator[str], fmt: str, default_period: int
+) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Parse onboarding rows, yielding (line number, record, error).
+
+    JSONL has one {"app_name", "rotation_period_days"} object per line; CSV
+    has a header row naming those columns. Blank lines are skipped and a
+    missing period falls back to default_period.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}")
+    header = None
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            if fmt == "jsonl":
+                fields = json.loads(line)
+                if not isinstance(fields, dict):
+                    raise ValueError("expected a JSON object")
+            else:
+                row = next(csv.reader([line]))
+                if header is None:
+                    header = [column.strip() for column in row]
+                    continue
+                fields = dict(zip(header, row))
+            yield line_no, _parse_record(fields, default_period), None
+        except (TypeError, ValueError) as e:
+            yield line_no, None, str(e)
+
+
+class ImportCheckpoint:
+    """Progress of one import, saved so an interrupted run can resume.
+
+    Rows finish out of order, so the checkpoint keeps a low watermark:
+    every line at or below ``line`` is done. Lines that failed are listed
+    separately and retried on resume; lines above the watermark that had
+    finished are redone, which is safe because existing apps are skipped.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.line = 0
+        self.failed_lines: Set[int] = set()
+        self.counts = {"created": 0, "skipped": 0, "invalid": 0}
+        self._started: Set[int] = set()
+        self._since_save = 0
+        if path and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            self.line = saved["line"]
+            self.failed_lines = set(saved.get("failed_lines", []))
+            self.counts.update(saved.get("counts", {}))
+
+    def should_process(self, line_no: int) -> bool:
+        return line_no > self.line or line_no in self.failed_lines
+
+    def start(self, line_no: int):
+        self._started.add(line_no)
+
+    def finish(self, line_no: int, status: str):
+        """Record the outcome of a line"""
+        self._started.discard(line_no)
+        self.failed_lines.discard(line_no)
+        if status == "error":
+            self.failed_lines.add(line_no)
+        else:
+            self.counts[{"exists": "skipped"}.get(status, status)] += 1
+        self._since_save += 1
+
+    def advance(self, last_read: int):
+        """Move the watermark up to just below the oldest line still in flight"""
+        floor = min(self._started) - 1 if self._started else last_read
+        self.line = max(self.line, floor)
+
+    def save(self, force: bool = False, every: int = 100):
+        if not self.path or (not force and self._since_save < every):
+            return
+        atomic_write_json(self.path, {
+            "line": self.line,
+            "failed_lines": sorted(self.failed_lines),
+            "counts": self.counts
+        })
+        self._since_save = 0
+
+
+async def run_import(
+    records: AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]],
+    onboard: Callable[[str, int], Awaitable[bool]],
+    concurrency: int,
+    checkpoint: ImportCheckpoint
+) -> AsyncIterator[Dict]:
+    """Onboard apps from records, yielding one result per row and a summary.
+
+    ``onboard`` creates an app and returns False if it already existed. At
+    most ``concurrency`` apps are created at a time and input is read only
+    as fast as they finish, so memory stays flat for any file size.
+    """
+    resumed_from = checkpoint.line
+    pending: Set[asyncio.Task] = set()
+    last_read = checkpoint.line
+
+    async def onboard_one(line_no: int, record: Dict) -> Dict:
+        result = {"line": line_no, "app_name": record["app_name"]}
+        try:
+            created = await onboard(record["app_name"], record["rotation_period_days"])
+            return {**result, "status": "created" if created else "exists"}
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            return {**result, "status": "error", "error": detail}
+
+    def collect(done: Set[asyncio.Task]) -> Iterable[Dict]:
+        for task in done:
+            result = task.result()
+            checkpoint.finish(result["line"], result["status"])
+            yield result
+        checkpoint.advance(last_read)
+        checkpoint.save()
+
+    try:
+        async for line_no, record, error in records:
+            last_read = line_no
+            if not checkpoint.should_process(line_no):
+                continue
+            if record is None:
+                checkpoint.finish(line_no, "invalid")
+                yield {"line": line_no, "status": "invalid", "error": error}
+                continue
+            checkpoint.start(line_no)
+            pending.add(asyncio.create_task(onboard_one(line_no, record)))
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for result in collect(done):
+                    yield result
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for result in collect(done):
+                yield result
+    finally:
+        # Rows already started are left to finish; an interrupted import
+        # resumes from the oldest of them.
+        checkpoint.advance(last_read)
+        checkpoint.save(force=True)
+
+    logger.info(f"Import finished: {checkpoint.counts}")
+    yield {
+        "status": "done",
+        "resumed_from_line": resumed_from,
+        **checkpoint.counts,
+        "failed": len(checkpoint.failed_lines)
+    }
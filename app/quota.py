@@ -0,0 +1,203 @@
+# app/quota.py
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from app.metrics import QUOTA_QUEUE_DEPTH, QUOTA_WAIT
+
+# Quota bucket each RPC is charged against, mirroring Secret Manager's
+# access / read / write request quotas.
+OPERATION_QUOTAS = {
+    "access_secret_version": "access",
+    "get_secret": "read",
+    "get_secret_version": "read",
+    "list_secrets": "read",
+    "list_secret_versions": "read",
+    "create_secret": "write",
+    "update_secret": "write",
+    "delete_secret": "write",
+    "add_secret_version": "write",
+    "enable_secret_version": "write",
+    "disable_secret_version": "write",
+    "destroy_secret_version": "write"
+}
+
+# Lanes in priority order; a waiting call in an earlier lane always gets
+# the next token first
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+_lane = contextvars.ContextVar("quota_lane", default=INTERACTIVE)
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+@contextmanager
+def lane(name: str):
+    """Charge Secret Manager calls made inside the block to a lane.
+
+    The lane is a context variable, so tasks created inside the block
+    inherit it.
+    """
+    if name not in LANES:
+        raise ValueError(f"Unknown quota lane: {name}")
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def in_lane(name: str):
+    """Decorator running a coroutine function inside lane(name)"""
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with lane(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class TokenBucket:
+    """Refills at ``per_minute / 60`` tokens a second up to ``capacity``"""
+
+    def __init__(self, per_minute: float, capacity: float):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> float:
+        """Take a token; returns 0, or how long to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def give_back(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class QuotaLimiter:
+    """Client-side token buckets for Secret Manager's per-minute quotas.
+
+    One bucket per quota (access, read, write), shared by every call in the
+    process so bulk work cannot use up a quota behind interactive calls'
+    backs. When a bucket is empty, callers queue by lane and then arrival
+    order, and a single dispatcher per bucket hands out tokens as they
+    refill. Quotas left at 0 are not limited.
+    """
+
+    def __init__(self, quotas_per_minute: Dict[str, float], burst_seconds: float = 1):
+        self.buckets = {
+            name: TokenBucket(per_minute, per_minute / 60 * burst_seconds)
+            for name, per_minute in quotas_per_minute.items() if per_minute
+        }
+        self._waiters: Dict[str, List[Tuple[int, int, asyncio.Future]]] = {name: [] for name in self.buckets}
+        self._dispatchers: Dict[str, asyncio.Task] = {}
+        self._order = itertools.count()
+
+    def _bucket(self, rpc: str) -> Tuple[Optional[str], Optional[TokenBucket]]:
+        name = OPERATION_QUOTAS.get(rpc)
+        return name, self.buckets.get(name)
+
+    def try_acquire(self, rpc: str) -> bool:
+        """Take a token only if one is free and nobody is queued for it"""
+        name, bucket = self._bucket(rpc)
+        return bucket is None or (not self._waiters[name] and bucket.take() == 0)
+
+    async def acquire(self, rpc: str) -> float:
+        """Wait for a token for rpc; returns the seconds spent waiting"""
+        name, bucket = self._bucket(rpc)
+        if bucket is None:
+            return 0
+        waiters = self._waiters[name]
+        if not waiters and bucket.take() == 0:
+            return 0
+        lane_name = current_lane()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(waiters, (LANES.index(lane_name), next(self._order), future))
+        dispatcher = self._dispatchers.get(name)
+        if dispatcher is None or dispatcher.done():
+            self._dispatchers[name] = asyncio.create_task(self._dispatch(name, bucket))
+        started = time.monotonic()
+        QUOTA_QUEUE_DEPTH.inc(name, lane_name)
+        try:
+            await future
+        finally:
+            QUOTA_QUEUE_DEPTH.dec(name, lane_name)
+            # A cancelled waiter leaves its entry behind; the dispatcher
+            # skips it
+            future.cancel()
+        waited = time.monotonic() - started
+        QUOTA_WAIT.observe(waited, name, lane_name)
+        return waited
+
+    async def _dispatch(self, name: str, bucket: TokenBucket):
+        waiters = self._waiters[name]
+        while waiters:
+            wait = bucket.take()
+            if wait:
+                await asyncio.sleep(wait)
+                continue
+            while waiters:
+                _, _, future = heapq.heappop(waiters)
+                if not future.done():
+                    future.set_result(None)
+                    break
+            else:
+                bucket.give_back()
+
+    def acquire_sync(self, rpc: str) -> float:
+        """Blocking acquire for the sync clients, which run outside the lanes"""
+        name, bucket = self._bucket(rpc)
+        if bucket is None:
+            return 0
+        started = time.monotonic()
+        while True:
+            wait = bucket.take()
+            if not wait:
+                break
+            time.sleep(wait)
+        waited = time.monotonic() - started
+        if waited:
+            QUOTA_WAIT.observe(waited, name, current_lane())
+        return waited
+
+    def status(self) -> Dict:
+        return {
+            name: {
+                "per_minute": bucket.rate * 60,
+                "tokens": round(bucket.tokens, 2),
+                "queued": sum(1 for _, _, f in self._waiters[name] if not f.done())
+            }
+            for name, bucket in self.buckets.items()
+        }
+
+
+def quota_limiter_from_env() -> QuotaLimiter:
+    """Limiter configured from SECRET_MANAGER_*_QUOTA_PER_MINUTE"""
+    return QuotaLimiter(
+        {
+            name: float(os.getenv(f"SECRET_MANAGER_{name.upper()}_QUOTA_PER_MINUTE", "0"))
+            for name in ("access", "read", "write")
+        },
+        burst_seconds=float(os.getenv("SECRET_MANAGER_QUOTA_BURST_SECONDS", "1"))
+    )
@@ -0,0 +1,322 @@
+# app/reconcile.py
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.apigee import app_summary
+from app.files import atomic_write_json
+from app.events import EventLog
+from app.quota import BACKGROUND, in_lane
+
+logger = logging.getLogger(__name__)
+
+# Apigee timestamps come from many servers; re-read a little before the
+# watermark so a write that landed with a slightly older clock is not missed
+WATERMARK_SKEW_MS = 60000
+
+ACTIONS = ("create", "register", "rotate", "orphan", "unknown")
+
+
+class ReconcileState:
+    """What the reconciler knows between passes, saved to ``path``.
+
+    ``apigee_watermark`` is the newest lastModifiedAt seen, ``event_seq``
+    the last change feed event applied. ``apps`` caches each Apigee app's
+    status and keys and ``secrets`` the apps that have a secret, so an
+    incremental pass only looks at what changed on either side.
+    ``orphans`` holds the orphaned secrets reported but not deleted.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.apigee_watermark = 0
+        self.event_seq = 0
+        self.apps: Dict[str, Dict] = {}
+        self.secrets: Set[str] = set()
+        self.retry: Set[str] = set()
+        self.orphans: Set[str] = set()
+        self.loaded = False
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    saved = json.load(f)
+                self.apigee_watermark = saved["apigee_watermark"]
+                self.event_seq = saved["event_seq"]
+                self.apps = saved["apps"]
+                self.secrets = set(saved["secrets"])
+                self.retry = set(saved.get("retry", []))
+                self.orphans = set(saved.get("orphans", []))
+                self.loaded = True
+            except Exception as e:
+                logger.error(f"Ignoring unreadable reconcile state: {str(e)}")
+
+    def save(self):
+        if not self.path:
+            return
+        atomic_write_json(self.path, {
+            "apigee_watermark": self.apigee_watermark,
+            "event_seq": self.event_seq,
+            "apps": self.apps,
+            "secrets": sorted(self.secrets),
+            "retry": sorted(self.retry),
+            "orphans": sorted(self.orphans)
+        })
+
+
+class Reconciler:
+    """Keeps Apigee developer apps and stored secrets in step.
+
+    Each pass collects the apps that changed since the last one: Apigee
+    apps modified after the watermark, and apps this service created,
+    rotated or deleted according to the change feed. Only those are
+    diffed, into one action each:
+
+    - create: an approved Apigee app has no secret; create one and register
+      its key with the app
+    - register: the app does not have the secret's current key; add it
+    - rotate: the app has the current key but revoked it; issue a new one
+    - orphan: a secret whose app is gone or no longer approved; deleted
+      with ``delete_orphans``, otherwise only reported, on every pass
+      until its app comes back or the secret goes
+    - unknown: the secret's current key could not be read; reported and
+      retried on the next pass
+
+    Actions run ``concurrency`` at a time. Apigee has no deletion feed, so
+    every ``full_every`` passes (and when there is no saved state, or the
+    change feed overflowed) both sides are listed in full.
+    """
+
+    def __init__(
+        self,
+        apigee,
+        list_secret_apps: Callable[[], Awaitable[List[str]]],
+        current_key: Callable[[str], Awaitable[Optional[str]]],
+        credentials: Callable[[str], Awaitable[Tuple[str, str]]],
+        create: Callable[[str], Awaitable[Tuple[str, str]]],
+        rotate: Callable[[str], Awaitable[Tuple[str, str]]],
+        delete_orphan: Callable[[str], Awaitable[None]],
+        events: EventLog,
+        state: ReconcileState,
+        concurrency: int = 16,
+        full_every: int = 12,
+        interval_seconds: float = 300,
+        owns: Optional[Callable[[str], bool]] = None,
+        delete_orphans: bool = False
+    ):
+        self.apigee = apigee
+        self.list_secret_apps = list_secret_apps
+        self.current_key = current_key
+        self.credentials = credentials
+        self.create = create
+        self.rotate = rotate
+        self.delete_orphan = delete_orphan
+        self.delete_orphans = delete_orphans
+        self.events = events
+        self.state = state
+        self.concurrency = concurrency
+        self.full_every = full_every
+        self.interval_seconds = interval_seconds
+        self.owns = owns or (lambda app_name: True)
+        self.passes = 0
+        # The change feed is per process and starts again at 0; the Apigee
+        # watermark carries over, so a restart stays incremental
+        self.state.event_seq = 0
+        self._since_full = 0 if state.loaded else full_every
+        self.last_pass: Optional[Dict] = None
+        self.recent: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _apigee(self, method: str, *args):
+        # The Apigee clients are blocking
+        return await asyncio.get_running_loop().run_in_executor(None, getattr(self.apigee, method), *args)
+
+    def _apply_events(self) -> Set[str]:
+        """Apps this service changed since the last pass"""
+        events, _ = self.events.since(self.state.event_seq, limit=max(1, self.events.last_seq - self.state.event_seq))
+        changed = set()
+        for event in events:
+            changed.add(event["app_name"])
+            if event["type"] == "deleted":
+                self.state.secrets.discard(event["app_name"])
+            else:
+                self.state.secrets.add(event["app_name"])
+        self.state.event_seq = self.events.last_seq
+        return changed
+
+    async def _collect(self, full: bool) -> Set[str]:
+        """Refresh the cached state and return the apps to diff"""
+        since = 0 if full else max(0, self.state.apigee_watermark - WATERMARK_SKEW_MS)
+        changed_apps = await self._apigee("list_apps", since)
+        if full:
+            self.state.apps = {}
+        dirty = set(self.state.retry)
+        for app in changed_apps:
+            summary = app_summary(app)
+            self.state.apigee_watermark = max(self.state.apigee_watermark, summary["modified"])
+            # Apps re-read inside the skew window are usually unchanged
+            if self.state.apps.get(app["name"]) != summary:
+                self.state.apps[app["name"]] = summary
+                dirty.add(app["name"])
+        dirty |= self._apply_events()
+        if full:
+            self.state.secrets = set(await self.list_secret_apps())
+            dirty |= set(self.state.apps) | self.state.secrets
+        return dirty
+
+    async def plan(self, app_name: str) -> Optional[str]:
+        """The action an app needs, or None if it is in step"""
+        app = self.state.apps.get(app_name)
+        has_secret = app_name in self.state.secrets
+        if app is None or app["status"] != "approved":
+            return "orphan" if has_secret else None
+        if not has_secret:
+            return "create"
+        key = await self.current_key(app_name)
+        if key is None:
+            # Not known to this process, e.g. apps seeded from the rotation
+            # schedule after a restart; read it from the secret
+            try:
+                key, _ = await self.credentials(app_name)
+            except Exception as e:
+                logger.warning(f"Could not read the current key of {app_name}: {getattr(e, 'detail', None) or e}")
+                return "unknown"
+        if key not in app["keys"]:
+            return "register"
+        if app["keys"][key] != "approved":
+            return "rotate"
+        return None
+
+    async def _act(self, app_name: str, action: str, dry_run: bool) -> Dict:
+        result = {"app_name": app_name, "action": action}
+        if dry_run:
+            return {**result, "status": "planned"}
+        if action == "unknown":
+            self.state.retry.add(app_name)
+            return {**result, "status": "unknown"}
+        if action == "orphan" and not self.delete_orphans:
+            # Report only: nothing changes, so the orphan is planned again
+            # on every pass
+            if app_name not in self.state.orphans:
+                logger.warning(f"Secret for {app_name} has no approved Apigee app")
+                self.state.orphans.add(app_name)
+            return {**result, "status": "reported"}
+        try:
+            if action == "orphan":
+                await self.delete_orphan(app_name)
+                self.state.secrets.discard(app_name)
+                self.state.orphans.discard(app_name)
+            else:
+                make = {"create": self.create, "register": self.credentials, "rotate": self.rotate}[action]
+                consumer_key, consumer_secret = await make(app_name)
+                app = self.state.apps[app_name]
+                await self._apigee(
+                    "add_key", app_name, app["developer_id"], consumer_key, consumer_secret, app["api_products"] or None
+                )
+                app["keys"][consumer_key] = "approved"
+                self.state.secrets.add(app_name)
+            self.state.retry.discard(app_name)
+            return {**result, "status": "done"}
+        except Exception as e:
+            self.state.retry.add(app_name)
+            detail = getattr(e, "detail", None) or str(e)
+            logger.error(f"Reconcile {action} failed for {app_name}: {detail}")
+            return {**result, "status": "error", "error": detail}
+
+    @in_lane(BACKGROUND)
+    async def run_pass(self, full: Optional[bool] = None, dry_run: bool = False) -> Dict:
+        """Diff what changed and act on it; returns a report"""
+        async with self._lock:
+            started = datetime.now()
+            # A gap in the change feed (buffer overflow) hides some of our
+            # own changes, so fall back to a full pass
+            _, reset = self.events.since(self.state.event_seq, limit=1)
+            if full is None:
+                full = reset or self._since_full >= self.full_every
+            dirty = await self._collect(full) | self.state.orphans
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def plan_one(name: str) -> Tuple[str, Optional[str]]:
+                async with semaphore:
+                    return name, await self.plan(name)
+
+            planned = await asyncio.gather(*(plan_one(name) for name in sorted(dirty) if self.owns(name)))
+            if not dry_run:
+                self.state.orphans -= {name for name, action in planned if action != "orphan"}
+            planned = [(name, action) for name, action in planned if action]
+            if dry_run:
+                # The changes were consumed from the watermark and feed;
+                # look at these apps again on the next real pass
+                self.state.retry |= {name for name, _ in planned}
+
+            async def bounded(name: str, action: str) -> Dict:
+                async with semaphore:
+                    return await self._act(name, action, dry_run)
+
+            results = await asyncio.gather(*(bounded(name, action) for name, action in planned))
+            for result in results:
+                self.recent[result["app_name"]] = {**result, "at": datetime.now().isoformat()}
+                self.recent.move_to_end(result["app_name"])
+            while len(self.recent) > 1000:
+                self.recent.popitem(last=False)
+            # Our own create/rotate calls published events; they are already
+            # reflected in the cached state
+            self._apply_events()
+            if not dry_run:
+                self.passes += 1
+                self._since_full = 1 if full else self._since_full + 1
+                self.state.save()
+            counts = {action: 0 for action in ACTIONS}
+            for result in results:
+                counts[result["action"]] += 1
+            report = {
+                "started_at": started.isoformat(),
+                "finished_at": datetime.now().isoformat(),
+                "full": full,
+                "dry_run": dry_run,
+                "checked": len(dirty),
+                **counts,
+                "failed": sum(1 for r in results if r["status"] == "error"),
+                "actions": results
+            }
+            if not dry_run:
+                self.last_pass = {k: v for k, v in report.items() if k != "actions"}
+            logger.info(f"Reconcile pass: {self.last_pass or report['checked']}")
+            return report
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_pass()
+            except Exception as e:
+                logger.error(f"Reconcile pass failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Reconciler started, every {self.interval_seconds}s")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.state.save()
+
+    def status(self) -> Dict:
+        return {
+            "running": self._task is not None,
+            "passes": self.passes,
+            "apigee_watermark": self.state.apigee_watermark,
+            "event_seq": self.state.event_seq,
+            "apps": len(self.state.apps),
+            "secrets": len(self.state.secrets),
+            "retrying": len(self.state.retry),
+            "orphans": sorted(self.state.orphans)[:100],
+            "last_pass": self.last_pass,
+            "recent": list(self.recent.values())[-20:]
+        }
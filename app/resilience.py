@@ -0,0 +1,310 @@
+# app/resilience.py
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterator, Optional
+
+from google.api_core import exceptions
+
+from app.metrics import RPC_HEDGES, RPC_REJECTED, RPC_RETRIES
+from app.quota import QuotaLimiter, quota_limiter_from_env
+
+logger = logging.getLogger(__name__)
+
+# Errors worth another attempt; everything else (NotFound, PermissionDenied,
+# InvalidArgument...) is a definite answer from a healthy backend
+RETRYABLE_ERRORS = (
+    exceptions.ServiceUnavailable,
+    exceptions.DeadlineExceeded,
+    exceptions.InternalServerError,
+    exceptions.Aborted,
+    exceptions.ResourceExhausted
+)
+
+# Errors that point at a degraded backend and count towards opening the
+# circuit; running out of quota is our own doing and does not
+BREAKER_ERRORS = (
+    exceptions.ServiceUnavailable,
+    exceptions.DeadlineExceeded,
+    exceptions.InternalServerError
+)
+
+# Calls that can be repeated without changing anything
+IDEMPOTENT_RPCS = {
+    "connect",
+    "get_secret",
+    "get_secret_version",
+    "access_secret_version",
+    "list_secrets",
+    "list_secret_versions"
+}
+
+
+class CircuitOpenError(exceptions.ServiceUnavailable):
+    """Raised instead of calling a backend that keeps failing"""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+
+    Delay n is drawn uniformly from [0, min(max_delay, initial * multiplier**n)],
+    which spreads out retries from many callers that failed together.
+    """
+
+    def __init__(self, attempts: int = 4, initial_delay: float = 0.1, max_delay: float = 5, multiplier: float = 2):
+        self.attempts = max(1, attempts)
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+    def delays(self) -> Iterator[float]:
+        """Sleep before each retry; yields attempts - 1 values"""
+        for n in range(self.attempts - 1):
+            yield random.uniform(0, min(self.max_delay, self.initial_delay * self.multiplier ** n))
+
+
+class CircuitBreaker:
+    """Fails fast after ``failure_threshold`` consecutive backend failures.
+
+    Once open, calls are refused for ``reset_seconds``; then a single probe
+    call is let through (half-open) and its outcome closes or re-opens the
+    circuit. A probe that never reports back (cancelled) is replaced after
+    another ``reset_seconds``. Thread-safe, so sync and async callers can
+    share one breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probe_started is not None or time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now"""
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - (self._probe_started or self._opened_at) < self.reset_seconds:
+                return False
+            self._probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probe_started is not None or (self._opened_at is None and self.failures >= self.failure_threshold):
+                if self._opened_at is None:
+                    logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+                    self.opened += 1
+                self._opened_at = time.monotonic()
+            self._probe_started = None
+
+    def record(self, error: Optional[BaseException]):
+        """Feed a call outcome to the breaker"""
+        if error is None or not isinstance(error, BREAKER_ERRORS):
+            self.record_success()
+        elif not isinstance(error, CircuitOpenError):
+            self.record_failure()
+
+    def status(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.opened
+        }
+
+
+class Resilience:
+    """Deadline, retry, circuit breaker and hedging around backend calls.
+
+    ``deadline_seconds`` bounds a call including all of its retries. Only
+    idempotent calls are retried or hedged; writes get one attempt under
+    the deadline. A hedged call starts a second attempt if the first has
+    not answered within ``hedge_after_seconds`` and takes whichever answers
+    first. Every attempt first takes a token from ``limiter``; time spent
+    queued for quota does not count against the deadline, and hedges are
+    only sent with a token that is free right away.
+
+    Attempts are called with the time left before the deadline (None
+    without one), which they pass on to the client as its own timeout so
+    an abandoned attempt does not keep running.
+    """
+
+    def __init__(
+        self,
+        deadline_seconds: float = 10,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_after_seconds: float = 0,
+        limiter: Optional[QuotaLimiter] = None
+    ):
+        self.deadline_seconds = deadline_seconds
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_after_seconds = hedge_after_seconds
+        self.limiter = limiter or QuotaLimiter({})
+
+    def _check_breaker(self, rpc: str):
+        if not self.breaker.allow():
+            RPC_REJECTED.inc(rpc)
+            raise CircuitOpenError(f"Secret Manager circuit is open; {rpc} not attempted")
+
+    async def _hedged(self, attempt: Callable[[Optional[float]], Awaitable], rpc: str, timeout: Optional[float]):
+        pending = {asyncio.ensure_future(attempt(timeout))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_after_seconds)
+            if not done and self.limiter.try_acquire(rpc):
+                RPC_HEDGES.inc(rpc)
+                pending.add(asyncio.ensure_future(attempt(timeout)))
+            while not done:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Keep waiting on the other attempt if this one failed
+                failed = [task for task in done if task.exception() is not None]
+                if len(failed) == len(done) and pending:
+                    done = set()
+            winner = next((task for task in done if task.exception() is None), next(iter(done)))
+            return winner.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(
+        self, attempt: Callable[[Optional[float]], Awaitable], rpc: str, idempotent: bool = False, hedge: bool = False
+    ):
+        """Await attempt(timeout) under the deadline, retrying idempotent calls"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds if self.deadline_seconds else None
+        delays = self.retry.delays() if idempotent else iter(())
+        while True:
+            self._check_breaker(rpc)
+            waited = await self.limiter.acquire(rpc)
+            if deadline:
+                deadline += waited
+            remaining = deadline - loop.time() if deadline else None
+            try:
+                if hedge and idempotent and self.hedge_after_seconds:
+                    pending = self._hedged(attempt, rpc, remaining)
+                else:
+                    pending = attempt(remaining)
+                result = await asyncio.wait_for(pending, remaining)
+            except asyncio.TimeoutError:
+                error = exceptions.DeadlineExceeded(f"{rpc} did not finish within {self.deadline_seconds}s")
+                self.breaker.record(error)
+                raise error
+            except Exception as e:
+                self.breaker.record(e)
+                delay = next(delays, None) if isinstance(e, RETRYABLE_ERRORS) else None
+                if delay is None or (deadline and loop.time() + delay >= deadline):
+                    raise
+                RPC_RETRIES.inc(rpc)
+                logger.debug(f"Retrying {rpc} in {delay:.2f}s after {type(e).__name__}")
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record(None)
+            return result
+
+    def call_sync(self, func: Callable, rpc: str, idempotent: bool = False, **kwargs):
+        """Blocking variant for the sync clients.
+
+        The remaining deadline is passed to the client method as ``timeout``,
+        and ``retry=None`` turns off the client's own retries; both the GAPIC
+        client and the emulator accept them.
+        """
+        deadline = time.monotonic() + self.deadline_seconds if self.deadline_seconds else None
+        delays = self.retry.delays() if idempotent else iter(())
+        while True:
+            self._check_breaker(rpc)
+            waited = self.limiter.acquire_sync(rpc)
+            kwargs["retry"] = None
+            if deadline:
+                deadline += waited
+                kwargs["timeout"] = max(0.001, deadline - time.monotonic())
+            try:
+                result = func(**kwargs)
+            except Exception as e:
+                self.breaker.record(e)
+                delay = next(delays, None) if isinstance(e, RETRYABLE_ERRORS) else None
+                if delay is None or (deadline and time.monotonic() + delay >= deadline):
+                    raise
+                RPC_RETRIES.inc(rpc)
+                time.sleep(delay)
+                continue
+            self.breaker.record(None)
+            return result
+
+    def list_sync(self, func: Callable, rpc: str, request: Dict, field: str) -> Iterator:
+        """Items of a paged list RPC, fetched one page per call_sync.
+
+        Iterating a GAPIC pager fetches later pages lazily, outside any
+        deadline or retry; here each page is requested with its page_token
+        instead. ``field`` names the items on a page, e.g. ``"secrets"``.
+        Pages are fetched as the items are consumed.
+        """
+        request = dict(request)
+        while True:
+            def fetch_page(**options):
+                page = next(iter(func(request=request, **options).pages))
+                return list(getattr(page, field)), page.next_page_token
+
+            items, next_page_token = self.call_sync(fetch_page, rpc, idempotent=rpc in IDEMPOTENT_RPCS)
+            yield from items
+            if not next_page_token:
+                return
+            request["page_token"] = next_page_token
+
+
+_shared: Optional[Resilience] = None
+_shared_lock = threading.Lock()
+
+
+def shared_resilience() -> Resilience:
+    """Process-wide Resilience configured from SECRET_MANAGER_* variables.
+
+    Every entry point shares it, so all calls to the backend feed and obey
+    the same circuit breaker.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = _from_env()
+        return _shared
+
+
+def _from_env() -> Resilience:
+    return Resilience(
+        deadline_seconds=float(os.getenv("SECRET_MANAGER_DEADLINE_SECONDS", "10")),
+        retry=RetryPolicy(
+            attempts=int(os.getenv("SECRET_MANAGER_RETRY_ATTEMPTS", "4")),
+            initial_delay=float(os.getenv("SECRET_MANAGER_RETRY_INITIAL_SECONDS", "0.1")),
+            max_delay=float(os.getenv("SECRET_MANAGER_RETRY_MAX_SECONDS", "5"))
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("SECRET_MANAGER_BREAKER_FAILURES", "5")),
+            reset_seconds=float(os.getenv("SECRET_MANAGER_BREAKER_RESET_SECONDS", "30"))
+        ),
+        hedge_after_seconds=float(os.getenv("SECRET_MANAGER_HEDGE_AFTER_SECONDS", "0")),
+        limiter=quota_limiter_from_env()
+    )
@@ -0,0 +1,225 @@
+# app/scheduler.py
+import asyncio
+import heapq
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.files import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+class RotationIndex:
+    """Min-heap of apps ordered by next_rotation.
+
+    Rescheduling an app pushes a new heap entry and leaves the old one in
+    place; stale entries are skipped when popped and dropped when the heap
+    is compacted.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, str]] = []
+        self._due: Dict[str, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, app_name: str) -> bool:
+        return app_name in self._due
+
+    def schedule(self, app_name: str, next_rotation: datetime):
+        """Insert or move an app in the index"""
+        self._due[app_name] = next_rotation
+        heapq.heappush(self._heap, (next_rotation, app_name))
+        if len(self._heap) > 2 * len(self._due) + 1024:
+            self._compact()
+
+    def remove(self, app_name: str):
+        """Forget an app; its heap entry becomes stale"""
+        self._due.pop(app_name, None)
+
+    def next_due(self) -> Optional[datetime]:
+        """Earliest next_rotation in the index"""
+        while self._heap:
+            next_rotation, app_name = self._heap[0]
+            if self._due.get(app_name) == next_rotation:
+                return next_rotation
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: datetime, limit: int) -> List[str]:
+        """Remove and return up to limit apps due at or before now"""
+        due = []
+        while self._heap and len(due) < limit:
+            next_rotation, app_name = self._heap[0]
+            if next_rotation > now:
+                break
+            heapq.heappop(self._heap)
+            if self._due.get(app_name) == next_rotation:
+                del self._due[app_name]
+                due.append(app_name)
+        return due
+
+    def count_due(self, now: datetime) -> int:
+        """Number of apps due at or before now"""
+        return sum(1 for next_rotation in self._due.values() if next_rotation <= now)
+
+    def snapshot(self) -> Dict[str, str]:
+        return {app_name: ts.isoformat() for app_name, ts in self._due.items()}
+
+    def load(self, snapshot: Dict[str, str]):
+        """Merge a snapshot in; entries scheduled since startup win"""
+        loaded = {app_name: datetime.fromisoformat(ts) for app_name, ts in snapshot.items()}
+        loaded.update(self._due)
+        self._due = loaded
+        self._compact()
+
+    def _compact(self):
+        self._heap = [(ts, app_name) for app_name, ts in self._due.items()]
+        heapq.heapify(self._heap)
+
+
+class RotationScheduler:
+    """Rotates apps automatically once their next_rotation has passed.
+
+    A single APScheduler interval job drains the due part of a
+    RotationIndex, so the number of timers does not grow with the number of
+    apps. Due apps are rotated by at most ``max_workers`` concurrent calls.
+    The index is snapshotted to ``state_path`` so a restart does not need to
+    rescan every secret payload. With several replicas, ``owns`` limits the
+    index to this replica's share of the apps.
+    """
+
+    def __init__(
+        self,
+        rotate: Callable[[str], Awaitable],
+        state_path: str,
+        tick_seconds: float = 30,
+        max_workers: int = 4,
+        batch_size: int = 500,
+        retry_delay_seconds: float = 300,
+        owns: Optional[Callable[[str], bool]] = None
+    ):
+        self.rotate = rotate
+        self.owns = owns or (lambda app_name: True)
+        self.state_path = state_path
+        self.tick_seconds = tick_seconds
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.retry_delay = timedelta(seconds=retry_delay_seconds)
+        self.index = RotationIndex()
+        self.in_flight = set()
+        self.rotated = 0
+        self.failed = 0
+        self.last_run: Optional[datetime] = None
+        self._dirty = False
+        self._scheduler = None
+
+    async def start(self, seed: Optional[Callable[[], Awaitable[Dict[str, datetime]]]] = None):
+        """Load the saved index (or seed it once) and start the timer"""
+        if not self.load() and seed is not None:
+            logger.info("No rotation schedule snapshot found, seeding from storage")
+            for app_name, next_rotation in (await seed()).items():
+                if app_name not in self.index and self.owns(app_name):
+                    self.index.schedule(app_name, next_rotation)
+            self._dirty = True
+            self.save()
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        self._scheduler = AsyncIOScheduler()
+        self._scheduler.add_job(
+            self.run_due,
+            "interval",
+            seconds=self.tick_seconds,
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.now()
+        )
+        self._scheduler.start()
+        logger.info(f"Rotation scheduler started with {len(self.index)} apps")
+
+    async def stop(self):
+        """Stop the timer and persist the index"""
+        if self._scheduler:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+        self.save()
+
+    def schedule(self, app_name: str, next_rotation: datetime):
+        """Record when an app is next due; called after create and rotate"""
+        if not self.owns(app_name):
+            return
+        self.index.schedule(app_name, next_rotation)
+        self._dirty = True
+
+    def unschedule(self, app_name: str):
+        self.index.remove(app_name)
+        self._dirty = True
+
+    async def run_due(self):
+        """Rotate every app whose next_rotation has passed"""
+        self.last_run = datetime.now()
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def worker(app_name: str):
+            async with semaphore:
+                try:
+                    await self.rotate(app_name)
+                    self.rotated += 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.error(f"Scheduled rotation failed for {app_name}: {str(e)}")
+                    if app_name not in self.index:
+                        self.schedule(app_name, datetime.now() + self.retry_delay)
+                finally:
+                    self.in_flight.discard(app_name)
+
+        while True:
+            due = [a for a in self.index.pop_due(datetime.now(), self.batch_size) if a not in self.in_flight]
+            if not due:
+                break
+            self._dirty = True
+            self.in_flight.update(due)
+            logger.info(f"Rotating {len(due)} due apps")
+            await asyncio.gather(*(worker(app_name) for app_name in due))
+        self.save()
+
+    def load(self) -> bool:
+        """Restore the index from the snapshot file, if there is one"""
+        try:
+            with open(self.state_path) as f:
+                snapshot = json.load(f)
+            # The snapshot may predate a change in the replica set
+            self.index.load({a: ts for a, ts in snapshot.items() if self.owns(a)})
+            logger.info(f"Loaded rotation schedule for {len(self.index)} apps")
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.error(f"Ignoring unreadable rotation schedule snapshot: {str(e)}")
+            return False
+
+    def save(self):
+        """Atomically write the index snapshot if it changed"""
+        if not self._dirty:
+            return
+        try:
+            atomic_write_json(self.state_path, self.index.snapshot())
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Failed to save rotation schedule: {str(e)}")
+
+    def status(self) -> Dict:
+        next_due = self.index.next_due()
+        return {
+            "running": self._scheduler is not None,
+            "apps": len(self.index),
+            "due": self.index.count_due(datetime.now()),
+            "in_flight": len(self.in_flight),
+            "next_due": next_due.isoformat() if next_due else None,
+            "rotated": self.rotated,
+            "failed": self.failed,
+            "last_run": self.last_run.isoformat() if self.last_run else None
+        }
@@ -1,11 +1,13 @@
 # app/secret_manager.py
-from google.cloud import secretmanager_v1
 from google.api_core import exceptions
 from datetime import datetime, timedelta
 import json
 import logging
 import os
 from typing import Dict, Optional
+from app.clients import create_secret_manager_client
+from app.metadata import metadata_annotations
+from app.resilience import IDEMPOTENT_RPCS, shared_resilience
 
 logger = logging.getLogger(__name__)
 
@@ -14,13 +16,20 @@ class SecretManagerClient:
         """Initialize Secret Manager client with existing credentials"""
         try:
             self.project_id = project_id
-            self.client = secretmanager_v1.SecretManagerServiceClient()
+            self.client = create_secret_manager_client()
+            self.resilience = shared_resilience()
             self.parent = f"projects/{project_id}"
             logger.info(f"Initialized Secret Manager for project: {project_id}")
         except Exception as e:
             logger.error(f"Failed to initialize Secret Manager: {str(e)}")
             raise
 
+    def _call(self, method: str, **kwargs):
+        """Client call under the shared deadline, retry and circuit breaker"""
+        return self.resilience.call_sync(
+            getattr(self.client, method), method, idempotent=method in IDEMPOTENT_RPCS, **kwargs
+        )
+
     async def store_api_key(self, app_name: str, credentials: Dict, rotation_period_days: int) -> Dict:
         """Store API key and secret in Secret Manager"""
         try:
@@ -38,14 +47,17 @@ class SecretManagerClient:
             # Check if secret exists
             secret_id = f"apigee-key-{app_name}"
             secret_path = f"{self.parent}/secrets/{secret_id}"
+            annotations = metadata_annotations({**secret_data["metadata"], "app_name": app_name})
 
+            created = False
             try:
                 # Try to access existing secret
-                self.client.get_secret(request={"name": secret_path})
+                self._call("get_secret", request={"name": secret_path})
                 logger.info(f"Secret already exists for app: {app_name}")
             except exceptions.NotFound:
                 # Create new secret if it doesn't exist
-                self.client.create_secret(
+                self._call(
+                    "create_secret",
                     request={
                         "parent": self.parent,
                         "secret_id": secret_id,
@@ -55,15 +67,18 @@ class SecretManagerClient:
                                 "app": app_name,
                                 "created_by": "apigee-key-manager",
                                 "created_at": datetime.now().strftime("%Y%m%d")
-                            }
+                            },
+                            "annotations": annotations
                         }
                     }
                 )
+                created = True
                 logger.info(f"Created new secret for app: {app_name}")
 
             # Add new version with the credentials
             secret_value = json.dumps(secret_data).encode("UTF-8")
-            version = self.client.add_secret_version(
+            version = self._call(
+                "add_secret_version",
                 request={
                     "parent": secret_path,
                     "payload": {"data": secret_value}
@@ -71,6 +86,16 @@ class SecretManagerClient:
             )
             logger.info(f"Added new version for app: {app_name}")
 
+            if not created:
+                # Mirror the new rotation metadata onto the secret resource
+                self._call(
+                    "update_secret",
+                    request={
+                        "secret": {"name": secret_path, "annotations": annotations},
+                        "update_mask": {"paths": ["annotations"]}
+                    }
+                )
+
             return secret_data
 
         except Exception as e:
@@ -83,7 +108,7 @@ class SecretManagerClient:
             secret_id = f"apigee-key-{app_name}"
             name = f"{self.parent}/secrets/{secret_id}/versions/latest"
             
-            response = self.client.access_secret_version(request={"name": name})
+            response = self._call("access_secret_version", request={"name": name})
             return json.loads(response.payload.data.decode("UTF-8"))
 
         except exceptions.NotFound:
@@ -100,7 +125,7 @@ class SecretManagerClient:
             request = {"parent": self.parent, "filter": "labels.created_by=apigee-key-manager"}
             
             # List all secrets with our label
-            for secret in self.client.list_secrets(request=request):
+            for secret in self.resilience.list_sync(self.client.list_secrets, "list_secrets", request, "secrets"):
                 try:
                     app_name = secret.labels.get("app")
                     if app_name:
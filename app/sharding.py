@@ -0,0 +1,59 @@
+# app/sharding.py
+import bisect
+import hashlib
+import os
+import socket
+from typing import List, Optional
+
+
+def _point(value: str) -> int:
+    return int.from_bytes(hashlib.sha256(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring assigning each app to one replica.
+
+    Every replica is placed at ``vnodes`` points on the ring and an app
+    belongs to the first replica point at or after its own hash. All
+    replicas configured with the same member list agree on ownership
+    without talking to each other, and adding a replica moves only about
+    1/N of the apps.
+    """
+
+    def __init__(self, members: List[str], vnodes: int = 128):
+        if not members:
+            raise ValueError("A hash ring needs at least one member")
+        self.members = sorted(set(members))
+        ring = sorted((_point(f"{member}#{i}"), member) for member in self.members for i in range(vnodes))
+        self._points = [point for point, _ in ring]
+        self._owners = [member for _, member in ring]
+
+    def owner(self, key: str) -> str:
+        index = bisect.bisect_left(self._points, _point(key))
+        return self._owners[index % len(self._points)]
+
+
+class Shard:
+    """This replica's share of scheduled and bulk work"""
+
+    def __init__(self, replica_id: str, members: Optional[List[str]] = None, vnodes: int = 128):
+        self.replica_id = replica_id
+        members = members or [replica_id]
+        if replica_id not in members:
+            raise ValueError(f"Replica {replica_id} is not in the member list {members}")
+        self.ring = HashRing(members, vnodes)
+
+    @property
+    def members(self) -> List[str]:
+        return self.ring.members
+
+    def owns(self, app_name: str) -> bool:
+        return len(self.ring.members) == 1 or self.ring.owner(app_name) == self.replica_id
+
+    def status(self):
+        return {"replica_id": self.replica_id, "members": self.members}
+
+
+def default_replica_id() -> str:
+    """REPLICA_ID, falling back to the host name"""
+    return os.getenv("REPLICA_ID") or socket.gethostname()
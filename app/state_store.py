@@ -0,0 +1,303 @@
+# app/state_store.py
+import abc
+import asyncio
+import functools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Columns of an app record. Timestamps are datetimes in records and epoch
+# seconds in SQLite so range queries compare numbers.
+RECORD_FIELDS = (
+    "app_name",
+    "consumer_key",
+    "consumer_secret",
+    "last_rotated",
+    "next_rotation",
+    "rotation_period_days",
+    "version"
+)
+
+
+class StateStore(abc.ABC):
+    """Local store of app records keyed by app_name.
+
+    Records are plain dicts with the keys in RECORD_FIELDS; any of them
+    except app_name may be None. Async code goes through ``call``, which
+    keeps a blocking store off the event loop.
+    """
+
+    # Whether calls can wait on I/O or other processes
+    blocking = False
+
+    async def call(self, method: str, *args, **kwargs):
+        """Call a store method from async code"""
+        func = functools.partial(getattr(self, method), *args, **kwargs)
+        if not self.blocking:
+            return func()
+        return await asyncio.get_running_loop().run_in_executor(None, func)
+
+    @abc.abstractmethod
+    def get(self, app_name: str) -> Optional[Dict]:
+        """The record for app_name, or None"""
+
+    @abc.abstractmethod
+    def put(self, record: Dict):
+        """Insert or replace the record for record["app_name"]"""
+
+    @abc.abstractmethod
+    def delete(self, app_name: str):
+        """Remove the record for app_name, if there is one"""
+
+    @abc.abstractmethod
+    def list(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[Dict]:
+        """Records ordered by app_name, starting after the given name"""
+
+    @abc.abstractmethod
+    def due_before(self, until: datetime, limit: Optional[int] = None) -> List[Dict]:
+        """Records with next_rotation at or before until, earliest first"""
+
+    @abc.abstractmethod
+    def count(self) -> int:
+        """Number of records"""
+
+    @abc.abstractmethod
+    def count_due(self, until: datetime) -> int:
+        """Number of records with next_rotation at or before until"""
+
+    @abc.abstractmethod
+    def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        """Take the named lease unless someone else holds an unexpired one"""
+
+    @abc.abstractmethod
+    def release_lease(self, name: str, owner: str):
+        """Give up a lease, if owner still holds it"""
+
+    def close(self):
+        pass
+
+    def __contains__(self, app_name: str) -> bool:
+        return self.get(app_name) is not None
+
+    def __len__(self) -> int:
+        return self.count()
+
+
+class MemoryStateStore(StateStore):
+    """Process-local store; state is lost on restart"""
+
+    def __init__(self):
+        self._records: Dict[str, Dict] = {}
+        self._leases: Dict[str, tuple] = {}
+
+    def get(self, app_name: str) -> Optional[Dict]:
+        record = self._records.get(app_name)
+        return dict(record) if record else None
+
+    def put(self, record: Dict):
+        self._records[record["app_name"]] = {field: record.get(field) for field in RECORD_FIELDS}
+
+    def delete(self, app_name: str):
+        self._records.pop(app_name, None)
+
+    def list(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[Dict]:
+        names = sorted(name for name in self._records if after is None or name > after)
+        return [dict(self._records[name]) for name in names[:limit]]
+
+    def due_before(self, until: datetime, limit: Optional[int] = None) -> List[Dict]:
+        due = sorted(
+            (r for r in self._records.values() if r["next_rotation"] and r["next_rotation"] <= until),
+            key=lambda r: r["next_rotation"]
+        )
+        return [dict(r) for r in due[:limit]]
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def count_due(self, until: datetime) -> int:
+        return sum(1 for r in self._records.values() if r["next_rotation"] and r["next_rotation"] <= until)
+
+    def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        held = self._leases.get(name)
+        if held and held[0] != owner and held[1] > now:
+            return False
+        self._leases[name] = (owner, now + ttl_seconds)
+        return True
+
+    def release_lease(self, name: str, owner: str):
+        held = self._leases.get(name)
+        if held and held[0] == owner:
+            del self._leases[name]
+
+
+class SQLiteStateStore(StateStore):
+    """SQLite-backed store shared by every worker process on a host.
+
+    The database runs in WAL mode so readers in other processes see each
+    committed write without blocking the writer. app_name is the primary
+    key and next_rotation is indexed for due-date range queries.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, busy_timeout_ms: int = 2000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """The connection, opened on first use so importing the app writes nothing"""
+        if self._conn is None:
+            with self._open_lock:
+                if self._conn is None:
+                    self._conn = self._open()
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(
+            self.path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False, isolation_level=None
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS apps (
+                app_name TEXT PRIMARY KEY,
+                consumer_key TEXT,
+                consumer_secret TEXT,
+                last_rotated REAL,
+                next_rotation REAL,
+                rotation_period_days INTEGER,
+                version TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS apps_next_rotation ON apps (next_rotation);
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+        logger.info(f"Opened state store at {self.path}")
+        return conn
+
+    @staticmethod
+    def _to_row(record: Dict) -> Dict:
+        row = {field: record.get(field) for field in RECORD_FIELDS}
+        for field in ("last_rotated", "next_rotation"):
+            if row[field] is not None:
+                row[field] = row[field].timestamp()
+        row["updated_at"] = datetime.now().timestamp()
+        return row
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict:
+        record = {field: row[field] for field in RECORD_FIELDS}
+        for field in ("last_rotated", "next_rotation"):
+            if record[field] is not None:
+                record[field] = datetime.fromtimestamp(record[field])
+        return record
+
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def get(self, app_name: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM apps WHERE app_name = ?", (app_name,))
+        return rows[0] if rows else None
+
+    def put(self, record: Dict):
+        row = self._to_row(record)
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT INTO apps (app_name, consumer_key, consumer_secret, last_rotated,
+                                  next_rotation, rotation_period_days, version, updated_at)
+                VALUES (:app_name, :consumer_key, :consumer_secret, :last_rotated,
+                        :next_rotation, :rotation_period_days, :version, :updated_at)
+                ON CONFLICT (app_name) DO UPDATE SET
+                    consumer_key = excluded.consumer_key,
+                    consumer_secret = excluded.consumer_secret,
+                    last_rotated = excluded.last_rotated,
+                    next_rotation = excluded.next_rotation,
+                    rotation_period_days = excluded.rotation_period_days,
+                    version = excluded.version,
+                    updated_at = excluded.updated_at
+                """,
+                row
+            )
+
+    def delete(self, app_name: str):
+        with self._lock:
+            self._db.execute("DELETE FROM apps WHERE app_name = ?", (app_name,))
+
+    def list(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[Dict]:
+        return self._query(
+            "SELECT * FROM apps WHERE app_name > ? ORDER BY app_name LIMIT ?",
+            (after or "", -1 if limit is None else limit)
+        )
+
+    def due_before(self, until: datetime, limit: Optional[int] = None) -> List[Dict]:
+        return self._query(
+            "SELECT * FROM apps WHERE next_rotation <= ? ORDER BY next_rotation LIMIT ?",
+            (until.timestamp(), -1 if limit is None else limit)
+        )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM apps").fetchone()[0]
+
+    def count_due(self, until: datetime) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM apps WHERE next_rotation <= ?", (until.timestamp(),)
+            ).fetchone()[0]
+
+    def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        # One statement, so the check and the take are atomic across every
+        # process sharing the database
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                """
+                INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE leases.owner = excluded.owner OR leases.expires_at <= ?
+                """,
+                (name, owner, now + ttl_seconds, now)
+            )
+            return cursor.rowcount == 1
+
+    def release_lease(self, name: str, owner: str):
+        with self._lock:
+            self._db.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_state_store(kind: str, path: Optional[str] = None, busy_timeout_ms: int = 2000) -> StateStore:
+    """Build the state store selected by configuration"""
+    if kind == "memory":
+        return MemoryStateStore()
+    if kind == "sqlite":
+        return SQLiteStateStore(path, busy_timeout_ms)
+    raise ValueError(f"Unknown state store: {kind}")
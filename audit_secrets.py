@@ -0,0 +1,68 @@
+# audit_secrets.py
+"""Audit every Apigee key secret in the project.
+
+    python audit_secrets.py                      # JSON report, metadata only
+    python audit_secrets.py --format csv > audit.csv
+    python audit_secrets.py --payload always --versions 5 --concurrency 32
+
+Secrets are selected server-side by label and audited concurrently. The
+JSON report has a summary of overdue and soon-due rotations followed by one
+entry per app; with CSV the rows go to stdout and the summary to stderr.
+Consumer secrets are never printed.
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+current_dir = Path(__file__).resolve().parent
+sys.path.append(str(current_dir))
+
+
+def main():
+    from app.audit import AUDIT_FORMATS, DEFAULT_FILTER, PAYLOAD_MODES, SecretAuditor, write_csv
+    from app.clients import create_secret_manager_client, default_project_id
+
+    parser = argparse.ArgumentParser(description="Audit Apigee key secrets and their rotation status")
+    parser.add_argument("--format", choices=AUDIT_FORMATS, default="json")
+    parser.add_argument("--concurrency", type=int, default=16, help="secrets read at a time")
+    parser.add_argument("--due-within-days", type=float, default=7, help="window for due_soon")
+    parser.add_argument(
+        "--payload", choices=PAYLOAD_MODES, default="missing",
+        help="when to read the latest version: never, for secrets without annotations, or always (adds the key)"
+    )
+    parser.add_argument("--versions", type=int, default=0, help="also list up to N versions per secret")
+    parser.add_argument("--filter", default=DEFAULT_FILTER, help="Secret Manager list filter")
+    parser.add_argument("--fail-on-overdue", action="store_true", help="exit 2 when any rotation is overdue")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    project_id = default_project_id()
+    if not project_id:
+        parser.error("GOOGLE_CLOUD_PROJECT environment variable not set")
+    auditor = SecretAuditor(
+        create_secret_manager_client(),
+        f"projects/{project_id}",
+        concurrency=args.concurrency,
+        due_within_days=args.due_within_days,
+        payload=args.payload,
+        versions=args.versions,
+        filter=args.filter
+    )
+    report = auditor.run()
+    if args.format == "csv":
+        write_csv(report["apps"], sys.stdout)
+        print(json.dumps(report["summary"]), file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2, default=str))
+
+    summary = report["summary"]
+    if summary["error"]:
+        sys.exit(1)
+    if args.fail_on_overdue and summary["overdue"]:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
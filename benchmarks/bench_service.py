@@ -0,0 +1,268 @@
+# benchmarks/bench_service.py
+"""Load and latency benchmarks for the FastAPI service.
+
+Drives the ASGI app in-process against the Secret Manager emulator, so no
+GCP project or network is involved. Each app count runs in a fresh
+subprocess so state never leaks between runs.
+
+    python -m benchmarks.bench_service --apps 1000,10000 --output baseline.json
+    python -m benchmarks.bench_service --apps 1000 --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Each scenario is a weighted mix of request builders. A builder receives
+# the number of seeded apps and a counter, and returns (method, path).
+SCENARIOS: Dict[str, List[Tuple[float, str, Callable[[int, int], Tuple[str, str]]]]] = {
+    "read_heavy": [
+        (0.80, "GET /apps/{app_name}", lambda n, i: ("GET", f"/apps/app-{random.randrange(n)}")),
+        (0.10, "GET /verify/{app_name}", lambda n, i: ("GET", f"/verify/app-{random.randrange(n)}")),
+        (0.05, "GET /apps?page_size=100", lambda n, i: ("GET", "/apps?page_size=100")),
+        (0.05, "GET /apps?fields=metadata&page_size=100", lambda n, i: ("GET", "/apps?fields=metadata&page_size=100"))
+    ],
+    "rotation_storm": [
+        (0.70, "POST /apps/{app_name}/rotate", lambda n, i: ("POST", f"/apps/app-{random.randrange(n)}/rotate")),
+        (0.30, "GET /apps/{app_name}", lambda n, i: ("GET", f"/apps/app-{random.randrange(n)}"))
+    ],
+    "bulk_onboarding": [
+        (1.00, "POST /apps/{app_name}/schedule", lambda n, i: ("POST", f"/apps/onboard-{i}/schedule"))
+    ]
+}
+
+
+def configure_environment(latency_ms: float, jitter_ms: float):
+    """Point the service at a fresh emulator before app.main is imported"""
+    os.environ.update({
+        "DEV_MODE": "false",
+        "SECRET_BACKEND": "emulator",
+        "STATE_STORE": "memory",
+        "ROTATION_SCHEDULER_ENABLED": "false",
+        "EMULATOR_LATENCY_MS": str(latency_ms),
+        "EMULATOR_LATENCY_JITTER_MS": str(jitter_ms)
+    })
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+async def asgi_request(app, method: str, path: str, body: bytes = b"") -> Tuple[int, int]:
+    """Send one request through the ASGI interface; returns (status, body size)"""
+    raw_path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": raw_path,
+        "raw_path": raw_path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80)
+    }
+    sent = False
+    status = 0
+    size = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, size
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(samples: List[float], errors: int, elapsed: float) -> Dict:
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "req_per_s": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3)
+    }
+
+
+async def seed_apps(key_manager, count: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(i: int):
+        async with semaphore:
+            await key_manager.create_app(f"app-{i}", 30)
+
+    await asyncio.gather(*(create(i) for i in range(count)))
+
+
+async def run_scenario(app, name: str, apps: int, requests: int, concurrency: int) -> Dict:
+    mix = SCENARIOS[name]
+    weights = [weight for weight, _, _ in mix]
+    latencies: Dict[str, List[float]] = {label: [] for _, label, _ in mix}
+    errors: Dict[str, int] = {label: 0 for _, label, _ in mix}
+    counter = iter(range(requests))
+
+    async def client():
+        for i in counter:
+            _, label, build = random.choices(mix, weights=weights)[0]
+            method, path = build(apps, i)
+            body = b""
+            if path.endswith("/schedule"):
+                app_name = path.split("/")[2]
+                body = json.dumps({"app_name": app_name, "rotation_period_days": 30}).encode()
+            started = time.perf_counter()
+            status, _ = await asgi_request(app, method, path, body)
+            latencies[label].append(time.perf_counter() - started)
+            if status >= 400:
+                errors[label] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_samples = [s for samples in latencies.values() for s in samples]
+    return {
+        "overall": summarize(all_samples, sum(errors.values()), elapsed),
+        "routes": {label: summarize(latencies[label], errors[label], elapsed) for label in latencies}
+    }
+
+
+async def run_worker(args) -> Dict:
+    """Benchmark every scenario for one app count (runs in a subprocess)"""
+    configure_environment(args.latency_ms, args.jitter_ms)
+    import logging
+    logging.disable(logging.WARNING)
+    from app.main import app, key_manager
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        await seed_apps(key_manager, args.worker_apps, args.concurrency)
+        results["seed_seconds"] = round(time.perf_counter() - started, 2)
+        for name in args.scenarios.split(","):
+            results[name] = await run_scenario(app, name, args.worker_apps, args.requests, args.concurrency)
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Describe throughput and p99 regressions beyond tolerance"""
+    regressions = []
+    for apps, scenarios in current["results"].items():
+        for name, result in scenarios.items():
+            if not isinstance(result, dict):
+                continue
+            before = baseline.get("results", {}).get(apps, {}).get(name)
+            if not before:
+                continue
+            now, was = result["overall"], before["overall"]
+            line = (
+                f"{apps:>7} apps {name:<16} req/s {was['req_per_s']:>9} -> {now['req_per_s']:>9}"
+                f"   p99 {was['p99_ms']:>8}ms -> {now['p99_ms']:>8}ms"
+            )
+            print(line)
+            if was["req_per_s"] and now["req_per_s"] < was["req_per_s"] * (1 - tolerance):
+                regressions.append(f"{apps} apps {name}: throughput regressed")
+            if was["p99_ms"] and now["p99_ms"] > was["p99_ms"] * (1 + tolerance):
+                regressions.append(f"{apps} apps {name}: p99 latency regressed")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the key manager service in-process")
+    parser.add_argument("--apps", default="1000,10000", help="comma separated app counts, e.g. 1000,10000,100000")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated scenario names")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent clients")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="emulated backend latency")
+    parser.add_argument("--jitter-ms", type=float, default=3.0, help="emulated backend latency jitter")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    parser.add_argument("--worker-apps", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_apps is not None:
+        print(json.dumps(asyncio.run(run_worker(args))))
+        return
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms
+        },
+        "results": {}
+    }
+    for apps in [int(a) for a in args.apps.split(",")]:
+        print(f"Running {args.scenarios} with {apps} apps...", file=sys.stderr)
+        output = subprocess.check_output(
+            [sys.executable, "-m", "benchmarks.bench_service", *sys.argv[1:], "--worker-apps", str(apps)],
+            cwd=ROOT_DIR,
+            text=True
+        )
+        report["results"][str(apps)] = json.loads(output.strip().splitlines()[-1])
+
+    for apps, scenarios in report["results"].items():
+        for name, result in scenarios.items():
+            if isinstance(result, dict):
+                o = result["overall"]
+                print(
+                    f"{apps:>7} apps {name:<16} {o['req_per_s']:>9} req/s  "
+                    f"p50 {o['p50_ms']}ms  p95 {o['p95_ms']}ms  p99 {o['p99_ms']}ms  errors {o['errors']}"
+                )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline.get('revision')}:")
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
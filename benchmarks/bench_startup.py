@@ -0,0 +1,92 @@
+# benchmarks/bench_startup.py
+"""Cold start benchmark for the FastAPI service.
+
+Each run is a fresh interpreter that imports app.main, enters the lifespan
+and serves a first request, timing each step. The default target is the
+emulator; pass --backend gcp (with credentials) to include real client
+construction.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_service import ROOT_DIR, percentile
+
+STEPS = ("import_ms", "lifespan_ms", "first_request_ms", "ready_ms")
+
+
+async def measure_once(ready_timeout: float) -> dict:
+    """Time one cold start (runs in a subprocess)"""
+    import logging
+
+    logging.disable(logging.WARNING)
+    started = time.perf_counter()
+    from app.main import app
+    from benchmarks.bench_service import asgi_request
+
+    imported = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        entered = time.perf_counter()
+        status, _ = await asgi_request(app, "GET", "/health")
+        first_request = time.perf_counter()
+        from app.main import secret_manager
+
+        deadline = first_request + ready_timeout
+        while secret_manager and not secret_manager.ready and time.perf_counter() < deadline:
+            await asyncio.sleep(0.005)
+        ready = time.perf_counter()
+    return {
+        "import_ms": round((imported - started) * 1000, 1),
+        "lifespan_ms": round((entered - imported) * 1000, 1),
+        "first_request_ms": round((first_request - started) * 1000, 1),
+        "ready_ms": round((ready - started) * 1000, 1),
+        "status": status
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import-to-first-request time")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts")
+    parser.add_argument("--backend", default="emulator", help="SECRET_BACKEND for the runs")
+    parser.add_argument("--ready-timeout", type=float, default=30, help="seconds to wait for warm-up")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.path.insert(0, str(ROOT_DIR))
+        print(json.dumps(asyncio.run(measure_once(args.ready_timeout))))
+        return
+
+    env = {
+        **os.environ,
+        "DEV_MODE": "false",
+        "SECRET_BACKEND": args.backend,
+        "STATE_STORE": "memory",
+        "ROTATION_SCHEDULER_ENABLED": "false"
+    }
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.check_output(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--worker", "--ready-timeout", str(args.ready_timeout)],
+            cwd=ROOT_DIR,
+            env=env,
+            text=True
+        )
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    for step in STEPS:
+        samples = [run[step] / 1000 for run in runs]
+        print(
+            f"{step:<17} p50 {percentile(samples, 50) * 1000:>8.1f}ms"
+            f"   max {max(samples) * 1000:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
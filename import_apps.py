@@ -0,0 +1,65 @@
+# import_apps.py
+"""Onboard apps in bulk from a JSONL or CSV file.
+
+    python import_apps.py apps.jsonl
+    python import_apps.py apps.csv --concurrency 32
+
+Progress is checkpointed next to the input file (apps.jsonl.checkpoint.json
+by default); running the same command again after an interruption resumes
+where it stopped. Apps that already exist are skipped.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+current_dir = Path(__file__).resolve().parent
+sys.path.append(str(current_dir))
+
+
+async def import_file(path: str, fmt: str, concurrency: int, checkpoint_path: str, verbose: bool) -> dict:
+    from app.main import Config, key_manager, secret_manager
+    from app.onboarding import ImportCheckpoint, iter_file_lines, iter_records, run_import
+
+    summary = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            records = iter_records(iter_file_lines(f), fmt, Config.ROTATION_PERIOD_DAYS)
+            checkpoint = ImportCheckpoint(checkpoint_path)
+            if checkpoint.line:
+                print(f"Resuming after line {checkpoint.line}", file=sys.stderr)
+            async for result in run_import(records, key_manager.onboard_app, concurrency, checkpoint):
+                if result["status"] == "done":
+                    summary = result
+                elif verbose or result["status"] in ("error", "invalid"):
+                    print(json.dumps(result))
+    finally:
+        if secret_manager:
+            await secret_manager.flush_annotations()
+            secret_manager.close()
+        key_manager.store.close()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Onboard apps in bulk from a JSONL or CSV file")
+    parser.add_argument("path", help="file with app_name and rotation_period_days per row")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="defaults to the file extension")
+    parser.add_argument("--concurrency", type=int, default=16, help="apps created at a time")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <path>.checkpoint.json)")
+    parser.add_argument("--verbose", action="store_true", help="print every row's result")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+    checkpoint_path = args.checkpoint or f"{args.path}.checkpoint.json"
+    summary = asyncio.run(import_file(args.path, fmt, args.concurrency, checkpoint_path, args.verbose))
+    print(json.dumps(summary))
+    if summary.get("failed"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,27 @@
 # secret_utils.py
-from google.cloud import secretmanager_v1
 from google.api_core import exceptions
 import json
-from datetime import datetime
-import os
+from itertools import islice
+from typing import Optional
+from app.clients import create_secret_manager_client, default_project_id
+from app.audit import SecretAuditor
+from app.resilience import IDEMPOTENT_RPCS, shared_resilience
 
 class SecretVerifier:
     def __init__(self):
-        self.client = secretmanager_v1.SecretManagerServiceClient()
-        self.project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+        self.client = create_secret_manager_client()
+        self.resilience = shared_resilience()
+        self.project_id = default_project_id()
         if not self.project_id:
             raise ValueError("GOOGLE_CLOUD_PROJECT environment variable not set")
         self.parent = f"projects/{self.project_id}"
 
+    def _call(self, method: str, **kwargs):
+        """Client call under the shared deadline, retry and circuit breaker"""
+        return self.resilience.call_sync(
+            getattr(self.client, method), method, idempotent=method in IDEMPOTENT_RPCS, **kwargs
+        )
+
     def verify_app_secret(self, app_name: str) -> dict:
         """Verify secret exists and get its details"""
         try:
@@ -20,7 +29,7 @@ class SecretVerifier:
             secret_path = f"{self.parent}/secrets/{secret_id}/versions/latest"
             
             # Try to access the secret
-            response = self.client.access_secret_version(request={"name": secret_path})
+            response = self._call("access_secret_version", request={"name": secret_path})
             data = json.loads(response.payload.data.decode('UTF-8'))
             
             return {
@@ -35,15 +44,23 @@ class SecretVerifier:
         except Exception as e:
             return {"exists": False, "error": str(e)}
 
-    def get_secret_versions(self, secret_id: str) -> list:
-        """Get all versions of a secret"""
+    def get_secret_versions(self, secret_id: str, limit: Optional[int] = 20, include_destroyed: bool = False) -> list:
+        """Get the newest versions of a secret, skipping destroyed ones by default"""
         try:
             secret_path = f"{self.parent}/secrets/{secret_id}"
-            versions = list(self.client.list_secret_versions(request={"parent": secret_path}))
+            request = {"parent": secret_path}
+            if limit:
+                request["page_size"] = limit
+            if not include_destroyed:
+                request["filter"] = "state:ENABLED OR state:DISABLED"
+            versions = islice(
+                self.resilience.list_sync(self.client.list_secret_versions, "list_secret_versions", request, "versions"),
+                limit
+            )
             return [
                 {
                     "version": v.name.split('/')[-1],
-                    "state": "ENABLED" if v.state == secretmanager_v1.SecretVersion.State.ENABLED else "DISABLED",
+                    "state": v.state.name,
                     "create_time": v.create_time.isoformat()
                 }
                 for v in versions
@@ -51,17 +68,45 @@ class SecretVerifier:
         except Exception as e:
             return [{"error": str(e)}]
 
-    def verify_all_apps(self) -> dict:
-        """Verify all Apigee key secrets"""
+    def verify_all_apps(self, metadata_only: bool = False, concurrency: int = 16) -> dict:
+        """Verify all Apigee key secrets
+
+        Runs a SecretAuditor: secrets are selected by label on the server and
+        read ``concurrency`` at a time. With metadata_only, rotation metadata
+        is read from the secret annotations and no secret version is
+        accessed; secrets without annotations are reported with
+        ``metadata: None``.
+        """
         try:
-            secrets = list(self.client.list_secrets(request={"parent": self.parent}))
+            auditor = SecretAuditor(
+                self.client,
+                self.parent,
+                concurrency=concurrency,
+                payload="never" if metadata_only else "always",
+                versions=0 if metadata_only else 20,
+                resilience=self.resilience
+            )
             results = {}
-            
-            for secret in secrets:
-                if "apigee-key-" in secret.name:
-                    app_name = secret.name.split('/')[-1].replace('apigee-key-', '')
-                    results[app_name] = self.verify_app_secret(app_name)
-                    
+            for row in auditor.rows():
+                if row["status"] == "error":
+                    results[row["app_name"]] = {"exists": False, "error": row["error"]}
+                elif metadata_only:
+                    metadata = {
+                        "app_name": row["app_name"],
+                        **{k: row.get(k) for k in ("created_at", "last_rotated", "next_rotation", "rotation_period_days")}
+                    }
+                    results[row["app_name"]] = {
+                        "exists": True,
+                        "metadata": metadata if row["metadata_source"] == "annotations" else None
+                    }
+                else:
+                    results[row["app_name"]] = {
+                        "exists": True,
+                        "key": row.get("key"),
+                        "last_rotated": row.get("last_rotated"),
+                        "next_rotation": row.get("next_rotation"),
+                        "versions": row["versions"]
+                    }
             return results
         except Exception as e:
             return {"error": str(e)}
@@ -85,9 +130,10 @@ def verify_app(app_name: str):
 if __name__ == "__main__":
     # You can use this as a command-line tool
     import sys
-    if len(sys.argv) > 1:
-        verify_app(sys.argv[1])
+    args = [a for a in sys.argv[1:] if a != "--metadata-only"]
+    if args:
+        verify_app(args[0])
     else:
         verifier = SecretVerifier()
-        results = verifier.verify_all_apps()
+        results = verifier.verify_all_apps(metadata_only="--metadata-only" in sys.argv)
         print(json.dumps(results, indent=2))
\ No newline at end of file
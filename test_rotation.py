@@ -11,6 +11,10 @@ async def test_rotation():
         
         app_name = "test-app"
         print(f"\nTesting rotation for app: {app_name}")
+
+        if Config.SECRET_BACKEND == "emulator":
+            # The emulator starts empty in every process
+            await key_manager.create_app(app_name, 30)
         
         # Get current secret
         print("\nCurrent secret details:")
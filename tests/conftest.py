@@ -0,0 +1,33 @@
+# tests/conftest.py
+import os
+import uuid
+
+import pytest
+
+# Always run against the in-process emulator with throwaway state. These
+# must be set before app.main is imported; load_dotenv does not override them.
+os.environ["SECRET_BACKEND"] = "emulator"
+os.environ["DEV_MODE"] = "false"
+os.environ["STATE_STORE"] = "memory"
+os.environ["ROTATION_SCHEDULER_ENABLED"] = "false"
+os.environ["REPLICAS"] = ""
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def app_name() -> str:
+    """An app name no other test uses, since the emulator is process-wide"""
+    return f"test-{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+def emulator():
+    from app.clients import get_emulator
+
+    emulator = get_emulator()
+    yield emulator
+    emulator.configure(latency_ms=0, latency_jitter_ms=0, error_rate=0)
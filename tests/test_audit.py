@@ -0,0 +1,92 @@
+# tests/test_audit.py
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.audit import SecretAuditor, write_csv
+from app.metadata import metadata_annotations
+
+NOW = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def project(emulator):
+    """A project of its own, so the audit sees only the secrets made here"""
+    parent = f"projects/audit-{uuid.uuid4().hex[:8]}"
+
+    def add(app_name, next_rotation=None, annotated=True, payload=True, labels=None):
+        metadata = {"app_name": app_name, "last_rotated": NOW.isoformat(), "rotation_period_days": 30}
+        if next_rotation:
+            metadata["next_rotation"] = next_rotation.isoformat()
+        emulator.create_secret({
+            "parent": parent,
+            "secret_id": f"apigee-key-{app_name}",
+            "secret": {
+                "labels": labels or {"type": "apigee-key", "app": app_name},
+                "annotations": metadata_annotations(metadata) if annotated else {}
+            }
+        })
+        if payload:
+            data = {"credentials": {"key": f"key-{app_name}"}, "metadata": metadata}
+            emulator.add_secret_version({
+                "parent": f"{parent}/secrets/apigee-key-{app_name}",
+                "payload": {"data": json.dumps(data).encode()}
+            })
+
+    return parent, add
+
+
+def test_rows_and_summary(emulator, project):
+    parent, add = project
+    add("fine", NOW + timedelta(days=20))
+    add("soon", NOW + timedelta(days=3))
+    add("late", NOW - timedelta(days=1), annotated=False)
+    add("bare", annotated=False)
+    add("empty", annotated=False, payload=False)
+    add("foreign", NOW, labels={"team": "other"})
+
+    before = emulator.calls.get("list_secrets", 0)
+    report = SecretAuditor(emulator, parent, concurrency=4, page_size=2).run(NOW)
+    rows = {row["app_name"]: row for row in report["apps"]}
+    assert set(rows) == {"fine", "soon", "late", "bare", "empty"}
+    # One guarded list call per page
+    assert emulator.calls["list_secrets"] - before == 3
+    assert {name: row["status"] for name, row in rows.items()} == {
+        "fine": "ok", "soon": "due_soon", "late": "overdue", "bare": "no_metadata", "empty": "error"
+    }
+    # Payloads are read only where the annotations have no metadata
+    assert rows["fine"]["metadata_source"] == "annotations" and "key" not in rows["fine"]
+    assert rows["late"]["metadata_source"] == "payload" and rows["late"]["key"] == "key-late"
+
+    summary = report["summary"]
+    assert (summary["total"], summary["ok"], summary["due_soon"], summary["overdue"], summary["error"]) == (5, 1, 1, 1, 1)
+    assert [a["app_name"] for a in summary["due_soon_apps"]] == ["soon"]
+    assert summary["overdue_apps"][0]["days_until_rotation"] == -1
+
+
+def test_versions_and_csv(emulator, project):
+    parent, add = project
+    add("app", NOW + timedelta(days=20))
+    path = f"{parent}/secrets/apigee-key-app"
+    for _ in range(3):
+        emulator.add_secret_version({"parent": path, "payload": {"data": b"{}"}})
+    emulator.disable_secret_version({"name": f"{path}/versions/3"})
+
+    report = SecretAuditor(emulator, parent, payload="never", versions=3).run(NOW)
+    row = report["apps"][0]
+    assert [v["version"] for v in row["versions"]] == ["4", "3", "2"]
+    assert row["enabled_versions"] == 2
+
+    out = io.StringIO()
+    write_csv(report["apps"], out)
+    header, line = out.getvalue().splitlines()
+    assert header.startswith("app_name,secret_id,status,key")
+    assert line.startswith("app,apigee-key-app,ok,")
+
+
+def test_unknown_payload_mode_is_refused(emulator):
+    with pytest.raises(ValueError):
+        SecretAuditor(emulator, "projects/p", payload="sometimes")
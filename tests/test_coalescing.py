@@ -0,0 +1,68 @@
+# tests/test_coalescing.py
+import asyncio
+
+import pytest
+
+from app.cache import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 1}
+
+    results = await asyncio.gather(*(flight.do("app", fetch) for _ in range(10)))
+    assert len(calls) == 1
+    assert flight.coalesced == 9
+    assert all(result == {"value": 1} for result in results)
+    # Joiners get copies, so one caller cannot change another's result
+    results[0]["value"] = 2
+    assert results[1]["value"] == 1
+    assert len(flight) == 0
+
+
+async def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("backend down")
+
+    results = await asyncio.gather(*(flight.do("app", fetch) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_forget_starts_a_new_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        call_number = len(calls)
+        await asyncio.sleep(0.01)
+        return call_number
+
+    first = asyncio.ensure_future(flight.do("app", fetch))
+    await asyncio.sleep(0)
+    flight.forget("app")
+    second = await flight.do("app", fetch)
+    assert len(calls) == 2
+    assert await first == 1 and second == 2
+
+
+async def test_cold_reads_of_one_app_make_one_access_call(emulator, app_name):
+    from app.main import key_manager, secret_manager
+
+    await key_manager.create_app(app_name, 30)
+    secret_manager.cache.invalidate(app_name)
+    emulator.configure(latency_ms=20)
+    before = emulator.calls.get("access_secret_version", 0)
+    results = await asyncio.gather(*(secret_manager.get_secret(app_name) for _ in range(20)))
+    assert emulator.calls["access_secret_version"] - before == 1
+    assert len({result["credentials"]["key"] for result in results}) == 1
@@ -0,0 +1,87 @@
+# tests/test_compaction.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.compaction import CompactionWorker, VersionPolicy
+from app.emulator import State
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 1, 31, tzinfo=timezone.utc)
+
+
+class Version:
+    def __init__(self, number: int, age_days: float, state: State = State.ENABLED):
+        self.name = f"versions/{number}"
+        self.create_time = NOW - timedelta(days=age_days)
+        self.state = state
+
+
+def test_policy_keeps_the_newest_versions():
+    versions = [Version(n, age_days=40 - n) for n in range(5, 0, -1)]
+    plan = VersionPolicy(keep_enabled=2, destroy_after_days=37.5).plan(versions, now=NOW)
+    # Versions 5 and 4 are kept; 1 and 2 are old enough to destroy
+    assert plan == {"disable": ["versions/3"], "destroy": ["versions/2", "versions/1"]}
+
+
+def test_policy_skips_disabled_and_destroyed_versions():
+    versions = [
+        Version(4, 1), Version(3, 2, State.DISABLED), Version(2, 3), Version(1, 50, State.DESTROYED)
+    ]
+    plan = VersionPolicy(keep_enabled=1, destroy_after_days=0).plan(versions, now=NOW)
+    assert plan == {"disable": ["versions/2"], "destroy": []}
+
+
+def test_policy_needs_one_enabled_version():
+    with pytest.raises(ValueError):
+        VersionPolicy(keep_enabled=0)
+
+
+async def test_worker_prunes_an_apps_versions(emulator, app_name):
+    from app.main import key_manager, secret_manager
+
+    await key_manager.create_app(app_name, 30)
+    for _ in range(3):
+        await key_manager.rotate_secret(app_name)
+    async def list_apps():
+        return [app_name]
+
+    worker = CompactionWorker(
+        list_apps=list_apps,
+        list_versions=secret_manager.list_versions,
+        set_state=secret_manager.set_version_state,
+        policy=VersionPolicy(keep_enabled=2, destroy_after_days=0),
+        calls_per_second=0
+    )
+    report = await worker.compact_app(app_name)
+    assert (report["versions"], report["disabled"], report["destroyed"], report["errors"]) == (4, 2, 0, [])
+    assert [v.state.name for v in await secret_manager.list_versions(app_name)] == [
+        "ENABLED", "ENABLED", "DISABLED", "DISABLED"
+    ]
+    # The current credentials still read
+    secret_manager.cache.invalidate(app_name)
+    assert (await key_manager.get_app_status(app_name)).app_name == app_name
+    # A second pass finds nothing to do
+    assert (await worker.compact_app(app_name))["disabled"] == 0
+
+
+async def test_pass_counts_apps_that_failed():
+    async def list_apps():
+        return ["ok", "broken"]
+
+    async def list_versions(name):
+        if name == "broken":
+            raise RuntimeError("backend down")
+        return [Version(2, 1), Version(1, 2)]
+
+    changed = []
+
+    async def set_state(version_name, action):
+        changed.append((version_name, action))
+
+    worker = CompactionWorker(list_apps, list_versions, set_state, VersionPolicy(1, 0), calls_per_second=0)
+    summary = await worker.run_pass()
+    assert (summary["apps"], summary["done"], summary["disabled"], summary["failed"]) == (2, 2, 1, 1)
+    assert changed == [("versions/1", "disable")]
+    assert worker.status()["last_pass"] == summary
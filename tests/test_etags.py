@@ -0,0 +1,95 @@
+# tests/test_etags.py
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+
+from app.main import etag_matches, make_etag
+
+pytestmark = pytest.mark.anyio
+
+
+def request(etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": headers})
+
+
+def test_etag_matching():
+    etag = make_etag("app", "one", "versions/1")
+    assert etag == make_etag("app", "one", "versions/1") != make_etag("app", "one", "versions/2")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+async def test_unchanged_app_gets_304_without_a_payload_read(emulator, app_name):
+    from app.main import get_app_status, key_manager
+
+    await key_manager.create_app(app_name, 30)
+    response = Response()
+    app_secret = await get_app_status(app_name, request(), response)
+    etag = response.headers["ETag"]
+    assert app_secret.app_name == app_name
+
+    before = emulator.calls.get("access_secret_version", 0)
+    cached = await get_app_status(app_name, request(etag), Response())
+    assert cached.status_code == 304 and cached.headers["ETag"] == etag
+    assert emulator.calls.get("access_secret_version", 0) == before
+
+    await key_manager.rotate_secret(app_name)
+    response = Response()
+    rotated = await get_app_status(app_name, request(etag), response)
+    assert rotated.consumer_key != app_secret.consumer_key
+    assert response.headers["ETag"] != etag
+
+
+async def test_unchanged_listing_gets_304_without_payload_reads(emulator, app_name):
+    from app.main import key_manager, list_apps
+
+    async def listing(etag=None, **params):
+        response = Response()
+        params = {"include_errors": False, "page_size": None, "page_token": None, "stream": False,
+                  "fields": "all", **params}
+        return await list_apps(request(etag), response, **params), response
+
+    await key_manager.create_app(app_name, 30)
+    apps, response = await listing()
+    etag = response.headers["ETag"]
+    assert app_name in {app.app_name for app in apps}
+
+    before = emulator.calls.get("access_secret_version", 0)
+    cached, _ = await listing(etag)
+    assert cached.status_code == 304
+    assert emulator.calls.get("access_secret_version", 0) == before
+
+    await key_manager.rotate_secret(app_name)
+    apps, response = await listing(etag)
+    assert isinstance(apps, list) and response.headers["ETag"] != etag
+
+    # Pages have ETags of their own
+    _, response = await listing(page_size=1)
+    assert response.headers["ETag"] not in (etag, None)
+
+
+async def test_listing_with_errors_has_no_etag(emulator, app_name):
+    from app.main import list_apps, secret_manager
+
+    path = secret_manager.secret_path(app_name)
+    emulator.create_secret({
+        "parent": secret_manager.parent,
+        "secret_id": path.split("/")[-1],
+        "secret": {"labels": {"type": "apigee-key", "app": app_name}}
+    })
+    emulator.add_secret_version({"parent": path, "payload": {"data": b"not json"}})
+    try:
+        response = Response()
+        result = await list_apps(request('"anything"'), response, include_errors=True, page_size=None,
+                                 page_token=None, stream=False, fields="all")
+        assert app_name in {error.app_name for error in result.errors}
+        assert int(response.headers["X-List-Errors"]) >= 1
+        # A 304 would let the client keep this partial listing
+        assert "ETag" not in response.headers
+    finally:
+        emulator.delete_secret({"name": path})
+        secret_manager.forget(app_name)
@@ -0,0 +1,78 @@
+# tests/test_events.py
+import asyncio
+
+import pytest
+
+from app.events import EventLog
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_since_returns_events_in_order():
+    log = EventLog()
+    for name in ("one", "two", "one"):
+        log.publish("rotated", name)
+    events, reset = log.since(0)
+    assert [e["seq"] for e in events] == [1, 2, 3] and not reset
+    events, reset = log.since(1, app_name="one")
+    assert [e["seq"] for e in events] == [3] and not reset
+    assert log.since(3) == ([], False)
+    assert [e["seq"] for e in log.since(0, limit=2)[0]] == [1, 2]
+
+
+async def test_overrun_buffer_reports_a_reset():
+    log = EventLog(max_events=3)
+    for n in range(5):
+        log.publish("created", f"app-{n}")
+    events, reset = log.since(0)
+    assert reset and [e["seq"] for e in events] == [3, 4, 5]
+    # The oldest position still covered is not a reset
+    assert log.since(2) == (log.since(0)[0], False)
+
+
+async def test_position_past_the_end_reports_a_reset():
+    # After a restart clients still hold sequence numbers from before
+    log = EventLog()
+    log.publish("created", "app")
+    assert log.since(10) == ([], True)
+
+
+async def test_wait_returns_when_an_event_is_published():
+    log = EventLog()
+
+    async def publish_later():
+        await asyncio.sleep(0.02)
+        log.publish("deleted", "other")
+        await asyncio.sleep(0.02)
+        log.publish("rotated", "app")
+
+    publisher = asyncio.ensure_future(publish_later())
+    started = asyncio.get_running_loop().time()
+    events, reset = await log.wait(0, timeout=5, app_name="app")
+    await publisher
+    # Events for other apps do not end the wait
+    assert [(e["type"], e["app_name"]) for e in events] == [("rotated", "app")] and not reset
+    assert asyncio.get_running_loop().time() - started < 1
+
+
+async def test_wait_times_out_empty():
+    log = EventLog()
+    started = asyncio.get_running_loop().time()
+    assert await log.wait(0, timeout=0.05) == ([], False)
+    assert asyncio.get_running_loop().time() - started >= 0.04
+
+
+async def test_poll_endpoint_reports_the_resume_position(app_name):
+    from app.main import key_manager, poll_events
+
+    since = key_manager.events.last_seq
+    await key_manager.create_app(app_name, 30)
+    await key_manager.rotate_secret(app_name)
+    polled = await poll_events(since=since, app_name=app_name, timeout=0, limit=1000)
+    assert [e["type"] for e in polled["events"]] == ["created", "rotated"]
+    assert polled["next"] == polled["events"][-1]["seq"] and not polled["reset"]
+    # Events carry metadata, never credentials
+    assert all("consumer_secret" not in e and "credentials" not in e for e in polled["events"])
+
+    polled = await poll_events(since=key_manager.events.last_seq + 100, app_name=None, timeout=0, limit=1000)
+    assert polled == {"events": [], "next": key_manager.events.last_seq, "reset": True}
@@ -0,0 +1,64 @@
+# tests/test_key_index.py
+import time
+
+from app.key_index import KeyIndex
+
+
+def test_validates_owner_and_secret():
+    index = KeyIndex()
+    index.put("app", "key-1", "secret-1")
+    assert index.validate("key-1", "secret-1") == {"valid": True, "app_name": "app", "current": True}
+    assert index.validate("key-1", "wrong")["reason"] == "secret_mismatch"
+    assert index.validate("key-1")["valid"]
+    assert index.validate("key-2")["reason"] == "unknown_key"
+
+
+def test_key_without_a_secret_only_identifies_the_app():
+    index = KeyIndex()
+    index.put("app", "key-1", None)
+    assert index.validate("key-1")["app_name"] == "app"
+    assert index.validate("key-1", "secret-1")["reason"] == "secret_unknown"
+
+
+def test_previous_key_stays_valid_for_the_grace_window():
+    index = KeyIndex(grace_seconds=0.05)
+    index.put("app", "key-1", "secret-1")
+    index.put("app", "key-2", "secret-2")
+    assert index.current_key("app") == "key-2"
+    assert index.validate("key-1", "secret-1") == {"valid": True, "app_name": "app", "current": False}
+    assert index.validate("key-2", "secret-2")["current"]
+
+    time.sleep(0.06)
+    assert index.validate("key-1", "secret-1")["reason"] == "unknown_key"
+    assert index.validate("key-2", "secret-2")["valid"]
+    # Expired keys are dropped on the next write
+    index.put("other", "key-3", "secret-3")
+    assert len(index) == 2
+
+
+def test_without_grace_the_previous_key_is_dropped_at_once():
+    index = KeyIndex()
+    index.put("app", "key-1", "secret-1")
+    index.put("app", "key-2", "secret-2")
+    assert index.validate("key-1")["reason"] == "unknown_key"
+    assert len(index) == 1
+
+
+def test_putting_the_current_key_again_updates_its_secret():
+    index = KeyIndex(grace_seconds=60)
+    index.put("app", "key-1", None)
+    # A reload of the same key fills in its secret and stays current
+    index.put("app", "key-1", "secret-1")
+    assert index.validate("key-1", "secret-1") == {"valid": True, "app_name": "app", "current": True}
+
+
+def test_remove_drops_current_and_retiring_keys():
+    index = KeyIndex(grace_seconds=60)
+    index.put("app", "key-1", "secret-1")
+    index.put("app", "key-2", "secret-2")
+    index.put("other", "key-3", "secret-3")
+    index.remove("app")
+    assert "app" not in index
+    assert index.validate("key-1")["reason"] == "unknown_key"
+    assert index.validate("key-2")["reason"] == "unknown_key"
+    assert index.validate("key-3")["valid"]
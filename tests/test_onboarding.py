@@ -0,0 +1,94 @@
+# tests/test_onboarding.py
+import json
+
+import pytest
+
+from app.onboarding import ImportCheckpoint, iter_file_lines, iter_records, run_import
+
+pytestmark = pytest.mark.anyio
+
+
+async def parse(lines, fmt="jsonl"):
+    return [row async for row in iter_records(iter_file_lines(lines), fmt, default_period=30)]
+
+
+async def test_jsonl_rows_and_defaults():
+    rows = await parse([
+        '{"app_name": "one", "rotation_period_days": 7}',
+        "",
+        '{"app_name": " two "}',
+        '{"app_name": "three", "rotation_period_days": "14"}'
+    ])
+    assert rows == [
+        (1, {"app_name": "one", "rotation_period_days": 7}, None),
+        (3, {"app_name": "two", "rotation_period_days": 30}, None),
+        (4, {"app_name": "three", "rotation_period_days": 14}, None)
+    ]
+
+
+@pytest.mark.parametrize("line", [
+    '{"app_name": "x", "rotation_period_days": [30]}',
+    '{"app_name": "x", "rotation_period_days": {"days": 30}}',
+    '{"app_name": "x", "rotation_period_days": true}',
+    '{"app_name": "x", "rotation_period_days": "soon"}',
+    '{"app_name": "x", "rotation_period_days": 400}',
+    '{"app_name": ["x"]}',
+    '{"rotation_period_days": 30}',
+    '["x", 30]',
+    "not json"
+])
+async def test_bad_rows_are_reported_not_raised(line):
+    rows = await parse([line, '{"app_name": "after"}'])
+    assert rows[0][0] == 1 and rows[0][1] is None and rows[0][2]
+    # The stream carries on past the bad row
+    assert rows[1] == (2, {"app_name": "after", "rotation_period_days": 30}, None)
+
+
+async def test_csv_rows():
+    rows = await parse(["app_name,rotation_period_days", "one,7", "two,", "three,x"], fmt="csv")
+    assert rows[0] == (2, {"app_name": "one", "rotation_period_days": 7}, None)
+    assert rows[1] == (3, {"app_name": "two", "rotation_period_days": 30}, None)
+    assert rows[2][0] == 4 and rows[2][1] is None
+
+
+def import_lines(count: int):
+    return [json.dumps({"app_name": f"app-{n}"}) for n in range(1, count + 1)]
+
+
+async def test_interrupted_import_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "import.json")
+    created = set()
+    failing = {"app-3"}
+
+    async def onboard(app_name: str, period: int) -> bool:
+        if app_name in failing:
+            raise RuntimeError("backend down")
+        if app_name in created:
+            return False
+        created.add(app_name)
+        return True
+
+    lines = import_lines(20)
+    checkpoint = ImportCheckpoint(path)
+    results = run_import(iter_records(iter_file_lines(lines), "jsonl", 30), onboard, 1, checkpoint)
+    seen = 0
+    async for result in results:
+        seen += 1
+        if seen == 10:
+            break
+    await results.aclose()
+
+    saved = ImportCheckpoint(path)
+    watermark = saved.line
+    assert 0 < watermark < 20
+    assert saved.failed_lines == {3}
+
+    failing.clear()
+    results = [r async for r in run_import(iter_records(iter_file_lines(lines), "jsonl", 30), onboard, 4, saved)]
+    summary = results[-1]
+    assert summary["status"] == "done"
+    assert summary["resumed_from_line"] == watermark
+    assert summary["failed"] == 0
+    assert created == {f"app-{n}" for n in range(1, 21)}
+    # Lines at or below the watermark are not processed again, except the failed one
+    assert {r["line"] for r in results[:-1]} == {3} | set(range(watermark + 1, 21))
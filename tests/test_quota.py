@@ -0,0 +1,64 @@
+# tests/test_quota.py
+import asyncio
+
+import pytest
+
+from app.quota import BACKGROUND, INTERACTIVE, QuotaLimiter, current_lane, in_lane, lane
+
+pytestmark = pytest.mark.anyio
+
+
+def drained_limiter() -> QuotaLimiter:
+    # 100 tokens a second with room for one, taken up front
+    limiter = QuotaLimiter({"access": 6000}, burst_seconds=0.01)
+    assert limiter.try_acquire("access_secret_version")
+    return limiter
+
+
+async def test_interactive_calls_are_served_before_background():
+    limiter = drained_limiter()
+    served = []
+
+    async def call(name: str, lane_name: str):
+        with lane(lane_name):
+            await limiter.acquire("access_secret_version")
+        served.append(name)
+
+    # Background callers queue first; the interactive one still goes first
+    await asyncio.gather(
+        call("bg1", BACKGROUND),
+        call("bg2", BACKGROUND),
+        call("bg3", BACKGROUND),
+        call("ui", INTERACTIVE)
+    )
+    assert served == ["ui", "bg1", "bg2", "bg3"]
+
+
+async def test_try_acquire_does_not_jump_the_queue():
+    limiter = drained_limiter()
+    waiter = asyncio.ensure_future(limiter.acquire("access_secret_version"))
+    await asyncio.sleep(0)
+    assert limiter.status()["access"]["queued"] == 1
+    assert not limiter.try_acquire("access_secret_version")
+    await waiter
+
+
+async def test_unlimited_quotas_do_not_wait():
+    limiter = QuotaLimiter({"access": 6000}, burst_seconds=0.01)
+    assert await limiter.acquire("list_secrets") == 0
+    assert "read" not in limiter.status()
+
+
+async def test_in_lane_sets_the_lane_for_the_call():
+    @in_lane(BACKGROUND)
+    async def job():
+        return current_lane()
+
+    assert await job() == BACKGROUND
+    assert current_lane() == INTERACTIVE
+
+
+def test_unknown_lane_is_rejected():
+    with pytest.raises(ValueError):
+        with lane("bulk"):
+            pass
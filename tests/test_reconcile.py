@@ -0,0 +1,157 @@
+# tests/test_reconcile.py
+import pytest
+
+from app.apigee import ApigeeEmulator
+from app.events import EventLog
+from app.reconcile import Reconciler, ReconcileState
+
+pytestmark = pytest.mark.anyio
+
+
+class Secrets:
+    """Secrets by app name, standing in for Secret Manager"""
+
+    def __init__(self):
+        self.keys = {}
+        self.readable = True
+        self.rotated = 0
+
+    async def list_apps(self):
+        return list(self.keys)
+
+    async def credentials(self, app_name):
+        if not self.readable:
+            raise RuntimeError("backend down")
+        return self.keys[app_name], f"secret-of-{self.keys[app_name]}"
+
+    async def create(self, app_name):
+        self.keys[app_name] = f"key-{app_name}"
+        return await self.credentials(app_name)
+
+    async def rotate(self, app_name):
+        self.rotated += 1
+        self.keys[app_name] = f"key-{app_name}-{self.rotated}"
+        return await self.credentials(app_name)
+
+    async def delete(self, app_name):
+        del self.keys[app_name]
+
+
+@pytest.fixture
+def apigee():
+    return ApigeeEmulator()
+
+
+@pytest.fixture
+def secrets():
+    return Secrets()
+
+
+async def no_key(app_name):
+    return None
+
+
+def reconciler(apigee, secrets, current_key=no_key, **kwargs):
+    return Reconciler(
+        apigee=apigee,
+        list_secret_apps=secrets.list_apps,
+        current_key=current_key,
+        credentials=secrets.credentials,
+        create=secrets.create,
+        rotate=secrets.rotate,
+        delete_orphan=secrets.delete,
+        events=EventLog(),
+        state=ReconcileState(),
+        **kwargs
+    )
+
+
+async def test_plan_covers_each_action(apigee, secrets):
+    for name in ("missing-secret", "stale-key", "revoked", "in-step"):
+        apigee.create_app(name)
+    apigee.create_app("unapproved", status="revoked")
+    secrets.keys = {"stale-key": "key-new", "revoked": "key-old", "in-step": "key-ok", "unapproved": "key-x",
+                    "deleted": "key-y"}
+    apigee.add_key("stale-key", "developer@example.com", "key-old", "s")
+    apigee.add_key("revoked", "developer@example.com", "key-old", "s")
+    apigee.revoke_key("revoked", "key-old")
+    apigee.add_key("in-step", "developer@example.com", "key-ok", "s")
+
+    r = reconciler(apigee, secrets)
+    await r._collect(full=True)
+    plans = {name: await r.plan(name) for name in r.state.apps.keys() | r.state.secrets}
+    assert plans == {
+        "missing-secret": "create",
+        "stale-key": "register",
+        "revoked": "rotate",
+        "in-step": None,
+        "unapproved": "orphan",
+        "deleted": "orphan"
+    }
+
+
+async def test_key_unknown_to_this_process_is_read_from_the_secret(apigee, secrets):
+    # After a restart neither the store nor the key index knows the key
+    apigee.create_app("app")
+    apigee.add_key("app", "developer@example.com", "key-other", "s")
+    secrets.keys = {"app": "key-current"}
+
+    report = await reconciler(apigee, secrets).run_pass()
+    assert [(a["action"], a["status"]) for a in report["actions"]] == [("register", "done")]
+    assert "key-current" in {c["consumerKey"] for c in apigee.list_apps()[0]["credentials"]}
+
+
+async def test_unreadable_key_is_reported_and_retried(apigee, secrets):
+    apigee.create_app("app")
+    apigee.add_key("app", "developer@example.com", "key-other", "s")
+    secrets.keys = {"app": "key-current"}
+    secrets.readable = False
+
+    r = reconciler(apigee, secrets)
+    report = await r.run_pass()
+    assert report["unknown"] == 1 and report["actions"][0]["status"] == "unknown"
+    assert r.state.retry == {"app"}
+
+    secrets.readable = True
+    report = await r.run_pass()
+    assert [(a["action"], a["status"]) for a in report["actions"]] == [("register", "done")]
+    assert r.state.retry == set()
+
+
+async def test_passes_create_rotate_and_settle(apigee, secrets):
+    apigee.create_app("app")
+    async def current_key(app_name):
+        return secrets.keys.get(app_name)
+
+    r = reconciler(apigee, secrets, current_key=current_key)
+    assert (await r.run_pass())["create"] == 1
+    assert (await r.run_pass())["actions"] == []
+
+    apigee.revoke_key("app", "key-app")
+    report = await r.run_pass()
+    assert [(a["action"], a["status"]) for a in report["actions"]] == [("rotate", "done")]
+    assert (await r.run_pass())["actions"] == []
+
+
+async def test_orphans_are_only_reported_by_default(apigee, secrets):
+    secrets.keys = {"gone": "key-gone"}
+    r = reconciler(apigee, secrets)
+    for _ in range(2):
+        report = await r.run_pass()
+        assert [(a["action"], a["status"]) for a in report["actions"]] == [("orphan", "reported")]
+    assert secrets.keys == {"gone": "key-gone"}
+    assert r.status()["orphans"] == ["gone"]
+
+    report = await reconciler(apigee, secrets, delete_orphans=True).run_pass()
+    assert report["actions"][0]["status"] == "done"
+    assert secrets.keys == {}
+
+
+async def test_dry_run_changes_nothing(apigee, secrets):
+    apigee.create_app("app")
+    r = reconciler(apigee, secrets)
+    report = await r.run_pass(dry_run=True)
+    assert [(a["action"], a["status"]) for a in report["actions"]] == [("create", "planned")]
+    assert secrets.keys == {} and r.passes == 0
+    # The app is looked at again on the next real pass
+    assert (await r.run_pass())["create"] == 1
@@ -0,0 +1,172 @@
+# tests/test_resilience.py
+import asyncio
+import time
+
+import pytest
+from google.api_core import exceptions
+
+from app.resilience import CircuitBreaker, CircuitOpenError, Resilience, RetryPolicy
+
+pytestmark = pytest.mark.anyio
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+    for _ in range(2):
+        breaker.record(exceptions.ServiceUnavailable("down"))
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record(exceptions.ServiceUnavailable("down"))
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.status()["times_opened"] == 1
+
+
+def test_breaker_success_resets_the_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record(exceptions.ServiceUnavailable("down"))
+    breaker.record(None)
+    breaker.record(exceptions.ServiceUnavailable("down"))
+    assert breaker.state == "closed"
+
+
+def test_breaker_ignores_definite_answers():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    for error in (exceptions.NotFound("gone"), exceptions.ResourceExhausted("quota")):
+        breaker.record(error)
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record(exceptions.DeadlineExceeded("slow"))
+    assert not breaker.allow()
+    time.sleep(0.06)
+    # Exactly one probe is let through
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record(None)
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_breaker_half_open_probe_reopens_on_failure():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record(exceptions.InternalServerError("boom"))
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(exceptions.InternalServerError("boom"))
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+async def test_open_circuit_fails_fast():
+    resilience = Resilience(breaker=CircuitBreaker(failure_threshold=1, reset_seconds=60))
+    resilience.breaker.record(exceptions.ServiceUnavailable("down"))
+    calls = []
+
+    async def attempt(timeout):
+        calls.append(timeout)
+
+    with pytest.raises(CircuitOpenError):
+        await resilience.call(attempt, "get_secret", idempotent=True)
+    assert calls == []
+
+
+async def test_attempts_get_the_remaining_deadline():
+    resilience = Resilience(deadline_seconds=2)
+    timeouts = []
+
+    async def attempt(timeout):
+        timeouts.append(timeout)
+        return "ok"
+
+    assert await resilience.call(attempt, "get_secret") == "ok"
+    assert 0 < timeouts[0] <= 2
+
+
+async def test_only_idempotent_calls_are_retried():
+    resilience = Resilience(retry=RetryPolicy(attempts=3, initial_delay=0))
+
+    def flaky():
+        failures = [exceptions.ServiceUnavailable("blip")]
+
+        async def attempt(timeout):
+            if failures:
+                raise failures.pop()
+            return "ok"
+        return attempt
+
+    assert await resilience.call(flaky(), "access_secret_version", idempotent=True) == "ok"
+    with pytest.raises(exceptions.ServiceUnavailable):
+        await resilience.call(flaky(), "add_secret_version", idempotent=False)
+
+
+async def test_hedged_read_takes_the_faster_attempt():
+    resilience = Resilience(hedge_after_seconds=0.02)
+    delays = [1, 0]
+
+    async def attempt(timeout):
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    started = time.monotonic()
+    assert await resilience.call(attempt, "access_secret_version", idempotent=True, hedge=True) == 0
+    assert time.monotonic() - started < 0.5
+
+
+def test_call_sync_turns_off_client_retries():
+    resilience = Resilience(deadline_seconds=2)
+    seen = {}
+
+    def method(**kwargs):
+        seen.update(kwargs)
+
+    resilience.call_sync(method, "get_secret", request={"name": "x"})
+    assert seen["retry"] is None
+    assert 0 < seen["timeout"] <= 2
+
+
+def test_list_sync_fetches_each_page_under_call_sync():
+    resilience = Resilience(deadline_seconds=2, retry=RetryPolicy(attempts=3, initial_delay=0))
+    items = list(range(5))
+    requests = []
+    failures = [exceptions.ServiceUnavailable("blip")]
+
+    class Page:
+        def __init__(self, offset):
+            self.secrets = items[offset:offset + 2]
+            self.next_page_token = str(offset + 2) if offset + 2 < len(items) else ""
+
+    class Pager:
+        def __init__(self, offset):
+            self.offset = offset
+
+        @property
+        def pages(self):
+            # A real pager would fetch the following pages here, unguarded
+            yield Page(self.offset)
+            raise AssertionError("later pages must be requested explicitly")
+
+    def list_secrets(request, **options):
+        requests.append((request.get("page_token"), options["retry"], options["timeout"]))
+        if request.get("page_token") == "2" and failures:
+            raise failures.pop()
+        return Pager(int(request.get("page_token") or 0))
+
+    assert list(resilience.list_sync(list_secrets, "list_secrets", {"parent": "p"}, "secrets")) == items
+    # The failed second page was retried on its own
+    assert [token for token, _, _ in requests] == [None, "2", "2", "4"]
+    assert all(retry is None and 0 < timeout <= 2 for _, retry, timeout in requests)
+
+
+def test_list_sync_fetches_pages_as_items_are_consumed(emulator, app_name):
+    from itertools import islice
+
+    parent = "projects/list-sync"
+    for n in range(5):
+        emulator.create_secret({"parent": parent, "secret_id": f"{app_name}-{n}", "secret": {}})
+    before = emulator.calls.get("list_secrets", 0)
+    secrets = Resilience().list_sync(emulator.list_secrets, "list_secrets", {"parent": parent, "page_size": 2}, "secrets")
+    assert len(list(islice(secrets, 3))) == 3
+    assert emulator.calls["list_secrets"] - before == 2
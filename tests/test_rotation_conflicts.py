@@ -0,0 +1,68 @@
+# tests/test_rotation_conflicts.py
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.sharding import Shard
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def manager():
+    from app.main import key_manager
+
+    return key_manager
+
+
+@pytest.fixture
+def two_replicas(monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(main, "shard", Shard("a", ["a", "b"]))
+
+
+async def test_rotation_with_a_held_lease_is_refused(manager, app_name):
+    await manager.create_app(app_name, 30)
+    assert await manager.store.call("acquire_lease", f"rotate:{app_name}", "another-worker", 60)
+    with pytest.raises(HTTPException) as refused:
+        await manager.rotate_secret(app_name)
+    assert refused.value.status_code == 409
+    await manager.store.call("release_lease", f"rotate:{app_name}", "another-worker")
+    await manager.rotate_secret(app_name)
+
+
+async def test_concurrent_rotations_of_one_app(manager, app_name):
+    await manager.create_app(app_name, 30)
+    results = await asyncio.gather(*(manager.rotate_secret(app_name) for _ in range(5)), return_exceptions=True)
+    refused = [r for r in results if isinstance(r, HTTPException)]
+    assert len(refused) == 4
+    assert all(r.status_code == 409 for r in refused)
+    # The lease is released afterwards
+    await manager.rotate_secret(app_name)
+
+
+async def test_rotation_elsewhere_is_not_overwritten(manager, app_name, emulator, two_replicas):
+    from app.main import secret_manager
+
+    await manager.create_app(app_name, 30)
+    await manager.rotate_secret(app_name)
+    # A cold read afterwards must keep the recorded version
+    secret_manager.cache.invalidate(app_name)
+    await manager.get_app_status(app_name)
+    assert (await manager.store.call("get", app_name))["version"]
+
+    # Another replica writes a newer version behind this one's back
+    path = secret_manager.secret_path(app_name)
+    latest = emulator.access_secret_version({"name": f"{path}/versions/latest"})
+    emulator.add_secret_version({"parent": path, "payload": {"data": latest.payload.data}})
+
+    with pytest.raises(HTTPException) as refused:
+        await manager.rotate_secret(app_name)
+    assert refused.value.status_code == 409
+    # The stale state was dropped, so the retry goes through
+    rotated = await manager.rotate_secret(app_name)
+    stored = json.loads(emulator.access_secret_version({"name": f"{path}/versions/latest"}).payload.data)
+    assert stored["credentials"]["key"] == rotated.consumer_key
@@ -0,0 +1,34 @@
+# tests/test_sharding.py
+from collections import Counter
+
+from app.sharding import HashRing, Shard
+
+APPS = [f"app-{i}" for i in range(3000)]
+
+
+def test_every_app_has_one_owner_spread_evenly():
+    ring = HashRing(["a", "b", "c"])
+    owners = Counter(ring.owner(app) for app in APPS)
+    assert set(owners) == {"a", "b", "c"}
+    assert min(owners.values()) > len(APPS) / 3 * 0.8
+
+
+def test_owner_does_not_depend_on_member_order():
+    first, second = HashRing(["a", "b", "c"]), HashRing(["c", "a", "b"])
+    assert all(first.owner(app) == second.owner(app) for app in APPS)
+
+
+def test_adding_a_replica_moves_a_fair_share():
+    before, after = HashRing(["a", "b", "c"]), HashRing(["a", "b", "c", "d"])
+    moved = [app for app in APPS if before.owner(app) != after.owner(app)]
+    assert all(after.owner(app) == "d" for app in moved)
+    assert len(moved) < len(APPS) / 4 * 1.3
+
+
+def test_replicas_split_the_apps_between_them():
+    shards = [Shard(replica, ["a", "b"]) for replica in ("a", "b")]
+    assert all(sum(shard.owns(app) for shard in shards) == 1 for app in APPS)
+
+
+def test_single_replica_owns_everything():
+    assert all(Shard("a").owns(app) for app in APPS)
@@ -0,0 +1,107 @@
+# tests/test_state_store.py
+import asyncio
+import os
+import sqlite3
+import time
+
+import pytest
+
+from app.state_store import MemoryStateStore, SQLiteStateStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryStateStore()
+    else:
+        store = SQLiteStateStore(str(tmp_path / "state.db"))
+        yield store
+        store.close()
+
+
+def test_lease_excludes_other_owners(store):
+    assert store.acquire_lease("rotate:app", "a", 60)
+    assert not store.acquire_lease("rotate:app", "b", 60)
+    # The holder can renew its own lease
+    assert store.acquire_lease("rotate:app", "a", 60)
+
+
+def test_release_only_by_owner(store):
+    store.acquire_lease("rotate:app", "a", 60)
+    store.release_lease("rotate:app", "b")
+    assert not store.acquire_lease("rotate:app", "b", 60)
+    store.release_lease("rotate:app", "a")
+    assert store.acquire_lease("rotate:app", "b", 60)
+
+
+def test_expired_lease_can_be_taken(store):
+    assert store.acquire_lease("rotate:app", "a", 0)
+    assert store.acquire_lease("rotate:app", "b", 60)
+
+
+def test_leases_are_per_name(store):
+    assert store.acquire_lease("rotate:one", "a", 60)
+    assert store.acquire_lease("rotate:two", "b", 60)
+
+
+def test_sqlite_lease_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "state.db")
+    first, second = SQLiteStateStore(path), SQLiteStateStore(path)
+    try:
+        assert first.acquire_lease("rotate:app", "a", 60)
+        assert not second.acquire_lease("rotate:app", "b", 60)
+        first.release_lease("rotate:app", "a")
+        assert second.acquire_lease("rotate:app", "b", 60)
+    finally:
+        first.close()
+        second.close()
+
+
+def test_sqlite_store_opens_on_first_use(tmp_path):
+    path = tmp_path / "state" / "key-manager.db"
+    store = SQLiteStateStore(str(path))
+    assert not os.path.exists(path.parent)
+    store.put({"app_name": "app", "consumer_key": "key"})
+    assert path.exists()
+    store.close()
+    # A closed store reopens on the next call
+    assert store.get("app")["consumer_key"] == "key"
+    store.close()
+
+
+@pytest.mark.anyio
+async def test_call_matches_direct_calls(store):
+    await store.call("put", {"app_name": "app", "consumer_key": "key"})
+    assert (await store.call("get", "app"))["consumer_key"] == "key"
+    assert [r["app_name"] for r in await store.call("list", limit=1)] == ["app"]
+
+
+@pytest.mark.anyio
+async def test_sqlite_call_waits_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = SQLiteStateStore(path, busy_timeout_ms=300)
+    store.put({"app_name": "app"})
+    # Another process holds the write lock
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.ensure_future(tick())
+    started = time.monotonic()
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            await store.call("put", {"app_name": "app", "consumer_key": "key"})
+    finally:
+        ticker.cancel()
+        writer.rollback()
+        writer.close()
+    # The busy timeout bounds the wait, and the loop kept running meanwhile
+    assert time.monotonic() - started < 2
+    assert ticks >= 10
+    store.close()
@@ -1,19 +1,20 @@
 # verify_gcp.py
-from google.cloud import secretmanager_v1
 import os
+from app.clients import create_secret_manager_client, default_project_id, secret_backend
 
 def verify_gcp_setup():
     try:
         # Check environment variables
-        project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+        project_id = default_project_id()
         creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
         
         print("\nChecking GCP Configuration:")
         print(f"Project ID: {project_id}")
         print(f"Credentials Path: {creds_path}")
+        print(f"Secret Backend: {secret_backend()}")
         
         # Initialize client
-        client = secretmanager_v1.SecretManagerServiceClient()
+        client = create_secret_manager_client()
         print("\n✅ Successfully initialized Secret Manager client")
         
         # Try to list secrets
@@ -1,70 +1,66 @@
 # verify_secrets.py
-from google.cloud import secretmanager_v1
-import json
-from datetime import datetime
-import os
+"""Print every Apigee key secret and its rotation metadata.
 
-def verify_secrets():
+Human-readable view of the same audit audit_secrets.py runs; use that for
+JSON or CSV output and a due/overdue summary.
+"""
+import sys
+from app.audit import SecretAuditor
+from app.clients import create_secret_manager_client, default_project_id
+
+def verify_secrets(metadata_only: bool = False, concurrency: int = 16):
     try:
-        # Initialize client
-        client = secretmanager_v1.SecretManagerServiceClient()
-        project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
-        
+        project_id = default_project_id()
         print(f"\nChecking secrets in project: {project_id}")
-        parent = f"projects/{project_id}"
-        
-        # List all secrets
-        secrets = list(client.list_secrets(request={"parent": parent}))
-        apigee_secrets = [s for s in secrets if "apigee-key-" in s.name]
-        
-        if not apigee_secrets:
+
+        # Secrets are selected by label on the server and read concurrently
+        auditor = SecretAuditor(
+            create_secret_manager_client(),
+            f"projects/{project_id}",
+            concurrency=concurrency,
+            payload="never" if metadata_only else "always"
+        )
+        report = auditor.run()
+        rows = report["apps"]
+
+        if not rows:
             print("No Apigee secrets found!")
             return
-            
-        print(f"\nFound {len(apigee_secrets)} Apigee secrets:")
-        
-        for secret in apigee_secrets:
-            try:
-                secret_id = secret.name.split('/')[-1]
-                print(f"\nSecret: {secret_id}")
-                print("=" * 50)
-                
-                # Get latest version
-                version_name = f"{secret.name}/versions/latest"
-                response = client.access_secret_version(request={"name": version_name})
-                secret_data = json.loads(response.payload.data.decode('UTF-8'))
-                
-                # Display metadata
-                metadata = secret_data.get('metadata', {})
-                print("\nMetadata:")
-                print(f"App Name: {metadata.get('app_name')}")
-                print(f"Created At: {metadata.get('created_at')}")
-                print(f"Last Rotated: {metadata.get('last_rotated')}")
-                print(f"Next Rotation: {metadata.get('next_rotation')}")
-                print(f"Rotation Period: {metadata.get('rotation_period_days')} days")
-                
-                # Display credentials (key only, not secret)
-                credentials = secret_data.get('credentials', {})
+
+        print(f"\nFound {len(rows)} Apigee secrets:")
+
+        for row in rows:
+            print(f"\nSecret: {row['secret_id']}")
+            print("=" * 50)
+            if row["status"] == "error":
+                print(f"Error processing secret {row['secret_id']}: {row['error']}")
+                continue
+
+            print("\nMetadata:")
+            print(f"App Name: {row['app_name']}")
+            print(f"Created At: {row.get('created_at')}")
+            print(f"Last Rotated: {row.get('last_rotated')}")
+            print(f"Next Rotation: {row.get('next_rotation')}")
+            print(f"Rotation Period: {row.get('rotation_period_days')} days")
+
+            # Display credentials (key only, not secret)
+            if not metadata_only:
                 print("\nCredentials:")
-                print(f"Key: {credentials.get('key')}")
+                print(f"Key: {row.get('key')}")
                 print("Secret: ********")  # Don't display actual secret
-                
-                # Calculate days until next rotation
-                if metadata.get('next_rotation'):
-                    next_rotation = datetime.fromisoformat(metadata['next_rotation'])
-                    days_remaining = (next_rotation - datetime.now()).days
-                    print(f"\nDays until next rotation: {days_remaining}")
-                
-                print("\nLabels:")
-                for key, value in secret.labels.items():
-                    print(f"{key}: {value}")
-                
-            except Exception as e:
-                print(f"Error processing secret {secret.name}: {str(e)}")
-                continue
-        
+
+            if row.get("days_until_rotation") is not None:
+                print(f"\nDays until next rotation: {row['days_until_rotation']}")
+
+            print("\nLabels:")
+            for key, value in row["labels"].items():
+                print(f"{key}: {value}")
+
+        summary = report["summary"]
+        print(f"\nOverdue: {summary['overdue']}, due within {summary['due_within_days']:g} days: {summary['due_soon']}")
+
     except Exception as e:
         print(f"Error: {str(e)}")
 
 if __name__ == "__main__":
-    verify_secrets()
\ No newline at end of file
+    verify_secrets(metadata_only="--metadata-only" in sys.argv)